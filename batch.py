@@ -0,0 +1,434 @@
+"""
+배치 모드 - 복수 PDF → 하나의 엑셀 파일 (PDF별 시트)
+- 파싱(parse_pdf)은 워커 프로세스 풀에서 병렬 수행, 결과(ParseResult)는 피클링되어 메인 프로세스로 전달
+- 시트 쓰기는 메인 프로세스에서 제출 순서대로 수행 (결과가 도착하는 대로 쓰므로
+  앞 PDF의 시트를 쓰는 동안 뒤 PDF 파싱이 계속 진행됨)
+- 내용이 같은 PDF는 배치 안에서 한 번만 파싱 (parse_cache 키 기준), 이전 실행 결과는 디스크 캐시에서 재사용
+- 파싱 결과는 쓰기 직전까지만 보관 (미리 파싱하는 PDF는 워커 수의 2배까지), 다 쓴 결과는 바로 놓아줌
+- 엔진 "xml"(BOM_WRITER_ENGINE=xml)이면 시트를 쓰는 즉시 zip에 내려쓰는 스트리밍 합본 (xlsx_patch_writer)
+- 합본이 너무 커지면 여러 파일로 나눔 (ShardLimits: 파일당 시트 수 / 예상 크기 / 이미지 수),
+  나눈 경우 Design Number → 파일/시트 인덱스 파일을 함께 만듦
+- GUI / Streamlit 공용
+
+환경변수 (0이면 해당 기준으로는 나누지 않음):
+  BOM_SHARD_MAX_SHEETS=<개수>   파일당 시트 수 상한 (기본 100)
+  BOM_SHARD_MAX_MB=<MB>         파일당 예상 크기 상한 (기본 100)
+  BOM_SHARD_MAX_IMAGES=<개수>   파일당 이미지 수 상한 (기본 1000)
+"""
+import dataclasses
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+import pdf_session
+from models import ParseResult
+from parse_cache import parse_pdf_cached, pdf_cache_key
+import excel_writer
+from excel_writer import write_sheet, sanitize_sheet_name
+from template_pool import checkout_template
+from xlsx_patch_writer import StreamingWorkbookWriter
+
+# BOM_BATCH_WORKERS: 0/미설정이면 CPU 수, 1이면 메인 프로세스에서 순차 처리
+BATCH_WORKERS = int(os.environ.get("BOM_BATCH_WORKERS", "0") or 0)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)) or 0)
+
+
+# 시트 하나의 예상 크기: 이미지 바이트 + 셀당/시트당 고정값 (압축 전 XML 기준의 대략값)
+_SHEET_BASE_BYTES = 16 * 1024
+_CELL_BYTES = 48
+
+
+@dataclasses.dataclass
+class ShardLimits:
+    """합본 파일 하나의 상한 (0 = 제한 없음)."""
+    max_sheets: int = _env_int("BOM_SHARD_MAX_SHEETS", 100)
+    max_bytes: int = _env_int("BOM_SHARD_MAX_MB", 100) * 1024 * 1024
+    max_images: int = _env_int("BOM_SHARD_MAX_IMAGES", 1000)
+
+    def exceeded(self, sheets: int, est_bytes: int, images: int) -> bool:
+        return (
+            (self.max_sheets > 0 and sheets > self.max_sheets)
+            or (self.max_bytes > 0 and est_bytes > self.max_bytes)
+            or (self.max_images > 0 and images > self.max_images)
+        )
+
+
+# 나누지 않음 (fill_combined_workbook 기존 동작)
+NO_SHARDING = ShardLimits(0, 0, 0)
+
+
+@dataclasses.dataclass
+class CombinedOutput:
+    success_count: int
+    fail_count: int
+    # 합본 파일 경로 (나누지 않았으면 output_path 하나, 시트를 하나도 못 쓰면 빈 리스트)
+    files: List[str]
+    # 여러 파일로 나눴을 때 Design Number → 파일/시트 인덱스 (.xlsx)
+    index_path: Optional[str] = None
+    # 시트 이름 → 그 시트가 있는 합본 파일
+    sheet_files: Dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+# (index(1-based), pdf_path, ParseResult 또는 None, 예외 또는 None)
+BatchItem = Tuple[int, str, Optional[ParseResult], Optional[BaseException]]
+
+
+def init_worker(ignore_signals: bool = False):
+    """
+    PDF 단위 워커 풀 공용 initializer (batch / bom_fill / watch_folder).
+    ignore_signals: Ctrl-C / 종료 신호를 워커에서 무시 (프로세스 그룹 전체로 가는 신호를 메인 프로세스만 처리할 때)
+    """
+    # 워커가 이미 PDF 단위로 병렬이므로 페이지 병렬(프로세스 풀 중첩)은 끔
+    pdf_session.PARSE_WORKERS = 1
+    if ignore_signals:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def _resolve_workers(workers: Optional[int], n_jobs: int) -> int:
+    n = workers if workers is not None else (BATCH_WORKERS or os.cpu_count() or 1)
+    return max(1, min(n, n_jobs))
+
+
+def _dedupe_keys(pdf_paths: Sequence[str], bom_images: bool) -> List[str]:
+    """
+    PDF별 작업 키. 내용이 같은 PDF는 같은 키 (해시 실패 시 경로별 고유 키).
+    중복 제거는 디스크 캐시와 무관하므로 캐시가 꺼져 있어도 해시함 (캐시는 load/store에서만 확인)
+    """
+    keys = []
+    for i, path in enumerate(pdf_paths):
+        try:
+            key = pdf_cache_key(path, bom_images=bom_images)
+        except OSError:
+            key = None
+        keys.append(key or f"#{i}")
+    return keys
+
+
+def _parse_job(path: str, key: str, bom_images: bool) -> Tuple[Optional[ParseResult], Optional[BaseException], float]:
+    """(결과, 예외, 파싱 소요 초). 워커 안에서 시간을 재므로 대기 시간은 빠지고, 실패해도 시간이 남음."""
+    t = time.perf_counter()
+    try:
+        result, error = parse_pdf_cached(path, key=None if key.startswith("#") else key, bom_images=bom_images), None
+    except Exception as e:
+        result, error = None, e
+    return result, error, time.perf_counter() - t
+
+
+def iter_parse_results(
+    pdf_paths: Sequence[str],
+    workers: Optional[int] = None,
+    bom_images: bool = True,
+    timings: Optional[Dict[int, float]] = None,
+) -> Iterator[BatchItem]:
+    """
+    PDF들을 파싱해 제출 순서대로 돌려줌.
+    실패한 PDF는 예외를 담아 돌려주고 나머지는 계속 처리.
+    내용이 같은 PDF는 처음 나온 것만 파싱하고 결과를 공유함.
+    bom_images=False: BOM 'Image' 컬럼 이미지 추출 생략 (템플릿에 Image 컬럼이 없을 때)
+    timings: 주어지면 돌려주기 전에 idx → 파싱 소요 초를 채움 (결과를 공유한 중복 PDF는 0,
+             워커 프로세스 자체가 죽은 경우는 기록 없음)
+    """
+    keys = _dedupe_keys(pdf_paths, bom_images)
+    first_index = {}
+    # 키별 마지막 사용 위치(1-based idx): 여기까지 돌려주면 결과를 놓아줌
+    last_use = {}
+    for i, key in enumerate(keys):
+        first_index.setdefault(key, i)
+        last_use[key] = i + 1
+    jobs = [(pdf_paths[i], key) for key, i in first_index.items()]
+    job_pos = {key: j for j, (_path, key) in enumerate(jobs)}
+    n_workers = _resolve_workers(workers, len(jobs))
+
+    timed = set()
+
+    def _collect(get_result):
+        try:
+            return get_result()
+        except Exception as e:
+            # 워커 프로세스 오류 등 (_parse_job 밖에서 난 예외)
+            return None, e, None
+
+    def _record_time(idx, key, seconds):
+        if timings is not None and seconds is not None:
+            timings[idx] = 0.0 if key in timed else seconds
+        timed.add(key)
+
+    def _for_path(result, path):
+        # 중복 PDF는 결과를 공유하므로 pdf_path만 자기 경로로 바꿔서 전달
+        if result is not None and result.pdf_path != path:
+            result = dataclasses.replace(result, pdf_path=path)
+        return result
+
+    if n_workers <= 1:
+        done = {}
+        for idx, (path, key) in enumerate(zip(pdf_paths, keys), 1):
+            if key not in done:
+                done[key] = _collect(lambda: _parse_job(path, key, bom_images))
+            result, error, seconds = done[key] if idx < last_use[key] else done.pop(key)
+            _record_time(idx, key, seconds)
+            yield idx, path, _for_path(result, path), error
+        return
+
+    # 미리 파싱하는 작업 수 상한 (쓰기가 느려도 결과가 메모리에 쌓이지 않도록)
+    window = n_workers * 2
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker) as pool:
+        futures = {}
+        submitted = 0
+        try:
+            for idx, (path, key) in enumerate(zip(pdf_paths, keys), 1):
+                while submitted < min(len(jobs), job_pos[key] + window):
+                    job_path, job_key = jobs[submitted]
+                    futures[job_key] = pool.submit(_parse_job, job_path, job_key, bom_images)
+                    submitted += 1
+                fut = futures[key] if idx < last_use[key] else futures.pop(key)
+                result, error, seconds = _collect(fut.result)
+                del fut
+                _record_time(idx, key, seconds)
+                yield idx, path, _for_path(result, path), error
+        finally:
+            # 호출 측이 중간에 멈추면 아직 시작하지 않은 작업은 취소
+            for fut in futures.values():
+                fut.cancel()
+
+
+def unique_sheet_name(name: str, used: set) -> str:
+    """시트 이름 규칙 적용 + 중복 시 _1, _2 ... 접미사. 결정된 이름은 used에 추가됨."""
+    name = sanitize_sheet_name(name)
+    base_name = name
+    counter = 1
+    while name in used:
+        suffix = f"_{counter}"
+        name = sanitize_sheet_name(base_name[:31 - len(suffix)] + suffix)
+        counter += 1
+    used.add(name)
+    return name
+
+
+class _OpenpyxlBook:
+    """openpyxl 합본: 양식 워크북에 시트를 복사해 채우고 마지막에 한 번에 저장."""
+
+    def __init__(self, template_path: str, output_path: str):
+        self.output_path = output_path
+        # 양식 워크북/레이아웃은 템플릿 풀에서 (레이아웃은 복사한 시트에도 좌표/스타일 id가 같으므로 그대로 사용)
+        self.wb, self.layout = checkout_template(template_path)
+        self.original_sheet_names = list(self.wb.sheetnames)
+        self.template_ws = self.wb.active
+
+    @property
+    def bom_images(self) -> bool:
+        # layout None = 양식 오류 → PDF별 실패로 보고 (write_sheet가 시트마다 같은 예외를 냄)
+        return self.layout.has_image_column if self.layout is not None else True
+
+    def add_sheet(self, result: ParseResult, sheet_name: Callable[[str], str]) -> str:
+        new_ws = self.wb.copy_worksheet(self.template_ws)
+        try:
+            name = sheet_name(write_sheet(new_ws, result, self.layout))
+            new_ws.title = name
+        except Exception:
+            self.wb.remove(new_ws)
+            raise
+        return name
+
+    def close(self):
+        # 원본 템플릿 시트 모두 삭제
+        for sn in self.original_sheet_names:
+            if sn in self.wb.sheetnames:
+                self.wb.remove(self.wb[sn])
+        self.wb.save(self.output_path)
+
+    def discard(self):
+        # 저장 중 실패한 경우 쓰다 만 파일이 남을 수 있음
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+
+def open_combined_book(template_path: str, output_path: str, engine: Optional[str] = None):
+    """
+    합본 출력 (add_sheet / close / discard).
+    engine: "openpyxl" / "xml" (없으면 BOM_WRITER_ENGINE). "xml"은 시트마다 바로 파일에 쓰는 스트리밍.
+    """
+    engine = engine or excel_writer.WRITER_ENGINE
+    if engine == "xml":
+        return StreamingWorkbookWriter(template_path, output_path)
+    if engine != "openpyxl":
+        raise ValueError(f"알 수 없는 writer 엔진: {engine}")
+    return _OpenpyxlBook(template_path, output_path)
+
+
+def sheet_cost(result: ParseResult) -> Tuple[int, int]:
+    """시트 하나의 (예상 바이트, 이미지 수)."""
+    images = [result.design_image_png]
+    for r in result.rows:
+        images.append(r.image_png)
+        images.extend((r.color_images or {}).values())
+    images = [img for img in images if img]
+    n_cells = len(result.rows) * (8 + len(result.color_headers or []))
+    est_bytes = _SHEET_BASE_BYTES + n_cells * _CELL_BYTES
+    est_bytes += sum(len(img) for img in images if isinstance(img, bytes))
+    return est_bytes, len(images)
+
+
+def _shard_paths(output_path: str) -> Tuple[Callable[[int], str], str]:
+    """(n번째 합본 파일 경로, 인덱스 파일 경로)"""
+    base, ext = os.path.splitext(output_path)
+    return (lambda n: f"{base}_part{n:02d}{ext or '.xlsx'}"), f"{base}_index.xlsx"
+
+
+def write_shard_index(index_path: str, entries: Sequence[Tuple[str, str, str, str]]):
+    """인덱스 파일: (Design Number, 파일, 시트, PDF) 한 줄씩."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Index"
+    ws.append(["Design Number", "File", "Sheet", "PDF"])
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+    for entry in entries:
+        ws.append(list(entry))
+    for col, width in zip("ABCD", (20, 36, 24, 48)):
+        ws.column_dimensions[col].width = width
+    ws.freeze_panes = "A2"
+    wb.save(index_path)
+
+
+def fill_combined_workbooks(
+    template_path: str,
+    pdf_paths: Sequence[str],
+    output_path: str,
+    labels: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[int, int, str, Optional[str], Optional[BaseException]], None]] = None,
+    engine: Optional[str] = None,
+    limits: Optional[ShardLimits] = None,
+    timings: Optional[Dict[int, float]] = None,
+) -> CombinedOutput:
+    """
+    복수 PDF → 엑셀 합본, PDF별 시트. limits를 넘으면 다음 파일로 넘어가며 씀 (배치 진행 중에 나눔).
+    - 한 파일로 끝나면 output_path 하나 (인덱스 없음)
+    - 나뉘면 <이름>_part01.xlsx, _part02.xlsx ... + <이름>_index.xlsx
+    시트 이름은 전체 파일에서 겹치지 않음.
+    labels: 시트 이름 fallback / 로그용 표시 이름 (기본: PDF 파일명)
+    on_result(idx, total, label, sheet_name, error): PDF 1개 처리가 끝날 때마다 호출 (제출 순서)
+    engine: "openpyxl" / "xml" (없으면 BOM_WRITER_ENGINE)
+    limits: 파일 하나의 상한 (기본: 환경변수 BOM_SHARD_*)
+    timings: 주어지면 on_result 호출 전에 idx → PDF 1개 처리 소요 초 (워커 파싱 + 시트 쓰기)를 채움
+    실패한 PDF는 시트를 만들지 않음. 모든 PDF가 실패하면 파일 없이 files=[]를 돌려줌.
+    """
+    labels: List[str] = list(labels) if labels is not None else [os.path.basename(p) for p in pdf_paths]
+    limits = limits if limits is not None else ShardLimits()
+    total = len(pdf_paths)
+    shard_path, index_path = _shard_paths(output_path)
+
+    files: List[str] = []
+    # (Design Number, 파일 번호, 시트, PDF 라벨)
+    entries: List[Tuple[str, int, str, str]] = []
+    book = open_combined_book(template_path, shard_path(1), engine)
+    # 현재 파일의 시트 수 / 예상 바이트 / 이미지 수
+    shard_sheets = shard_bytes = shard_images = 0
+    sheet_names_used = set()
+    success_count = 0
+    fail_count = 0
+    parse_seconds: Dict[int, float] = {}
+
+    try:
+        for idx, _path, result, error in iter_parse_results(
+            pdf_paths, workers=workers, bom_images=book.bom_images, timings=parse_seconds
+        ):
+            write_started = time.perf_counter()
+            label = labels[idx - 1]
+            sheet_name = None
+            if error is None:
+                est_bytes, n_images = sheet_cost(result)
+                if shard_sheets and limits.exceeded(
+                    shard_sheets + 1, shard_bytes + est_bytes, shard_images + n_images
+                ):
+                    book.close()
+                    files.append(book.output_path)
+                    book = open_combined_book(template_path, shard_path(len(files) + 1), engine)
+                    shard_sheets = shard_bytes = shard_images = 0
+
+                fallback = os.path.splitext(label)[0]
+                design_numbers = []
+
+                def _name(design_number: str) -> str:
+                    design_numbers.append(design_number)
+                    return unique_sheet_name(design_number or fallback, sheet_names_used)
+
+                try:
+                    sheet_name = book.add_sheet(result, _name)
+                    shard_sheets += 1
+                    shard_bytes += est_bytes
+                    shard_images += n_images
+                    entries.append((design_numbers[0], len(files) + 1, sheet_name, label))
+                except Exception as e:
+                    error = e
+            # 시트를 쓴 결과는 바로 놓아줌 (이미지 바이트 포함)
+            result = None
+
+            if error is None:
+                success_count += 1
+            else:
+                fail_count += 1
+            if timings is not None:
+                timings[idx] = parse_seconds.pop(idx, 0.0) + (time.perf_counter() - write_started)
+            if on_result is not None:
+                on_result(idx, total, label, sheet_name, error)
+
+        if shard_sheets:
+            book.close()
+            files.append(book.output_path)
+        else:
+            # 빈 파일(마지막 분할 / 모든 PDF 실패)은 만들지 않음
+            book.discard()
+    except BaseException:
+        book.discard()
+        for path in files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+
+    if not files:
+        return CombinedOutput(success_count, fail_count, [])
+    if len(files) == 1:
+        os.replace(files[0], output_path)
+        sheet_files = {sheet: output_path for _dn, _n, sheet, _label in entries}
+        return CombinedOutput(success_count, fail_count, [output_path], sheet_files=sheet_files)
+
+    write_shard_index(
+        index_path,
+        [(dn, os.path.basename(files[n - 1]), sheet, label) for dn, n, sheet, label in entries],
+    )
+    sheet_files = {sheet: files[n - 1] for _dn, n, sheet, _label in entries}
+    return CombinedOutput(success_count, fail_count, files, index_path, sheet_files)
+
+
+def fill_combined_workbook(
+    template_path: str,
+    pdf_paths: Sequence[str],
+    output_path: str,
+    labels: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[int, int, str, Optional[str], Optional[BaseException]], None]] = None,
+    engine: Optional[str] = None,
+) -> Tuple[int, int]:
+    """
+    복수 PDF → 하나의 엑셀 파일, PDF별 시트 (나누지 않음).
+    Returns: (success_count, fail_count)
+    """
+    out = fill_combined_workbooks(
+        template_path, pdf_paths, output_path,
+        labels=labels, workers=workers, on_result=on_result, engine=engine, limits=NO_SHARDING,
+    )
+    return out.success_count, out.fail_count
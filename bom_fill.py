@@ -0,0 +1,257 @@
+"""
+bom-fill: GUI 없이 쓰는 배치 실행 (야간 수집 등 서버 자동화용)
+- 양식 + PDF(파일/glob/폴더) → 출력 폴더
+- per-file: PDF마다 <PDF이름>_filled.xlsx (fill_template, 워커 프로세스 병렬)
+- combined: BOM_combined_filled.xlsx 하나, PDF별 시트 (batch.fill_combined_workbooks, 크면 파일 분할 + 인덱스)
+- 끝나면 PDF별 소요 시간/실패 내용을 JSON 요약으로 출력 (stdout 또는 --summary 파일)
+  PDF 레코드: pdf / status(ok, failed, skipped, discarded) / output / sheet / seconds / error (두 모드 공통)
+  discarded: combined --fail-fast로 중단되어 이미 쓴 시트가 합본과 함께 지워진 PDF
+
+사용법:
+  python bom_fill.py -t 양식.xlsx -o out/ [--mode per-file|combined] [--workers N] [--fail-fast]
+                     [--engine openpyxl|xml] [--summary summary.json] <pdf/glob/폴더> [...]
+  python main.py <위와 같은 인자>   (인자가 있으면 GUI 대신 실행)
+  종료 코드: 0 모두 성공 / 1 실패 있음 / 2 입력 오류
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+# 일부 PyMuPDF 버전은 import 시 stdout에 경고를 출력 → stdout JSON 요약과 섞이지 않도록 stderr로
+with contextlib.redirect_stdout(sys.stderr):
+    import batch
+    from batch import fill_combined_workbooks
+    from excel_writer import fill_template
+
+COMBINED_NAME = "BOM_combined_filled.xlsx"
+
+
+class _FailFast(Exception):
+    """--fail-fast: 첫 실패에서 합본 배치 중단."""
+
+
+def expand_inputs(args: List[str]) -> List[str]:
+    """파일 / glob(** 포함) / 폴더(안의 *.pdf) → PDF 경로 목록 (입력 순서 유지, 중복 경로 제거)."""
+    paths: List[str] = []
+    for arg in args:
+        if os.path.isdir(arg):
+            found = sorted(
+                os.path.join(arg, name) for name in os.listdir(arg) if name.lower().endswith(".pdf")
+            )
+        else:
+            found = sorted(glob.glob(arg, recursive=True)) or [arg]
+        paths.extend(found)
+    return list(dict.fromkeys(paths))
+
+
+def per_file_output_names(pdf_paths: List[str]) -> List[str]:
+    """<PDF이름>_filled.xlsx (GUI와 같은 이름), 이름이 겹치면 _1, _2 ... 접미사."""
+    used = set()
+    names = []
+    for p in pdf_paths:
+        base = os.path.splitext(os.path.basename(p))[0]
+        name = f"{base}_filled.xlsx"
+        counter = 1
+        while name in used:
+            name = f"{base}_{counter}_filled.xlsx"
+            counter += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def _fill_one(
+    template_path: str, pdf_path: str, output_path: str, engine: Optional[str]
+) -> Tuple[float, Optional[BaseException]]:
+    """(소요 초, 예외). 워커 안에서 시간을 재므로 실패한 PDF도 시간이 남음."""
+    t = time.perf_counter()
+    try:
+        fill_template(template_path, pdf_path, output_path, engine=engine)
+        error = None
+    except Exception as e:
+        error = e
+    return time.perf_counter() - t, error
+
+
+def _error_text(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _new_records(pdf_paths: List[str]) -> List[Dict]:
+    # 두 모드 공통 레코드 (per-file은 sheet 없음)
+    return [
+        {"pdf": p, "status": "skipped", "output": None, "sheet": None, "seconds": None, "error": None}
+        for p in pdf_paths
+    ]
+
+
+def run_per_file(
+    template_path: str,
+    pdf_paths: List[str],
+    output_dir: str,
+    workers: int,
+    fail_fast: bool,
+    engine: Optional[str],
+) -> List[Dict]:
+    outputs = [os.path.join(output_dir, n) for n in per_file_output_names(pdf_paths)]
+    records = _new_records(pdf_paths)
+
+    def _record(i: int, seconds: Optional[float], error: Optional[BaseException]):
+        rec = records[i]
+        if seconds is not None:
+            rec["seconds"] = round(seconds, 3)
+        if error is None:
+            rec.update(status="ok", output=outputs[i])
+        else:
+            rec.update(status="failed", error=_error_text(error))
+
+    if workers <= 1:
+        for i, (pdf, out) in enumerate(zip(pdf_paths, outputs)):
+            seconds, error = _fill_one(template_path, pdf, out, engine)
+            _record(i, seconds, error)
+            if error is not None and fail_fast:
+                break
+        return records
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=batch.init_worker) as pool:
+        futures = {
+            pool.submit(_fill_one, template_path, pdf, out, engine): i
+            for i, (pdf, out) in enumerate(zip(pdf_paths, outputs))
+        }
+        for fut in as_completed(futures):
+            if fut.cancelled():
+                continue
+            i = futures[fut]
+            try:
+                seconds, error = fut.result()
+            except Exception as e:
+                # 워커 프로세스 오류 (fill_template 밖): 시간 기록 없음
+                seconds, error = None, e
+            _record(i, seconds, error)
+            if error is not None and fail_fast:
+                # 아직 시작하지 않은 PDF는 건너뜀 (실행 중인 것은 끝까지 기록)
+                for other in futures:
+                    other.cancel()
+    return records
+
+
+def run_combined(
+    template_path: str,
+    pdf_paths: List[str],
+    output_dir: str,
+    workers: int,
+    fail_fast: bool,
+    engine: Optional[str],
+) -> Dict:
+    records = _new_records(pdf_paths)
+    # PDF별 소요 시간 (워커 파싱 + 시트 쓰기), on_result 전에 fill_combined_workbooks가 채움
+    timings: Dict[int, float] = {}
+
+    def _on_result(idx, total, label, sheet_name, error):
+        rec = records[idx - 1]
+        if idx in timings:
+            rec["seconds"] = round(timings[idx], 3)
+        if error is None:
+            rec.update(status="ok", sheet=sheet_name)
+        else:
+            rec.update(status="failed", error=_error_text(error))
+            if fail_fast:
+                raise _FailFast(label)
+
+    try:
+        out = fill_combined_workbooks(
+            template_path,
+            pdf_paths,
+            os.path.join(output_dir, COMBINED_NAME),
+            workers=workers,
+            on_result=_on_result,
+            engine=engine,
+            timings=timings,
+        )
+    except _FailFast:
+        # 중단한 합본 파일은 fill_combined_workbooks가 지우므로 이미 쓴 시트도 결과 없음
+        for rec in records:
+            if rec["status"] == "ok":
+                rec.update(status="discarded", sheet=None)
+        return {"outputs": [], "index": None, "pdfs": records}
+
+    for rec in records:
+        rec["output"] = out.sheet_files.get(rec["sheet"])
+    return {"outputs": out.files, "index": out.index_path, "pdfs": records}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bom-fill",
+        description="BOM PDF → Excel 양식 채우기 (GUI 없이 실행, JSON 요약 출력)",
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF 파일 / glob (** 가능) / 폴더")
+    parser.add_argument("-t", "--template", required=True, help="엑셀 양식 (.xlsx)")
+    parser.add_argument("-o", "--output-dir", required=True, help="출력 폴더 (없으면 만듦)")
+    parser.add_argument(
+        "--mode", choices=("per-file", "combined"), default="per-file",
+        help="per-file: PDF마다 파일 / combined: 합본 (PDF별 시트)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: BOM_BATCH_WORKERS 또는 CPU 수)")
+    parser.add_argument("--fail-fast", action="store_true", help="첫 실패에서 중단")
+    parser.add_argument("--engine", choices=("openpyxl", "xml"), default=None, help="writer 엔진 (기본: BOM_WRITER_ENGINE)")
+    parser.add_argument("--summary", default="-", help="JSON 요약 경로 (기본 '-': stdout)")
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    args = build_parser().parse_args(argv)
+    if not os.path.isfile(args.template):
+        print(f"양식 파일이 없습니다: {args.template}", file=sys.stderr)
+        return 2
+    pdf_paths = expand_inputs(args.inputs)
+    missing = [p for p in pdf_paths if not os.path.isfile(p)]
+    if not pdf_paths or missing:
+        print(f"PDF를 찾지 못했습니다: {', '.join(missing) or ' '.join(args.inputs)}", file=sys.stderr)
+        return 2
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    workers = args.workers if args.workers is not None else (batch.BATCH_WORKERS or os.cpu_count() or 1)
+    workers = max(1, min(workers, len(pdf_paths)))
+
+    started = time.perf_counter()
+    if args.mode == "combined":
+        result = run_combined(args.template, pdf_paths, args.output_dir, workers, args.fail_fast, args.engine)
+    else:
+        records = run_per_file(args.template, pdf_paths, args.output_dir, workers, args.fail_fast, args.engine)
+        result = {"outputs": [r["output"] for r in records if r["output"]], "index": None, "pdfs": records}
+
+    records = result["pdfs"]
+    summary = {
+        "template": args.template,
+        "mode": args.mode,
+        "engine": args.engine,
+        "workers": workers,
+        "output_dir": args.output_dir,
+        "total": len(records),
+        "succeeded": sum(r["status"] == "ok" for r in records),
+        "failed": sum(r["status"] == "failed" for r in records),
+        "skipped": sum(r["status"] == "skipped" for r in records),
+        "discarded": sum(r["status"] == "discarded" for r in records),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "outputs": result["outputs"],
+        "index": result["index"],
+        "pdfs": records,
+    }
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.summary == "-":
+        print(text)
+    else:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0 if summary["succeeded"] == summary["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
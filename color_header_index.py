@@ -0,0 +1,252 @@
+"""
+BOMColorMatrix 컬러 헤더 인덱스
+- BOM Details의 컬러 헤더/값을 ColorMatrix 전체 헤더로 매핑할 때 matrix 헤더를 매번 선형 탐색하지 않도록
+  한 번만 만들어 두는 인덱스
+  · CC Number(9자리+) → 헤더 해시맵
+  · 잘린 CC Number(앞자리 일부) → 전체 헤더 prefix trie
+  · 정규화 헤더 부분 문자열 매칭: Aho-Corasick 오토마톤(matrix 헤더 ⊂ 질의) + 연결 문자열 검색(질의 ⊂ matrix 헤더)
+- 매칭 결과는 기존 선형 탐색과 동일 (matrix 헤더 순서상 첫 번째 후보)
+- 질의 결과는 인스턴스 단위로 메모이즈 (같은 헤더 텍스트가 셀마다 반복됨)
+"""
+import re
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+from utils import clean_text, normalize_header
+
+_CC_WORD_RE = re.compile(r"\b(\d{9,})\b")
+_CC_ANY_RE = re.compile(r"(\d{9,})")
+_VALUE_SUFFIX_RE = re.compile(r"\s+\d{2,4}$")
+# 연결 문자열 구분자: normalize_header 결과(영숫자)에는 나오지 않는 문자
+_SEP = "\x00"
+
+
+def extract_cc_number(text: str) -> str:
+    """단어 경계가 있는 9자리 이상 CC Number (없으면 "")."""
+    m = _CC_WORD_RE.search(clean_text(text))
+    return m.group(1) if m else ""
+
+
+class _AhoCorasick:
+    """패턴 목록 중 질의 문자열에 부분 문자열로 포함된 패턴의 최소 인덱스를 찾는 오토마톤."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 노드에서 끝나는 (fail 링크 포함) 패턴 중 최소 인덱스
+        self._best: List[Optional[int]] = [None]
+        for idx, pat in enumerate(patterns):
+            if not pat:
+                continue
+            node = 0
+            for ch in pat:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                node = nxt
+            if self._best[node] is None or idx < self._best[node]:
+                self._best[node] = idx
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                fb = self._best[self._fail[nxt]]
+                if fb is not None and (self._best[nxt] is None or fb < self._best[nxt]):
+                    self._best[nxt] = fb
+                queue.append(nxt)
+
+    def min_match(self, text: str) -> Optional[int]:
+        best = None
+        node = 0
+        for ch in text:
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            b = self._best[node]
+            if b is not None and (best is None or b < best):
+                best = b
+                if best == 0:
+                    break
+        return best
+
+
+class _PrefixTrie:
+    """CC Number prefix trie. 노드마다 그 아래(더 긴) CC Number 중 삽입 순서가 가장 빠른 것을 보관."""
+
+    def __init__(self):
+        self._children: List[Dict[str, int]] = [{}]
+        self._first_below: List[Optional[int]] = [None]
+
+    def insert(self, key: str, order: int):
+        node = 0
+        for ch in key:
+            if self._first_below[node] is None or order < self._first_below[node]:
+                self._first_below[node] = order
+            nxt = self._children[node].get(ch)
+            if nxt is None:
+                nxt = len(self._children)
+                self._children[node][ch] = nxt
+                self._children.append({})
+                self._first_below.append(None)
+            node = nxt
+
+    def first_longer(self, prefix: str) -> Optional[int]:
+        """prefix로 시작하고 prefix보다 긴 key 중 가장 먼저 삽입된 것의 order."""
+        node = 0
+        for ch in prefix:
+            node = self._children[node].get(ch)
+            if node is None:
+                return None
+        return self._first_below[node]
+
+
+class ColorHeaderIndex:
+    """BOMColorMatrix 헤더 목록으로 한 번 만들어 모든 헤더 해석에 재사용."""
+
+    def __init__(self, matrix_headers: Sequence[str]):
+        self.headers: List[str] = list(matrix_headers)
+        self._norms: List[str] = [normalize_header(h) for h in self.headers]
+
+        # CC Number → 첫 번째 헤더
+        self._by_cc: Dict[str, str] = {}
+        for h in self.headers:
+            cc = extract_cc_number(h)
+            if cc:
+                self._by_cc.setdefault(cc, h)
+
+        # 잘린 CC Number 보정용 (경계 없는 9자리+ 숫자, 같은 CC는 마지막 헤더가 대표)
+        self._trunc_ccs: List[str] = []
+        self._trunc_headers: Dict[str, str] = {}
+        for h in self.headers:
+            m = _CC_ANY_RE.search(h)
+            if m:
+                cc = m.group(1)
+                if cc not in self._trunc_headers:
+                    self._trunc_ccs.append(cc)
+                self._trunc_headers[cc] = h
+        self._trie = _PrefixTrie()
+        for order, cc in enumerate(self._trunc_ccs):
+            self._trie.insert(cc, order)
+
+        # 정규화 헤더 부분 문자열 매칭
+        self._empty_norm_idx: Optional[int] = next((i for i, n in enumerate(self._norms) if not n), None)
+        self._automaton = _AhoCorasick(self._norms)
+        self._joined = _SEP.join(self._norms)
+        self._starts: List[int] = []
+        pos = 0
+        for n in self._norms:
+            self._starts.append(pos)
+            pos += len(n) + 1
+
+        self._tango_header = next(
+            (
+                h for h, hn in zip(self.headers, self._norms)
+                if ("seasalt" in hn and "blue" in hn) or ("seasaltwblue" in hn)
+            ),
+            "",
+        )
+
+        self._header_memo: Dict[str, str] = {}
+        self._value_memo: Dict[str, str] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.headers)
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    # ── 부분 문자열 ─────────────────────────────────────────
+
+    def _first_containing(self, norm: str) -> Optional[int]:
+        """norm을 부분 문자열로 포함하는 첫 번째 matrix 헤더 인덱스."""
+        if not norm:
+            return 0 if self.headers else None
+        pos = self._joined.find(norm)
+        if pos < 0:
+            return None
+        # 구분자가 영숫자가 아니므로 매칭은 한 헤더 안에 있음
+        lo, hi = 0, len(self._starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._starts[mid] <= pos:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def _first_contained(self, norm: str) -> Optional[int]:
+        """norm 안에 부분 문자열로 들어 있는 첫 번째 matrix 헤더 인덱스."""
+        found = self._automaton.min_match(norm)
+        if self._empty_norm_idx is not None and (found is None or self._empty_norm_idx < found):
+            found = self._empty_norm_idx
+        return found
+
+    # ── 질의 ────────────────────────────────────────────────
+
+    def map_header(self, header_txt: str) -> str:
+        """
+        BOM Details 컬러 헤더 → matrix 헤더.
+        CC Number가 같으면 우선, 아니면 정규화 헤더 상호 포함 관계로 매칭.
+        """
+        if not header_txt or not self.headers:
+            return ""
+        cached = self._header_memo.get(header_txt)
+        if cached is not None:
+            return cached
+
+        result = ""
+        cc = extract_cc_number(header_txt)
+        if cc:
+            result = self._by_cc.get(cc, "")
+        if not result:
+            hn = normalize_header(header_txt)
+            if hn:
+                cands = [i for i in (self._first_containing(hn), self._first_contained(hn)) if i is not None]
+                if cands:
+                    result = self.headers[min(cands)]
+
+        self._header_memo[header_txt] = result
+        return result
+
+    def map_value(self, value: str) -> str:
+        """컬러 셀 값(예: 'Navy 10') → matrix 헤더 (컬러 이름이 헤더에 포함되는 경우)."""
+        v = clean_text(value)
+        if not v or not self.headers:
+            return ""
+        cached = self._value_memo.get(v)
+        if cached is not None:
+            return cached
+
+        result = ""
+        base = _VALUE_SUFFIX_RE.sub("", v).strip()
+        base_norm = normalize_header(base) if base else ""
+        if base_norm:
+            i = self._first_containing(base_norm)
+            if i is not None:
+                result = self.headers[i]
+        if not result and "tango" in v.lower():
+            result = self._tango_header
+
+        self._value_memo[v] = result
+        return result
+
+    def complete_truncated_cc(self, partial: str) -> str:
+        """잘린 CC Number(앞자리) → 그 숫자로 시작하는 더 긴 CC Number를 가진 matrix 헤더."""
+        order = self._trie.first_longer(partial)
+        if order is None:
+            return ""
+        return self._trunc_headers[self._trunc_ccs[order]]
+
+    @property
+    def has_cc_numbers(self) -> bool:
+        return bool(self._trunc_ccs)
@@ -2,10 +2,10 @@
 Excel 템플릿 탐색 및 스타일 관련 헬퍼
 - Master 라벨 위치 찾기
 - BOM 헤더 행/열 매핑
-- 행 스타일 복사, 행 용량 확보
+- 행 스타일 복사 (스타일 팔레트), 행 용량 확보
 - 열 너비 자동 조정
 """
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from copy import copy
 
 from openpyxl.worksheet.worksheet import Worksheet
@@ -91,24 +91,38 @@ def find_bom_header_row_and_cols(ws: Worksheet) -> Tuple[int, Dict[str, int]]:
     raise ValueError("템플릿에서 BOM Details 헤더 행(Product/Material Name/.../Supplier [Allocate])을 찾지 못했습니다.")
 
 
-def copy_row_style(ws: Worksheet, src_row: int, dst_row: int, start_col: int, end_col: int, color_base_col: int):
-    """Copy styles from src_row to dst_row between start_col~end_col."""
+# ----------------------------
+# 스타일 팔레트
+# ----------------------------
+# cell._style(StyleArray)은 워크북에 등록된 font/border/fill/number_format/protection/alignment
+# 테이블의 id 묶음이므로, 같은 워크북 안에서는 이 배열만 복사하면 스타일 객체를 새로 만들지 않고
+# 기존 등록 스타일을 그대로 공유함 (font/border/... 를 각각 copy()해서 다시 등록한 결과와 동일)
+StylePalette = Dict[int, object]
+
+
+def row_style_palette(ws: Worksheet, row: int, start_col: int, end_col: int) -> StylePalette:
+    """row의 start_col~end_col 스타일 id 묶음을 한 번만 캡처."""
+    return {c: copy(ws.cell(row, c)._style) for c in range(start_col, end_col + 1)}
+
+
+def apply_style_palette(ws: Worksheet, row: int, palette: StylePalette):
+    """캡처한 스타일 id 묶음을 row의 같은 컬럼들에 지정."""
+    for c, style in palette.items():
+        ws.cell(row, c)._style = copy(style)
+
+
+def copy_row_style(ws: Worksheet, src_row: int, dst_row: int, start_col: int, end_col: int, color_base_col: int,
+                   palette: Optional[StylePalette] = None):
+    """
+    Copy styles from src_row to dst_row between start_col~end_col.
+    palette: row_style_palette(ws, src_row, start_col, end_col) (여러 행에 반복 적용 시 한 번만 캡처)
+    """
     if src_row in ws.row_dimensions:
         ws.row_dimensions[dst_row].height = ws.row_dimensions[src_row].height
 
-    for c in range(start_col, end_col + 1):
-        src_cell = ws.cell(src_row, c)
-        if src_cell is None:
-            src_cell = ws.cell(src_row, color_base_col)
-
-        dst_cell = ws.cell(dst_row, c)
-        dst_cell._style = copy(src_cell._style)
-        dst_cell.font = copy(src_cell.font)
-        dst_cell.border = copy(src_cell.border)
-        dst_cell.fill = copy(src_cell.fill)
-        dst_cell.number_format = src_cell.number_format
-        dst_cell.protection = copy(src_cell.protection)
-        dst_cell.alignment = copy(src_cell.alignment)
+    if palette is None:
+        palette = row_style_palette(ws, src_row, start_col, end_col)
+    apply_style_palette(ws, dst_row, palette)
 
 
 def ensure_bom_rows_capacity(
@@ -118,16 +132,22 @@ def ensure_bom_rows_capacity(
     bom_start_col: int,
     style_end_col: int,
     color_base_col: int,
+    max_existing_row: Optional[int] = None,
+    palette: Optional[StylePalette] = None,
 ):
-    """Ensure there are at least `needed_rows` writable rows starting at start_row."""
+    """
+    Ensure there are at least `needed_rows` writable rows starting at start_row.
+    max_existing_row / palette: TemplateLayout에서 미리 계산한 값 (없으면 시트를 스캔)
+    """
     if needed_rows <= 0:
         return
 
-    max_existing_row = start_row - 1
-    for (r, c) in ws._cells.keys():
-        if r >= start_row and bom_start_col <= c <= style_end_col:
-            if r > max_existing_row:
-                max_existing_row = r
+    if max_existing_row is None:
+        max_existing_row = start_row - 1
+        for (r, c) in ws._cells.keys():
+            if r >= start_row and bom_start_col <= c <= style_end_col:
+                if r > max_existing_row:
+                    max_existing_row = r
 
     existing_capacity = max(0, max_existing_row - start_row + 1)
 
@@ -139,6 +159,8 @@ def ensure_bom_rows_capacity(
 
     ws.insert_rows(insert_at, amount=to_add)
 
+    if palette is None:
+        palette = row_style_palette(ws, start_row, bom_start_col, style_end_col)
     for i in range(to_add):
         dst = insert_at + i
         copy_row_style(
@@ -148,6 +170,7 @@ def ensure_bom_rows_capacity(
             start_col=bom_start_col,
             end_col=style_end_col,
             color_base_col=color_base_col,
+            palette=palette,
         )
 
 
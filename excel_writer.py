@@ -5,41 +5,64 @@ PDF에서 파싱한 데이터를 엑셀 양식에 채워넣는 핵심 로직
 import os
 import re
 from copy import copy
+from typing import Callable, Dict, List, Optional
 
-from openpyxl import load_workbook
 from openpyxl.styles import Alignment, Border
 from openpyxl.utils import get_column_letter
 
-from models import group_rows_by_material
-from pdf_parser import parse_master_from_pdf, extract_bom_rows_from_pdf
-from image_handler import insert_design_image_into_sheet, insert_bom_row_image
-from excel_template import (
-    find_master_value_cells,
-    find_bom_header_row_and_cols,
-    ensure_bom_rows_capacity,
-)
-
-
-def _has_any_border(cell) -> bool:
-    b = cell.border
-    if b is None:
-        return False
-    return any(
-        getattr(side, "style", None)
-        for side in (b.left, b.right, b.top, b.bottom)
-    )
+from models import ParseResult, column_ids, sheet_output_rows
+from pdf_parser import parse_pdf
+import parse_cache
+from parse_cache import parse_pdf_cached
+from image_handler import insert_design_image_png, insert_bom_row_image
+from pdf_session import PdfSource, open_session
+from excel_template import ensure_bom_rows_capacity
+from template_layout import TemplateLayout, compile_template_layout
+from template_pool import checkout_template
+from xlsx_patch_writer import load_xlsx_template
+
+# 단일 파일 출력 엔진: "openpyxl" (기본) / "xml" (양식 xlsx 직접 패치, xlsx_patch_writer)
+WRITER_ENGINE = os.environ.get("BOM_WRITER_ENGINE", "openpyxl")
 
 
-def _fill_sheet(ws, pdf_path: str) -> str:
+def _fill_sheet(ws, pdf: PdfSource, layout: Optional[TemplateLayout] = None) -> str:
     """
     워크시트 하나에 PDF BOM 데이터를 채워넣는 핵심 로직.
+    PDF는 한 번만 열어(PdfSession) 모든 추출 단계가 공유함.
+    layout: 양식 레이아웃 (없으면 ws에서 계산)
     Returns: design_number (시트 이름용)
     """
-    # 1) Find where to write master fields
-    master_cells = find_master_value_cells(ws)
+    if layout is None:
+        layout = compile_template_layout(ws)
+    # 템플릿에 Image 컬럼이 없으면 BOM 'Image' 컬럼 이미지는 추출하지 않음
+    return _write_parsed(pdf, layout.has_image_column, lambda result: write_sheet(ws, result, layout))
+
+
+def _write_parsed(pdf: PdfSource, bom_images: bool, write: Callable[[ParseResult], str]) -> str:
+    """PDF를 파싱해 write(result)에 넘김 (엔진 공통)."""
+    if isinstance(pdf, str) and parse_cache.CACHE_ENABLED:
+        # 경로로 받은 경우 내용 해시 기반 디스크 캐시 사용 (같은 PDF 재실행 시 PDF를 열지 않음)
+        return write(parse_pdf_cached(pdf, bom_images=bom_images))
+    with open_session(pdf) as session:
+        # 행 이미지는 시트에 실제로 삽입될 때 렌더링되므로 쓰기가 끝날 때까지 세션 유지
+        return write(parse_pdf(session, bom_images=bom_images))
 
-    # 2) Parse PDF master fields
-    master = parse_master_from_pdf(pdf_path)
+
+def write_sheet(ws, result: ParseResult, layout: Optional[TemplateLayout] = None) -> str:
+    """
+    파싱 결과(ParseResult)를 워크시트에 씀. PDF는 다시 읽지 않음.
+    layout: 양식 레이아웃 (template_layout_for). 양식을 복사한 시트면 그대로 재사용 가능,
+            없으면 ws에서 계산
+    Returns: design_number (시트 이름용)
+    """
+    master = result.master
+
+    # 1) Template layout (master cells / header / capacity)
+    if layout is None:
+        layout = compile_template_layout(ws)
+    else:
+        layout.prime(ws)
+    master_cells = layout.master_cells
 
     # 3) Write master
     ws.cell(*master_cells["design_number"]).value = master.get("design_number", "")
@@ -50,13 +73,13 @@ def _fill_sheet(ws, pdf_path: str) -> str:
 
     # 3.5) Insert Design Image
     try:
-        insert_design_image_into_sheet(ws, pdf_path)
+        insert_design_image_png(ws, result.design_image_png, layout.design_image_range)
     except Exception:
         pass
 
-    # 4) Find BOM header row + columns
-    header_row, col_map = find_bom_header_row_and_cols(ws)
-    start_row = header_row + 1
+    # 4) BOM header row + columns
+    header_row, col_map = layout.header_row, layout.col_map
+    start_row = layout.start_row
 
     c_category = col_map.get("category")
     c_product = col_map["product"]
@@ -70,59 +93,31 @@ def _fill_sheet(ws, pdf_path: str) -> str:
     if c_supplier is None:
         c_supplier = c_quality
 
-    c_color_start = c_supplier + 1
-
-    # 5) Parse BOM table rows + color headers
-    raw_rows, color_headers = extract_bom_rows_from_pdf(pdf_path)
-    grouped_rows = group_rows_by_material(raw_rows)
+    c_color_start = layout.c_color_start
 
+    # 5) BOM table rows + color headers
+    color_headers = result.color_headers
     # Insert subtitle rows when section starts.
-    output_rows = []
-    prev_cat_norm = ""
-    subtitle_by_cat = {
-        "packaging and labels": "Packaging and Labels",
-    }
-    for r in grouped_rows:
-        cat_norm = (r.category or "").strip().lower()
-        if cat_norm in subtitle_by_cat and prev_cat_norm != cat_norm:
-            output_rows.append(("subtitle", subtitle_by_cat[cat_norm]))
-        output_rows.append(("data", r))
-        prev_cat_norm = cat_norm
+    output_rows = sheet_output_rows(result.rows)
 
     # 6) Determine color columns count
     num_color_cols = len(color_headers or [])
+    # 컬럼 위치 → BomRow.colors 컬러 id, 컬러 id → 컬럼 위치들
+    color_col_ids = column_ids(color_headers or [])
+    color_cols_by_id: Dict[int, List[int]] = {}
+    for j, col_id in enumerate(color_col_ids):
+        color_cols_by_id.setdefault(col_id, []).append(j)
     style_start_col = c_category if c_category else c_product
     style_end_base = max(c_supplier, c_quality, c_image or 0)
 
-    # Detect original template table end column from header/body border footprint.
-    template_end_col = style_end_base
-    blank_streak = 0
-    scan_row_end = min(ws.max_row, start_row + 2)
-    for cc in range(style_start_col, ws.max_column + 1):
-        marked = False
-        for rr in range(header_row, scan_row_end + 1):
-            cell = ws.cell(rr, cc)
-            if _has_any_border(cell) or bool(cell.value):
-                marked = True
-                break
-        if marked:
-            template_end_col = cc
-            blank_streak = 0
-        else:
-            blank_streak += 1
-            if cc > template_end_col and blank_streak >= 8:
-                break
-
-    original_color_capacity = max(0, template_end_col - c_color_start + 1)
+    # Original template table end column (header/body border footprint).
+    template_end_col = layout.template_end_col
+    original_color_capacity = layout.color_capacity
     dynamic_end_col = c_color_start + max(num_color_cols - 1, 0)
     style_end_col = max(style_end_base, template_end_col, dynamic_end_col)
 
     # Capacity originally prepared in template (before inserting extra rows).
-    max_existing_row = start_row - 1
-    for (r, c) in ws._cells.keys():
-        if r >= start_row and style_start_col <= c <= template_end_col and r > max_existing_row:
-            max_existing_row = r
-    original_capacity = max(0, max_existing_row - start_row + 1)
+    original_capacity = layout.row_capacity
 
     # 6.5) Write color headers
     if num_color_cols > 0:
@@ -132,12 +127,6 @@ def _fill_sheet(ws, pdf_path: str) -> str:
             cell = ws.cell(header_row, cc)
             if cell._style is None or cell._style == ws.cell(1, 1)._style:
                 cell._style = copy(base_header_cell._style)
-                cell.font = copy(base_header_cell.font)
-                cell.border = copy(base_header_cell.border)
-                cell.fill = copy(base_header_cell.fill)
-                cell.number_format = base_header_cell.number_format
-                cell.protection = copy(base_header_cell.protection)
-                cell.alignment = copy(base_header_cell.alignment)
 
             cell.value = htxt
             cell.alignment = Alignment(wrap_text=True, vertical="center", horizontal="center")
@@ -150,6 +139,8 @@ def _fill_sheet(ws, pdf_path: str) -> str:
         bom_start_col=style_start_col,
         style_end_col=style_end_col,
         color_base_col=c_supplier,
+        max_existing_row=layout.max_existing_row(style_start_col, style_end_col),
+        palette=layout.start_row_palette(style_start_col, style_end_col),
     )
 
     # If color columns exceed template slots, force expanded column width to 36.13
@@ -159,18 +150,12 @@ def _fill_sheet(ws, pdf_path: str) -> str:
         extra_end = c_color_start + num_color_cols - 1
         src_col_for_style = c_color_start + original_color_capacity - 1 if original_color_capacity > 0 else c_supplier
         style_row_end = max(start_row + max(original_capacity, len(output_rows)) - 1, header_row)
+        # 기준 컬럼의 행별 스타일 id를 한 번만 캡처해 추가 컬럼 전체에 지정
+        src_styles = [ws.cell(rr, src_col_for_style)._style for rr in range(header_row, style_row_end + 1)]
         for cc in range(extra_start, extra_end + 1):
             ws.column_dimensions[get_column_letter(cc)].width = 36.13
-            for rr in range(header_row, style_row_end + 1):
-                src = ws.cell(rr, src_col_for_style)
-                dst = ws.cell(rr, cc)
-                dst._style = copy(src._style)
-                dst.font = copy(src.font)
-                dst.border = copy(src.border)
-                dst.fill = copy(src.fill)
-                dst.number_format = src.number_format
-                dst.protection = copy(src.protection)
-                dst.alignment = copy(src.alignment)
+            for rr, style in enumerate(src_styles, start=header_row):
+                ws.cell(rr, cc)._style = copy(style)
 
     # 8) Write BOM details rows
     for i, row_item in enumerate(output_rows):
@@ -204,15 +189,17 @@ def _fill_sheet(ws, pdf_path: str) -> str:
             except Exception:
                 pass
 
-        for j, htxt in enumerate(color_headers):
-            v = (r.colors or {}).get(htxt, "")
+        for col_id, v in (r.colors or {}).items():
             if v:
-                ws.cell(rr, c_color_start + j).value = v
-            if getattr(r, "color_images", None) and htxt in r.color_images:
-                try:
-                    insert_bom_row_image(ws, rr, c_color_start + j, r.color_images[htxt])
-                except Exception:
-                    pass
+                for j in color_cols_by_id.get(col_id, ()):
+                    ws.cell(rr, c_color_start + j).value = v
+        if getattr(r, "color_images", None):
+            for j, col_id in enumerate(color_col_ids):
+                if col_id in r.color_images:
+                    try:
+                        insert_bom_row_image(ws, rr, c_color_start + j, r.color_images[col_id])
+                    except Exception:
+                        pass
 
     # 9) If parsed data is smaller than template capacity, clean remaining area.
     #    Keep layout size, but remove borders for empty rows.
@@ -257,10 +244,21 @@ def fill_template(
     template_path: str,
     pdf_path: str,
     output_path: str,
+    engine: Optional[str] = None,
 ) -> str:
-    """단일 PDF → 단일 Excel 파일 (기존 동작 유지)"""
-    wb = load_workbook(template_path)
-    ws = wb.active
-    _fill_sheet(ws, pdf_path)
+    """
+    단일 PDF → 단일 Excel 파일 (기존 동작 유지)
+    engine: "openpyxl" / "xml" (없으면 BOM_WRITER_ENGINE)
+    """
+    engine = engine or WRITER_ENGINE
+    if engine == "xml":
+        tpl = load_xlsx_template(template_path)
+        _write_parsed(pdf_path, tpl.layout.has_image_column, lambda result: tpl.write(result, output_path))
+        return output_path
+    if engine != "openpyxl":
+        raise ValueError(f"알 수 없는 writer 엔진: {engine}")
+    # 양식은 템플릿 풀에서 복제 (같은 양식을 매번 파싱하지 않음)
+    wb, layout = checkout_template(template_path)
+    _fill_sheet(wb.active, pdf_path, layout)
     wb.save(output_path)
     return output_path
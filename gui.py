@@ -5,9 +5,8 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
-from openpyxl import load_workbook
-
-from excel_writer import fill_template, fill_sheet, sanitize_sheet_name
+from excel_writer import fill_template
+from batch import fill_combined_workbooks
 
 
 class App(tk.Tk):
@@ -126,56 +125,27 @@ class App(tk.Tk):
                 self._set_progress(1, 1)
                 self._log(f"   ✅ 완료: {os.path.basename(saved)}")
             else:
-                # 복수 PDF → 하나의 파일, 시트별 분리
+                # 복수 PDF → 하나의 파일, 시트별 분리 (너무 크면 여러 파일 + 인덱스)
+                # 파싱은 워커 프로세스에서 병렬, 시트는 선택 순서대로 기록
                 output_path = os.path.join(output_dir, "BOM_combined_filled.xlsx")
-
-                wb = load_workbook(self.saved_template)
-                original_sheet_names = list(wb.sheetnames)
-                template_ws = wb.active
-
-                sheet_names_used = set()
-                success_count = 0
-                fail_count = 0
-
-                for idx, pdf_path in enumerate(paths, 1):
-                    self._set_progress(idx - 1, total)
-                    self._log(f"📄 [{idx}/{total}] 처리 중: {os.path.basename(pdf_path)}")
-
-                    try:
-                        new_ws = wb.copy_worksheet(template_ws)
-                        design_number = fill_sheet(new_ws, pdf_path)
-
-                        # 시트 이름 결정
-                        name = design_number or os.path.splitext(os.path.basename(pdf_path))[0]
-                        name = sanitize_sheet_name(name)
-
-                        base_name = name
-                        counter = 1
-                        while name in sheet_names_used:
-                            suffix = f"_{counter}"
-                            name = sanitize_sheet_name(base_name[:31 - len(suffix)] + suffix)
-                            counter += 1
-                        sheet_names_used.add(name)
-                        new_ws.title = name
-
-                        self._log(f"   ✅ 완료 → 시트: {name}")
-                        success_count += 1
-
-                    except Exception as e:
-                        self._log(f"   ❌ 실패: {str(e)}")
-                        fail_count += 1
-
-                    self._set_progress(idx, total)
-
-                # 원본 템플릿 시트 모두 삭제
-                for sn in original_sheet_names:
-                    if sn in wb.sheetnames:
-                        wb.remove(wb[sn])
-
-                wb.save(output_path)
-
-                if fail_count > 0:
-                    self._log(f"\n   ⚠️ 성공: {success_count}개 / 실패: {fail_count}개")
+                self._set_progress(0, total)
+                out = fill_combined_workbooks(
+                    self.saved_template,
+                    list(paths),
+                    output_path,
+                    on_result=self._on_batch_result,
+                )
+
+                if not out.files:
+                    raise RuntimeError(f"모든 PDF({out.fail_count}개) 처리에 실패해 합본 파일을 만들지 못했습니다.")
+                if out.fail_count > 0:
+                    self._log(f"\n   ⚠️ 성공: {out.success_count}개 / 실패: {out.fail_count}개")
+                if out.index_path:
+                    self._log(f"\n   📚 {len(out.files)}개 파일로 나눠 저장:")
+                    for f in out.files:
+                        self._log(f"      - {os.path.basename(f)}")
+                    self._log(f"   🗂️ 인덱스: {os.path.basename(out.index_path)}")
+                    output_path = out.index_path
 
             self._log("\n" + "=" * 70)
             self._log(f"📊 작업 완료!")
@@ -189,6 +159,14 @@ class App(tk.Tk):
             self._log("=" * 70 + "\n")
             messagebox.showerror("오류", f"처리 중 오류 발생:\n\n{str(e)}")
 
+    def _on_batch_result(self, idx: int, total: int, label: str, sheet_name, error):
+        self._log(f"📄 [{idx}/{total}] 처리: {label}")
+        if error is None:
+            self._log(f"   ✅ 완료 → 시트: {sheet_name}")
+        else:
+            self._log(f"   ❌ 실패: {str(error)}")
+        self._set_progress(idx, total)
+
     def _log(self, msg: str):
         self.log.insert("end", msg + "\n")
         self.log.see("end")
@@ -3,17 +3,25 @@
 - Design Image: PDF ì²« íŽ˜ì´ì§€ ìŠ¤ì¼€ì¹˜ ì¶”ì¶œ â†’ Excel ì‚½ìž…
 - BOM Row Image: Packaging/Graphic ì„¹ì…˜ ì´ë¯¸ì§€ ì¶”ì¶œ â†’ Excel ì…€ ì‚½ìž…
 """
+import os
 import re
 from io import BytesIO
 from typing import Dict, List, Optional, Tuple
 
-import pdfplumber
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.utils import get_column_letter
 from openpyxl.drawing.image import Image as OpenPyxlImage
 
-from utils import clean_text, normalize_header, clean_text_keep_newlines, format_color_header_text
-from models import section_from_cell_text
+from utils import (
+    clean_text,
+    normalize_header,
+    clean_text_keep_newlines,
+    clean_row_keep_newlines,
+    format_color_header_text,
+)
+from models import column_ids, material_group_key, section_from_cell_text
+from pdf_session import PageTable, PdfSession, PdfSource, open_session, visit_page_tables
+from spatial_index import RectIndex
 
 try:
     import fitz as _fitz  # PyMuPDF – 렌더링 없이 임베디드 이미지 직접 추출
@@ -26,25 +34,40 @@ TARGET_BOM_IMAGE_WIDTH_CM = 1.88
 _PX_PER_INCH = 96.0
 _CM_PER_INCH = 2.54
 
-# Full-page render cache (avoids re-rendering the same page for each cell)
-_page_render_cache: Dict = {}
+# 세션 캐시 용량 상한 (MB, 환경변수로 조정)
+# 페이지 전체 렌더: 200dpi A4 한 장이 약 12MB
+PAGE_RENDER_CACHE_MAX_BYTES = int(float(os.environ.get("BOM_PAGE_RENDER_CACHE_MB", "128")) * 1024 * 1024)
+FITZ_IMAGE_CACHE_MAX_BYTES = int(float(os.environ.get("BOM_FITZ_IMAGE_CACHE_MB", "64")) * 1024 * 1024)
 
+_CC_WORD_RE = re.compile(r"\b(\d{9,})\b")
 
-def _crop_cell_image(page, bbox, resolution=200):
+
+def _pil_nbytes(pil_img) -> int:
+    w, h = pil_img.size
+    return w * h * len(pil_img.getbands())
+
+
+def _page_images_nbytes(images) -> int:
+    # (rect, xref) / RectIndex 항목당 대략적인 크기 (float 4개 + int)
+    return 64 * max(1, len(images))
+
+
+def _crop_cell_image(page, bbox, resolution=200, session: Optional[PdfSession] = None):
     """
     Full-page render → pixel-level crop.
     page.crop(bbox).to_image() 방식은 인접 셀의 임베디드 이미지를
     정확히 분리하지 못하는 버그가 있어, 전체 페이지를 한 번 렌더링 후
     픽셀 좌표로 크롭하는 방식으로 대체.
+    session이 있으면 전체 페이지 렌더를 세션 캐시(용량 제한 LRU)에 보관해 셀마다 재렌더링하지 않음.
     """
-    global _page_render_cache
-    cache_key = (id(page), resolution)
-
-    if cache_key not in _page_render_cache:
-        _page_render_cache.clear()
-        _page_render_cache[cache_key] = page.to_image(resolution=resolution).original
-
-    full_img = _page_render_cache[cache_key]
+    if session is None:
+        full_img = page.to_image(resolution=resolution).original
+    else:
+        cache = session.caches.get("page_render", PAGE_RENDER_CACHE_MAX_BYTES, _pil_nbytes)
+        full_img = cache.get_or_create(
+            (page.page_number, resolution),
+            lambda: page.to_image(resolution=resolution).original,
+        )
 
     x0, top, x1, bottom = bbox
     page_w = float(page.width)
@@ -68,71 +91,91 @@ def _crop_cell_image(page, bbox, resolution=200):
 # ----------------------------
 # PyMuPDF 직접 이미지 추출 (플랫폼 독립)
 # ----------------------------
-_fitz_image_cache: Dict[Tuple[str, int], List[Tuple[Tuple[float, float, float, float], bytes]]] = {}
-
-
 def _get_fitz_images_for_page(
-    pdf_path: str, page_idx: int
-) -> List[Tuple[Tuple[float, float, float, float], bytes]]:
+    pdf: PdfSource, page_idx: int
+) -> List[Tuple[Tuple[float, float, float, float], int]]:
     """
-    PyMuPDF로 페이지의 모든 임베디드 이미지를 추출.
-    렌더링 없이 PDF 내부의 원본 이미지 데이터를 직접 가져오므로
-    OS/백엔드에 무관하게 동일한 결과를 보장.
-    Returns: [((x0, y0, x1, y1), png_bytes), ...]
+    PyMuPDF로 페이지의 임베디드 이미지 위치 목록을 만듦.
+    렌더링/디코딩 없이 xref별 배치 rect만 읽으며, 실제 이미지 데이터는
+    선택된 이미지에 대해서만 _fitz_xref_png()로 가져옴.
+    Returns: [((x0, y0, x1, y1), xref), ...]
     """
     if _fitz is None:
         return []
-    cache_key = (pdf_path, page_idx)
-    if cache_key in _fitz_image_cache:
-        return _fitz_image_cache[cache_key]
-
-    results: List[Tuple[Tuple[float, float, float, float], bytes]] = []
-    doc = None
+    with open_session(pdf) as session:
+        return _get_fitz_images_for_session_page(session, page_idx)
+
+
+def _get_fitz_images_for_session_page(
+    session: PdfSession, page_idx: int
+) -> List[Tuple[Tuple[float, float, float, float], int]]:
+    cache = session.caches.get("fitz_page_images", FITZ_IMAGE_CACHE_MAX_BYTES, _page_images_nbytes)
+    cached = cache.get(page_idx)
+    if cached is not None:
+        return cached
+
+    results: List[Tuple[Tuple[float, float, float, float], int]] = []
+    doc = session.fitz_doc
+    if doc is None:
+        return results
     try:
-        doc = _fitz.open(pdf_path)
         page = doc[page_idx]
-        img_list = page.get_images(full=True)
         processed_xrefs: set = set()
 
-        for img_info in img_list:
+        for img_info in page.get_images(full=True):
             xref = img_info[0]
             if xref in processed_xrefs:
                 continue
             processed_xrefs.add(xref)
             try:
-                rects = page.get_image_rects(xref)
-                if not rects:
-                    continue
-                base = doc.extract_image(xref)
-                if not base or not base.get("image"):
-                    continue
-                raw = base["image"]
-                pil = PILImage.open(BytesIO(raw))
-                if pil.mode == "CMYK":
-                    pil = pil.convert("RGB")
-                elif pil.mode not in ("RGB", "RGBA", "L"):
-                    pil = pil.convert("RGB")
-                buf = BytesIO()
-                pil.save(buf, format="PNG")
-                png = buf.getvalue()
-                for rect in rects:
+                for rect in page.get_image_rects(xref) or []:
                     if rect.is_empty or rect.is_infinite:
                         continue
-                    results.append(((rect.x0, rect.y0, rect.x1, rect.y1), png))
+                    results.append(((rect.x0, rect.y0, rect.x1, rect.y1), xref))
             except Exception:
                 continue
     except Exception:
         pass
-    finally:
-        if doc:
-            doc.close()
 
-    _fitz_image_cache[cache_key] = results
+    cache.put(page_idx, results)
     return results
 
 
+def _decode_fitz_xref(doc, xref: int) -> Optional[bytes]:
+    base = doc.extract_image(xref)
+    if not base or not base.get("image"):
+        return None
+    pil = PILImage.open(BytesIO(base["image"]))
+    if pil.mode == "CMYK":
+        pil = pil.convert("RGB")
+    elif pil.mode not in ("RGB", "RGBA", "L"):
+        pil = pil.convert("RGB")
+    buf = BytesIO()
+    pil.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _fitz_xref_png(session: PdfSession, xref: int) -> Optional[bytes]:
+    """
+    xref 이미지 → PNG bytes.
+    같은 로고/스와치 XObject가 여러 페이지에 반복되므로 문서 단위(세션 캐시)로 xref당 한 번만 디코딩.
+    """
+    doc = session.fitz_doc
+    if doc is None:
+        return None
+    cache = session.caches.get("fitz_xref_png", FITZ_IMAGE_CACHE_MAX_BYTES, len)
+
+    def _decode():
+        try:
+            return _decode_fitz_xref(doc, xref)
+        except Exception:
+            return None
+
+    return cache.get_or_create(xref, _decode)
+
+
 def _find_fitz_image_for_bbox(
-    pdf_path: str,
+    pdf: PdfSource,
     page_idx: int,
     bbox: Tuple[float, float, float, float],
     min_overlap: float = 25.0,
@@ -140,40 +183,45 @@ def _find_fitz_image_for_bbox(
     """
     셀 bbox와 가장 많이 겹치는 임베디드 이미지를 PyMuPDF로 직접 추출.
     렌더링 기반이 아니므로 Windows/Linux 무관하게 올바른 이미지 반환.
+    겹침 점수 순으로 후보를 고른 뒤 선택된 xref만 디코딩 (실패하면 다음 후보).
     """
-    images = _get_fitz_images_for_page(pdf_path, page_idx)
-    if not images:
-        return None
-
-    x0, top, x1, bottom = bbox
-    cell_area = max(1.0, (x1 - x0) * (bottom - top))
-
-    best_score = 0.0
-    best_png: Optional[bytes] = None
-
-    for (ix0, iy0, ix1, iy1), png_bytes in images:
-        ow = max(0.0, min(x1, ix1) - max(x0, ix0))
-        oh = max(0.0, min(bottom, iy1) - max(top, iy0))
-        overlap = ow * oh
-        if overlap < min_overlap:
-            continue
-        img_area = max(1.0, (ix1 - ix0) * (iy1 - iy0))
-        score = overlap / min(cell_area, img_area)
-        if score > best_score:
-            best_score = score
-            best_png = png_bytes
+    with open_session(pdf) as session:
+        images = _get_fitz_images_for_page(session, page_idx)
+        if not images:
+            return None
+        index = session.caches.get(
+            "fitz_page_image_index", FITZ_IMAGE_CACHE_MAX_BYTES, _page_images_nbytes
+        ).get_or_create(page_idx, lambda: RectIndex([r for r, _xref in images]))
 
-    return best_png
+        x0, top, x1, bottom = bbox
+        cell_area = max(1.0, (x1 - x0) * (bottom - top))
+
+        scored: List[Tuple[float, int, int]] = []
+        for order in index.query(bbox):
+            (ix0, iy0, ix1, iy1), xref = images[order]
+            ow = max(0.0, min(x1, ix1) - max(x0, ix0))
+            oh = max(0.0, min(bottom, iy1) - max(top, iy0))
+            overlap = ow * oh
+            if overlap < min_overlap:
+                continue
+            img_area = max(1.0, (ix1 - ix0) * (iy1 - iy0))
+            score = overlap / min(cell_area, img_area)
+            if score > 0:
+                scored.append((score, order, xref))
+
+        # 점수 내림차순, 동점이면 먼저 나온 이미지 (기존 strict '>' 비교와 동일)
+        for _score, _order, xref in sorted(scored, key=lambda x: (-x[0], x[1])):
+            png_bytes = _fitz_xref_png(session, xref)
+            if png_bytes:
+                return png_bytes
+        return None
 
 
 # ----------------------------
 # MuPDF 렌더링 기반 셀 이미지 추출 (컬러 변환·벡터 등 모두 처리)
 # ----------------------------
-_fitz_doc_cache: Dict[str, object] = {}
-
-
 def _fitz_render_cell(
-    pdf_path: str,
+    session: PdfSession,
     page_idx: int,
     bbox: Tuple[float, float, float, float],
     dpi: int = 200,
@@ -183,19 +231,14 @@ def _fitz_render_cell(
     임베디드 이미지 추출(extract_image)과 달리 PDF의 컬러 변환,
     벡터 그래픽, Form XObject 등을 모두 정확히 렌더링.
     MuPDF는 C 라이브러리이므로 Windows/Linux 동일 결과 보장.
+    문서는 세션이 한 번만 열어 재사용함.
     """
     if _fitz is None:
         return None
     try:
-        if pdf_path not in _fitz_doc_cache:
-            for d in _fitz_doc_cache.values():
-                try:
-                    d.close()
-                except Exception:
-                    pass
-            _fitz_doc_cache.clear()
-            _fitz_doc_cache[pdf_path] = _fitz.open(pdf_path)
-        doc = _fitz_doc_cache[pdf_path]
+        doc = session.fitz_doc
+        if doc is None:
+            return None
         page = doc[page_idx]
         x0, top, x1, bottom = bbox
         clip = _fitz.Rect(x0, top, x1, bottom)
@@ -269,6 +312,26 @@ def _trim_pil_to_content(pil_img):
         return pil_img
 
 
+def _page_image_index(session: PdfSession, page_idx: int) -> RectIndex:
+    """pdfplumber page.images rect의 공간 인덱스 (페이지당 1회 생성, 세션 캐시)."""
+    def _build():
+        rects = []
+        try:
+            for im in (session.page(page_idx).images or []):
+                rects.append((
+                    float(im.get("x0", 0)),
+                    float(im.get("top", 0)),
+                    float(im.get("x1", 0)),
+                    float(im.get("bottom", 0)),
+                ))
+        except Exception:
+            rects = []
+        return RectIndex(rects)
+
+    cache = session.caches.get("page_image_index", FITZ_IMAGE_CACHE_MAX_BYTES, _page_images_nbytes)
+    return cache.get_or_create(page_idx, _build)
+
+
 def _has_embedded_image_in_bbox(page, bbox: Tuple[float, float, float, float]) -> bool:
     """Check if PDF has an embedded image overlapping the cell bbox."""
     try:
@@ -287,6 +350,27 @@ def _has_embedded_image_in_bbox(page, bbox: Tuple[float, float, float, float]) -
         return False
 
 
+def _embedded_image_cells(session: PdfSession, page_idx: int, table: PageTable) -> set:
+    """
+    테이블 전체 셀 bbox를 한 번에 조회해 임베디드 이미지가 겹치는 셀 (row, col) 집합을 반환.
+    _has_embedded_image_in_bbox와 같은 기준 (겹침 면적 > 25).
+    """
+    try:
+        index = _page_image_index(session, page_idx)
+        if not len(index):
+            return set()
+        coords = [
+            (r, c, bbox)
+            for r, row in enumerate(table.cells)
+            for c, bbox in enumerate(row)
+            if bbox
+        ]
+        flags = index.any_overlap_many([bbox for _r, _c, bbox in coords], 25.0)
+        return {(r, c) for (r, c, _bbox), hit in zip(coords, flags) if hit}
+    except Exception:
+        return set()
+
+
 def _is_blank(pil_img) -> bool:
     try:
         w, h = pil_img.size
@@ -382,16 +466,16 @@ def find_design_image_anchor_and_box(ws: Worksheet) -> Tuple[Tuple[int, int], Tu
     return (min_row, min_col), (max(1, width_px), max(1, height_px))
 
 
-def extract_design_image_from_pdf(pdf_path: str):
+def extract_design_image_from_pdf(pdf: PdfSource):
     """
     Extract the sketch image area from the first page of the PDF.
     Returns a PIL Image (or None if extraction fails).
     """
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if not pdf.pages:
+        with open_session(pdf) as session:
+            if not session.page_count:
                 return None
-            page = pdf.pages[0]
+            page = session.page(0)
             # 0) Prefer extracting the embedded image itself
             try:
                 page_images = page.images or []
@@ -417,7 +501,7 @@ def extract_design_image_from_pdf(pdf_path: str):
                             min(page.width, x1 + pad),
                             min(page.height, bottom + pad),
                         )
-                        im = _crop_cell_image(page, bbox, resolution=200)
+                        im = _crop_cell_image(page, bbox, resolution=200, session=session)
                         if im is None:
                             raise ValueError("empty crop")
                         im = _trim_pil_to_content(im)
@@ -426,7 +510,7 @@ def extract_design_image_from_pdf(pdf_path: str):
                 pass
 
             # 1) Fallback: locate by header text then crop
-            words = page.extract_words() or []
+            words = session.page_words(0)
 
             y_bottom = None
             for i in range(len(words) - 1):
@@ -460,7 +544,7 @@ def extract_design_image_from_pdf(pdf_path: str):
                 bottom = max(top + 10, min(page.height, y_next - 6))
 
             bbox = (0, top, page.width, bottom)
-            im = _crop_cell_image(page, bbox, resolution=200)
+            im = _crop_cell_image(page, bbox, resolution=200, session=session)
             if im is None:
                 return None
             im = _trim_pil_to_content(im)
@@ -469,39 +553,72 @@ def extract_design_image_from_pdf(pdf_path: str):
         return None
 
 
-def insert_design_image_into_sheet(ws: Worksheet, pdf_path: str):
-    """Insert the first-page Design Image into the template sheet."""
-    pil_img = extract_design_image_from_pdf(pdf_path)
+def extract_design_image_png(pdf: PdfSource) -> Optional[bytes]:
+    """Design Image as PNG bytes (picklable form of extract_design_image_from_pdf)."""
+    pil_img = extract_design_image_from_pdf(pdf)
     if pil_img is None:
-        return
+        return None
+    buf = BytesIO()
+    pil_img.save(buf, format="PNG")
+    return buf.getvalue()
 
-    # Keep template layout unchanged: always anchor Design image at B6.
-    ar, ac = 6, 2
 
+def insert_design_image_into_sheet(ws: Worksheet, pdf: PdfSource):
+    """Insert the first-page Design Image into the template sheet."""
+    insert_design_image_png(ws, extract_design_image_png(pdf))
+
+
+# Keep template layout unchanged: always anchor Design image at B6.
+DESIGN_IMAGE_ANCHOR = (6, 2)
+
+
+def design_image_range(ws: Worksheet) -> Tuple[int, int, int, int]:
+    """Design Image 영역 (min_r, min_c, max_r, max_c): B6를 포함하는 병합 영역, 없으면 B6 셀."""
+    return _get_merged_box(ws, *DESIGN_IMAGE_ANCHOR)
+
+
+def box_pixels(col_widths: List[Optional[float]], row_heights: List[Optional[float]]) -> Tuple[int, int]:
+    """컬럼 너비 / 행 높이 목록 → 영역 크기(px)."""
+    box_w = sum(_col_width_to_pixels(w) for w in col_widths)
+    box_h = sum(_row_height_to_pixels(h) for h in row_heights)
+    return max(1, box_w), max(1, box_h)
+
+
+def _design_image_box(ws: Worksheet, box_range: Tuple[int, int, int, int]) -> Tuple[int, int]:
+    min_r, min_c, max_r, max_c = box_range
+    return box_pixels(
+        [ws.column_dimensions[get_column_letter(c)].width for c in range(min_c, max_c + 1)],
+        [ws.row_dimensions[r].height for r in range(min_r, max_r + 1)],
+    )
+
+
+def design_image_size(iw: int, ih: int, box_w: int, box_h: int) -> Tuple[int, int]:
+    """Design Image를 영역 안에 비율 유지로 맞춘 크기(px). 확대는 하지 않음."""
+    scale = 0.98 * min(box_w / iw, box_h / ih)
+    scale = min(scale, 1.0) if scale > 0 else 1.0
+    return int(iw * scale), int(ih * scale)
+
+
+def insert_design_image_png(ws: Worksheet, image_png: Optional[bytes],
+                            box_range: Optional[Tuple[int, int, int, int]] = None):
+    """
+    Insert an already extracted Design Image (PNG bytes) at the template's Design Image box.
+    box_range: 미리 찾아 둔 design_image_range(ws) (TemplateLayout)
+    """
+    if not image_png:
+        return
+    pil_img = PILImage.open(BytesIO(image_png))
+
+    ar, ac = DESIGN_IMAGE_ANCHOR
     # Fit into merged area containing B6 when present; otherwise use B6 cell box.
-    min_r, min_c, max_r, max_c = _get_merged_box(ws, ar, ac)
-    box_w = 0
-    for c in range(min_c, max_c + 1):
-        letter = get_column_letter(c)
-        box_w += _col_width_to_pixels(ws.column_dimensions[letter].width)
-    box_h = 0
-    for r in range(min_r, max_r + 1):
-        box_h += _row_height_to_pixels(ws.row_dimensions[r].height)
-    box_w = max(1, box_w)
-    box_h = max(1, box_h)
+    box_w, box_h = _design_image_box(ws, box_range or design_image_range(ws))
 
     iw, ih = pil_img.size
     if iw <= 0 or ih <= 0:
         return
-    scale = 0.98 * min(box_w / iw, box_h / ih)
-    scale = min(scale, 1.0) if scale > 0 else 1.0
-    target_w = int(iw * scale)
-    target_h = int(ih * scale)
+    target_w, target_h = design_image_size(iw, ih, box_w, box_h)
 
-    buf = BytesIO()
-    pil_img.save(buf, format="PNG")
-    buf.seek(0)
-    img = OpenPyxlImage(buf)
+    img = OpenPyxlImage(BytesIO(image_png))
     img.width = target_w
     img.height = target_h
 
@@ -525,9 +642,29 @@ def _get_merged_box(ws: Worksheet, row: int, col: int) -> Tuple[int, int, int, i
     return row, col, row, col
 
 
-def insert_bom_row_image(ws: Worksheet, row: int, col: int, image_png: bytes,
+def bom_row_image_size(iw: int, ih: int, scale_factor: float = 1.0) -> Tuple[int, int]:
+    """BOM 행 이미지 크기(px): 고정 너비(cm) × scale_factor, 비율 유지."""
+    target_w_px = _cm_to_pixels(TARGET_BOM_IMAGE_WIDTH_CM)
+    if scale_factor and scale_factor > 0:
+        target_w_px = max(1, int(round(target_w_px * scale_factor)))
+    scale = target_w_px / iw
+    return max(1, int(round(iw * scale))), max(1, int(round(ih * scale)))
+
+
+def image_cell_extent(target_w_px: int, target_h_px: int, num_cols: int, num_rows: int) -> Tuple[float, float]:
+    """이미지가 들어갈 셀 영역의 컬럼당 너비 / 행당 높이(pt) 최소값."""
+    per_col_px = target_w_px / max(1, num_cols)
+    per_row_px = target_h_px / max(1, num_rows)
+    return _pixels_to_col_width(per_col_px), _pixels_to_row_height_points(per_row_px)
+
+
+def insert_bom_row_image(ws: Worksheet, row: int, col: int, image_png,
                          scale_factor: float = 1.0):
-    """Insert a PNG image with fixed width (cm) while preserving aspect ratio."""
+    """
+    Insert a PNG image with fixed width (cm) while preserving aspect ratio.
+    image_png: PNG bytes or LazyImage (rendered here, only when actually placed)
+    """
+    image_png = resolve_image(image_png)
     if not image_png:
         return
     buf = BytesIO(image_png)
@@ -539,29 +676,20 @@ def insert_bom_row_image(ws: Worksheet, row: int, col: int, image_png: bytes,
     if not iw or not ih:
         return
 
-    target_w_px = _cm_to_pixels(TARGET_BOM_IMAGE_WIDTH_CM)
-    if scale_factor and scale_factor > 0:
-        target_w_px = max(1, int(round(target_w_px * scale_factor)))
-    scale = target_w_px / iw
-    target_w_px = max(1, int(round(iw * scale)))
-    target_h_px = max(1, int(round(ih * scale)))
-
+    target_w_px, target_h_px = bom_row_image_size(iw, ih, scale_factor)
     img.width = target_w_px
     img.height = target_h_px
 
     # Resize target cell area to match image size (expand only).
-    num_cols = max(1, max_c - min_c + 1)
-    per_col_px = target_w_px / num_cols
-    needed_col_w = _pixels_to_col_width(per_col_px)
+    needed_col_w, needed_row_h = image_cell_extent(
+        target_w_px, target_h_px, max_c - min_c + 1, max_r - min_r + 1
+    )
     for c in range(min_c, max_c + 1):
         letter = get_column_letter(c)
         cur_w = ws.column_dimensions[letter].width
         cur_w = cur_w if cur_w is not None else 8.43
         ws.column_dimensions[letter].width = max(cur_w, needed_col_w)
 
-    num_rows = max(1, max_r - min_r + 1)
-    per_row_px = target_h_px / num_rows
-    needed_row_h = _pixels_to_row_height_points(per_row_px)
     for r in range(min_r, max_r + 1):
         cur_h = ws.row_dimensions[r].height
         cur_h = cur_h if cur_h is not None else 15.0
@@ -577,136 +705,275 @@ def insert_bom_row_image(ws: Worksheet, row: int, col: int, image_png: bytes,
 
 
 # ----------------------------
-# PDFì—ì„œ BOM ì´ë¯¸ì§€ ì¶”ì¶œ
+# 지연 렌더링 이미지 핸들
 # ----------------------------
-def extract_graphic_color_cell_images_from_pdf(pdf_path: str) -> Dict[Tuple[str, str, str], bytes]:
+# 렌더링 방식 (수집 시점에 결정, 실제 렌더링은 get() 시점)
+RENDER_GRAPHIC = "graphic"              # Graphic 컬러 셀: MuPDF 200dpi → 페이지 크롭
+RENDER_GRAPHIC_CONT = "graphic_cont"    # continuation 컬러 셀: 위와 같고 크롭은 빈 이미지 제외
+RENDER_BOM_EMBEDDED = "bom_embedded"    # Image 컬럼 (임베디드 이미지 있음): MuPDF 250dpi → 크롭
+RENDER_BOM_CELL = "bom_cell"            # Image 컬럼 (벡터/텍스트만): 크롭 + 여백 트림
+
+
+def _render_candidate(session: PdfSession, page_idx: int, bbox, kind: str) -> Optional[bytes]:
+    page = session.page(page_idx)
+    dpi = 250 if kind in (RENDER_BOM_EMBEDDED, RENDER_BOM_CELL) else 200
+    if kind != RENDER_BOM_CELL:
+        png_data = _fitz_render_cell(session, page_idx, bbox, dpi=dpi)
+        if png_data:
+            return png_data
+    pil = _crop_cell_image(page, bbox, resolution=dpi, session=session)
+    if pil is None:
+        return None
+    if kind == RENDER_BOM_CELL:
+        pil = _trim_pil_to_content(pil)
+    if kind != RENDER_GRAPHIC and _is_blank(pil):
+        return None
+    buf = BytesIO()
+    pil.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _resolved_image(png: Optional[bytes]) -> Optional[bytes]:
+    return png
+
+
+class LazyImage:
     """
-    Extract thumbnails inside color columns for the Graphic section.
-    Returns mapping: (product, material_name, formatted_color_header) -> PNG bytes
+    셀 이미지 지연 렌더링 핸들 (BomRow.image_png / color_images 값).
+    수집 단계에서는 (page_idx, bbox, 렌더링 방식) 후보만 기록하고,
+    엑셀에 실제로 삽입될 때 get()으로 렌더링함 (결과는 메모이즈).
+    후보가 여러 개면 기록 순서대로 시도해 처음 나온 이미지를 사용.
+    세션이 열려 있는 동안만 렌더링 가능하며, 피클링하면 렌더링된 PNG bytes(또는 None)로 바뀜.
     """
-    out: Dict[Tuple[str, str, str], bytes] = {}
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            for t in (page.find_tables() or []):
-                data = t.extract() or []
-                if not data or not data[0]:
-                    continue
-                header = [clean_text_keep_newlines(x) for x in data[0]]
-                header_norm = [normalize_header(x) for x in header]
-                if "product" not in header_norm or "materialname" not in header_norm:
-                    continue
-                
-                # "Only for Product Colors" 찾기 (정확 일치 또는 서브스트링)
-                idx_only = None
-                for ci_h, hn_h in enumerate(header_norm):
-                    if hn_h == "onlyforproductcolors":
-                        idx_only = ci_h
-                        break
-                    if "onlyforproductcolors" in hn_h:
-                        idx_only = ci_h
-                        break
-                
-                if idx_only is None:
-                    continue
-                
-                idx_product = header_norm.index("product")
-                idx_material = header_norm.index("materialname")
-                idx_comment = header_norm.index("comment") if "comment" in header_norm else len(header_norm)
-
-                # 병합 여부 체크: CC Number가 포함되면 이 셀부터 컬러
-                ofpc_raw = clean_text_keep_newlines(header[idx_only]) if idx_only < len(header) else ""
-                has_cc = bool(re.search(r'\b\d{9,}\b', ofpc_raw))
-                color_start_idx = idx_only if has_cc else idx_only + 1
-
-                # When merged, clean "Only for Product Colors" prefix from header
-                # to match pdf_parser.py's header cleaning (ensures image key consistency)
-                if has_cc:
-                    cleaned = re.sub(
-                        r'(?i)only\s+for\s+product\s+colors?\s*[\n\r]*',
-                        '', ofpc_raw
-                    ).strip()
-                    if cleaned:
-                        header[idx_only] = cleaned
-
-                color_cols = list(range(color_start_idx, idx_comment))
-                if not color_cols:
+    def __init__(self, session: PdfSession):
+        self.session = session
+        self.candidates: List[Tuple[int, Tuple[float, float, float, float], str]] = []
+        self._png: Optional[bytes] = None
+        self._resolved = False
+
+    def add(self, page_idx: int, bbox, kind: str):
+        self.candidates.append((page_idx, bbox, kind))
+
+    def get(self) -> Optional[bytes]:
+        if not self._resolved:
+            for page_idx, bbox, kind in self.candidates:
+                try:
+                    self._png = _render_candidate(self.session, page_idx, bbox, kind)
+                except Exception:
+                    self._png = None
+                if self._png:
+                    break
+            self._resolved = True
+            self.session = None
+            self.candidates = []
+        return self._png
+
+    def __reduce__(self):
+        return (_resolved_image, (self.get(),))
+
+
+def resolve_image(image) -> Optional[bytes]:
+    """PNG bytes 또는 LazyImage → PNG bytes (없으면 None)."""
+    if isinstance(image, LazyImage):
+        return image.get()
+    return image or None
+
+
+def materialize_row_images(rows) -> None:
+    """BomRow들의 LazyImage를 PNG bytes로 확정 (세션을 닫기 전에 호출)."""
+    for r in rows:
+        r.image_png = resolve_image(r.image_png)
+        if r.color_images:
+            r.color_images = {
+                k: png for k, png in ((k, resolve_image(v)) for k, v in r.color_images.items()) if png
+            }
+
+
+def materialize_output_images(rows, color_headers: List[str]) -> None:
+    """
+    시트에 실제로 들어갈 행 이미지만 PNG bytes로 확정 (세션을 닫기 전에 호출, 파싱 캐시/배치 결과용).
+    group_rows_by_material로 합쳐지는 행은 렌더링에 처음 성공한 이미지만 쓰이므로 그 뒤 후보와
+    출력 컬럼이 없는 컬러 이미지는 렌더링하지 않고 버림 → 시트 결과는 materialize_row_images와 같음.
+    """
+    written_ids = set(column_ids(color_headers or []))
+    image_done = set()
+    color_done: Dict[tuple, set] = {}
+    for r in rows:
+        key = material_group_key(r)
+        if key in image_done:
+            r.image_png = None
+        else:
+            r.image_png = resolve_image(r.image_png)
+            if r.image_png:
+                image_done.add(key)
+        if r.color_images:
+            done = color_done.setdefault(key, set())
+            kept = {}
+            for k, v in r.color_images.items():
+                if k is None or k in done or k not in written_ids:
                     continue
+                png = resolve_image(v)
+                if png:
+                    kept[k] = png
+                    done.add(k)
+            r.color_images = kept
 
-                current_section = ""
-                for r_idx in range(1, len(data)):
-                    row = data[r_idx]
-                    if not row:
-                        continue
 
-                    sec = section_from_cell_text(str(row[0] or ""))
-                    if sec:
-                        current_section = sec
-                        continue
+# ----------------------------
+# PDFì—ì„œ BOM ì´ë¯¸ì§€ ì¶”ì¶œ
+# ----------------------------
+class GraphicColorImageCollector:
+    """
+    Page-visitor 소비자: Graphic 섹션 컬러 컬럼 안의 썸네일 수집.
+    out: (product, material_name, formatted_color_header) -> LazyImage
+    by_row: (product, material_name) -> [(formatted_color_header, LazyImage)] (수집 순서, CC Number fallback용)
+    """
 
-                    if current_section != "Graphic":
-                        continue
+    def __init__(self, session: PdfSession):
+        self.session = session
+        self.out: Dict[Tuple[str, str, str], LazyImage] = {}
+        self.by_row: Dict[Tuple[str, str], List[Tuple[str, LazyImage]]] = {}
+
+    def find(self, prod: str, material: str, *header_variants) -> Optional[LazyImage]:
+        """
+        헤더 텍스트 변형들로 정확히 찾고, 없으면 CC Number가 헤더에 포함된 이미지로 fallback.
+        fallback은 같은 (product, material) 이미지만 수집 순서대로 훑음 (부분 문자열 포함 → 다른 숫자/하이픈과
+        붙어 있는 CC Number도 매칭)
+        """
+        for htxt in header_variants:
+            if htxt:
+                img = self.out.get((prod, material, htxt))
+                if img:
+                    return img
+        for htxt in header_variants:
+            if not htxt:
+                continue
+            cc_m = _CC_WORD_RE.search(htxt)
+            if cc_m:
+                cc_num = cc_m.group(1)
+                for stored_htxt, img in self.by_row.get((prod, material), ()):
+                    if cc_num in stored_htxt:
+                        return img
+        return None
 
-                    prod = clean_text(row[idx_product] if idx_product < len(row) else "") or "GRAPHIC"
-                    material = clean_text(row[idx_material] if idx_material < len(row) else "") or "GRAPHIC"
+    def visit_table(self, page_idx: int, t: PageTable):
+        data = t.data
+        if not data or not data[0]:
+            return
+        header = list(t.header)
+        header_norm = t.header_norm
+        if "product" not in header_norm or "materialname" not in header_norm:
+            return
+
+        # "Only for Product Colors" 찾기 (정확 일치 또는 서브스트링)
+        idx_only = None
+        for ci_h, hn_h in enumerate(header_norm):
+            if hn_h == "onlyforproductcolors":
+                idx_only = ci_h
+                break
+            if "onlyforproductcolors" in hn_h:
+                idx_only = ci_h
+                break
 
-                    if r_idx >= len(t.rows):
-                        continue
-                    for ci in color_cols:
-                        if ci >= len(t.rows[r_idx].cells):
-                            continue
-                        bbox = t.rows[r_idx].cells[ci]
-                        if not bbox:
-                            continue
-                        if not _has_embedded_image_in_bbox(page, bbox):
-                            continue
-                        htxt = format_color_header_text(header[ci] if ci < len(header) else "")
-                        if not htxt:
-                            continue
-                        key = (prod, material, htxt)
-                        if key in out:
-                            continue
-                        try:
-                            png_data = _fitz_render_cell(pdf_path, page.page_number - 1, bbox)
-                            if png_data:
-                                out[key] = png_data
-                                continue
-                            pil = _crop_cell_image(page, bbox, resolution=200)
-                            if pil is None:
-                                continue
-                            buf = BytesIO()
-                            pil.save(buf, format="PNG")
-                            out[key] = buf.getvalue()
-                        except Exception:
-                            continue
+        if idx_only is None:
+            return
+
+        idx_product = header_norm.index("product")
+        idx_material = header_norm.index("materialname")
+        idx_comment = header_norm.index("comment") if "comment" in header_norm else len(header_norm)
+
+        # 병합 여부 체크: CC Number가 포함되면 이 셀부터 컬러
+        ofpc_raw = clean_text_keep_newlines(header[idx_only]) if idx_only < len(header) else ""
+        has_cc = bool(re.search(r'\b\d{9,}\b', ofpc_raw))
+        color_start_idx = idx_only if has_cc else idx_only + 1
+
+        # When merged, clean "Only for Product Colors" prefix from header
+        # to match pdf_parser.py's header cleaning (ensures image key consistency)
+        if has_cc:
+            cleaned = re.sub(
+                r'(?i)only\s+for\s+product\s+colors?\s*[\n\r]*',
+                '', ofpc_raw
+            ).strip()
+            if cleaned:
+                header[idx_only] = cleaned
+
+        color_cols = list(range(color_start_idx, idx_comment))
+        if not color_cols:
+            return
+
+        # 셀-이미지 겹침은 테이블 단위로 한 번에 조회 (페이지 공간 인덱스)
+        embedded = _embedded_image_cells(self.session, page_idx, t)
+        out = self.out
+        current_section = ""
+        for r_idx in range(1, len(data)):
+            row = data[r_idx]
+            if not row:
+                continue
 
-    return out
+            sec = section_from_cell_text(str(row[0] or ""))
+            if sec:
+                current_section = sec
+                continue
+
+            if current_section != "Graphic":
+                continue
+
+            prod = clean_text(row[idx_product] if idx_product < len(row) else "") or "GRAPHIC"
+            material = clean_text(row[idx_material] if idx_material < len(row) else "") or "GRAPHIC"
+
+            for ci in color_cols:
+                bbox = t.cell_bbox(r_idx, ci)
+                if not bbox:
+                    continue
+                if (r_idx, ci) not in embedded:
+                    continue
+                htxt = format_color_header_text(header[ci] if ci < len(header) else "")
+                if not htxt:
+                    continue
+                key = (prod, material, htxt)
+                if key not in out:
+                    out[key] = LazyImage(self.session)
+                    self.by_row.setdefault((prod, material), []).append((htxt, out[key]))
+                out[key].add(page_idx, bbox, RENDER_GRAPHIC)
+
+
+def extract_graphic_color_cell_images_from_pdf(pdf: PdfSource) -> Dict[Tuple[str, str, str], bytes]:
+    """
+    Extract thumbnails inside color columns for the Graphic section.
+    Returns mapping: (product, material_name, formatted_color_header) -> PNG bytes
+    """
+    with open_session(pdf) as session:
+        collector = GraphicColorImageCollector(session)
+        visit_page_tables(session, [collector])
+        return {k: png for k, png in ((k, v.get()) for k, v in collector.out.items()) if png}
 
 
 def extract_continuation_graphic_images(
     page,
-    table_obj,
+    table: PageTable,
     row_to_bomrow_map: Dict[int, int],
     current_block_rows: list,
     header: List[str],
     header_norm: List[str],
-    pdf_path: str = "",
-) -> Dict[Tuple[str, str, str], bytes]:
+    pdf: Optional[PdfSession] = None,
+) -> Dict[Tuple[str, str, str], LazyImage]:
     """
     continuation í…Œì´ë¸”ì—ì„œ Graphic í–‰ì˜ ì»¬ëŸ¬ ì´ë¯¸ì§€ë¥¼ ì¶”ì¶œ.
     
     Args:
         page: pdfplumber Page ê°ì²´
-        table_obj: pdfplumber Table ê°ì²´ (ì…€ bbox ì •ë³´ í¬í•¨)
+        table: PageTable (데이터 + 셀 bbox 정보 포함)
         row_to_bomrow_map: {raw_data_idx â†’ BomRow index}
         current_block_rows: í˜„ìž¬ ë¸”ë¡ì˜ BomRow ë¦¬ìŠ¤íŠ¸
         header: ì»¬ëŸ¬ í—¤ë” í…ìŠ¤íŠ¸ ë¦¬ìŠ¤íŠ¸
         header_norm: ì •ê·œí™”ëœ í—¤ë” ë¦¬ìŠ¤íŠ¸
+        pdf: 공유 PdfSession (이미지 렌더링은 LazyImage.get() 시점에 이 세션으로 수행)
     
     Returns:
         {(product, material_name, formatted_color_header) â†’ PNG bytes}
     """
-    out: Dict[Tuple[str, str, str], bytes] = {}
+    out: Dict[Tuple[str, str, str], LazyImage] = {}
 
     comment_idx = header_norm.index("comment") if "comment" in header_norm else None
     color_col_indices: List[int] = []
@@ -720,7 +987,10 @@ def extract_continuation_graphic_images(
     if not color_col_indices:
         return out
 
-    for data_i in range(1, len(table_obj.rows)):
+    page_idx = page.page_number - 1
+    embedded = _embedded_image_cells(pdf, page_idx, table) if pdf is not None else None
+
+    for data_i in range(1, len(table.cells)):
         raw_idx = data_i - 1
         target_i = row_to_bomrow_map.get(raw_idx)
         if target_i is None:
@@ -736,12 +1006,13 @@ def extract_continuation_graphic_images(
         material = brow.material_name
 
         for ci in color_col_indices:
-            if ci >= len(table_obj.rows[data_i].cells):
-                continue
-            bbox = table_obj.rows[data_i].cells[ci]
+            bbox = table.cell_bbox(data_i, ci)
             if not bbox:
                 continue
-            if not _has_embedded_image_in_bbox(page, bbox):
+            if embedded is not None:
+                if (data_i, ci) not in embedded:
+                    continue
+            elif not _has_embedded_image_in_bbox(page, bbox):  # 세션 없이 호출된 경우만 (페이지 이미지 선형 스캔)
                 continue
 
             htxt = format_color_header_text(header[ci] if ci < len(header) else "")
@@ -749,156 +1020,130 @@ def extract_continuation_graphic_images(
                 continue
 
             key = (prod, material, htxt)
-            if key in out:
-                continue
-
-            try:
-                if pdf_path:
-                    png_data = _fitz_render_cell(pdf_path, page.page_number - 1, bbox)
-                    if png_data:
-                        out[key] = png_data
-                        continue
-                pil = _crop_cell_image(page, bbox, resolution=200)
-                if pil is None or _is_blank(pil):
-                    continue
-                buf = BytesIO()
-                pil.save(buf, format="PNG")
-                out[key] = buf.getvalue()
-            except Exception:
-                continue
+            if key not in out:
+                out[key] = LazyImage(pdf)
+            out[key].add(page_idx, bbox, RENDER_GRAPHIC_CONT)
 
     return out
 
 
-def extract_bom_image_map_from_pdf(pdf_path: str) -> Dict[Tuple[str, str, str], bytes]:
+class BomImageMapCollector:
     """
-    Extract images from BOM Details table 'Image' column for specific sections
-    (Packaging and Labels, Graphic).
-    Returns mapping: (category, product, material_name) -> PNG bytes
-    
-    ★ 개선: 연속 테이블(헤더 없는 페이지)도 처리하여 Packaging 이미지 추출
+    Page-visitor 소비자: BOM Details 'Image' 컬럼 이미지 수집 (Packaging and Labels, Graphic).
+    img_map: (category, product, material_name) -> LazyImage
     """
-    img_map: Dict[Tuple[str, str, str], bytes] = {}
-    current_section: str = ""
 
     wanted_sections = {"Packaging and Labels", "Graphic"}
-    
-    # 마지막으로 감지한 헤더 정보 (연속 페이지 처리용)
-    last_header_info: Optional[Dict] = None
-
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            tables = page.find_tables() or []
-            for t in tables:
-                data = t.extract() or []
-                if not data or not data[0]:
-                    continue
 
-                header = [clean_text_keep_newlines(x) for x in data[0]]
-                header_norm = [normalize_header(x) for x in header]
-
-                idx_product = header_norm.index("product") if "product" in header_norm else None
-                idx_material = header_norm.index("materialname") if "materialname" in header_norm else None
-                idx_image = next(
-                    (
-                        i
-                        for i, hn in enumerate(header_norm)
-                        if hn == "image" or ("image" in hn and hn != "designimage")
-                    ),
-                    None,
+    def __init__(self, session: PdfSession):
+        self.session = session
+        self.img_map: Dict[Tuple[str, str, str], LazyImage] = {}
+        self.current_section: str = ""
+        # 마지막으로 감지한 헤더 정보 (연속 페이지 처리용)
+        self.last_header_info: Optional[Dict] = None
+
+    def visit_table(self, page_idx: int, t: PageTable):
+        data = t.data
+        if not data or not data[0]:
+            return
+
+        header_norm = t.header_norm
+
+        idx_product = header_norm.index("product") if "product" in header_norm else None
+        idx_material = header_norm.index("materialname") if "materialname" in header_norm else None
+        idx_image = next(
+            (
+                i
+                for i, hn in enumerate(header_norm)
+                if hn == "image" or ("image" in hn and hn != "designimage")
+            ),
+            None,
+        )
+
+        # ── Case 1: 정상 헤더가 있는 테이블 ──
+        if idx_product is not None and idx_material is not None and idx_image is not None:
+
+            self.last_header_info = {
+                'idx_product': idx_product,
+                'idx_material': idx_material,
+                'idx_image': idx_image,
+            }
+            data_start = 1
+
+        # ── Case 2: 헤더 없는 연속 테이블 (이전 페이지에서 계속) ──
+        elif self.last_header_info is not None:
+            first_cell = clean_text(data[0][0] if data[0] else "")
+            idx_product = self.last_header_info['idx_product']
+            idx_material = self.last_header_info['idx_material']
+            idx_image = self.last_header_info['idx_image']
+
+            first_row = data[0] if data else []
+            first_material = clean_text(first_row[idx_material] if idx_material < len(first_row) else "")
+            has_required_cols = len(first_row) > max(idx_product, idx_material, idx_image)
+            first_norm = normalize_header(first_cell)
+
+            # 첫 셀이 숫자/섹션 헤더이거나, 헤더 없이 바로 데이터가 이어지는 경우까지 연속으로 처리
+            is_continuation = (
+                bool(re.fullmatch(r"\d{5,}", first_cell))
+                or section_from_cell_text(first_cell) is not None
+                or (
+                    has_required_cols
+                    and (first_material or first_cell)
+                    and first_norm not in {"product", "materialname"}
                 )
+            )
+            if not is_continuation:
+                return
 
-                # ── Case 1: 정상 헤더가 있는 테이블 ──
-                if idx_product is not None and idx_material is not None and idx_image is not None:
-                    
-                    last_header_info = {
-                        'idx_product': idx_product,
-                        'idx_material': idx_material,
-                        'idx_image': idx_image,
-                    }
-                    data_start = 1
-
-                # ── Case 2: 헤더 없는 연속 테이블 (이전 페이지에서 계속) ──
-                elif last_header_info is not None:
-                    first_cell = clean_text(data[0][0] if data[0] else "")
-                    idx_product = last_header_info['idx_product']
-                    idx_material = last_header_info['idx_material']
-                    idx_image = last_header_info['idx_image']
-
-                    first_row = data[0] if data else []
-                    first_material = clean_text(first_row[idx_material] if idx_material < len(first_row) else "")
-                    has_required_cols = len(first_row) > max(idx_product, idx_material, idx_image)
-                    first_norm = normalize_header(first_cell)
-
-                    # 첫 셀이 숫자/섹션 헤더이거나, 헤더 없이 바로 데이터가 이어지는 경우까지 연속으로 처리
-                    is_continuation = (
-                        bool(re.fullmatch(r"\d{5,}", first_cell))
-                        or section_from_cell_text(first_cell) is not None
-                        or (
-                            has_required_cols
-                            and (first_material or first_cell)
-                            and first_norm not in {"product", "materialname"}
-                        )
-                    )
-                    if not is_continuation:
-                        continue
-
-                    data_start = 0  # 헤더 행 없이 바로 데이터
-                else:
-                    continue
+            data_start = 0  # 헤더 행 없이 바로 데이터
+        else:
+            return
 
-                for r_idx in range(data_start, len(data)):
-                    row = data[r_idx]
-                    if not row:
-                        continue
+        embedded = _embedded_image_cells(self.session, page_idx, t)
+        img_map = self.img_map
+        for r_idx in range(data_start, len(data)):
+            row = data[r_idx]
+            if not row:
+                continue
 
-                    row_texts = [clean_text_keep_newlines(x) for x in row]
-                    first = row_texts[0] if row_texts else ""
-                    sec = section_from_cell_text(first)
-                    if sec:
-                        current_section = sec
-                        continue
+            row_texts = clean_row_keep_newlines(row)
+            first = row_texts[0] if row_texts else ""
+            sec = section_from_cell_text(first)
+            if sec:
+                self.current_section = sec
+                continue
 
-                    if current_section not in wanted_sections:
-                        continue
+            current_section = self.current_section
+            if current_section not in self.wanted_sections:
+                continue
 
-                    prod = clean_text(row[idx_product] if idx_product < len(row) else "")
-                    material = clean_text(row[idx_material] if idx_material < len(row) else "")
-                    if not prod:
-                        prod = current_section.upper() if current_section else ""
-                    if not prod:
-                        continue
+            prod = clean_text(row[idx_product] if idx_product < len(row) else "")
+            material = clean_text(row[idx_material] if idx_material < len(row) else "")
+            if not prod:
+                prod = current_section.upper() if current_section else ""
+            if not prod:
+                continue
 
-                    key = (current_section, prod, material)
-                    if key in img_map:
-                        continue
+            key = (current_section, prod, material)
+            bbox = t.cell_bbox(r_idx, idx_image)
+            if not bbox:
+                continue
 
-                    if r_idx >= len(t.rows):
-                        continue
-                    if idx_image >= len(t.rows[r_idx].cells):
-                        continue
-                    bbox = t.rows[r_idx].cells[idx_image]
-                    if not bbox:
-                        continue
+            kind = RENDER_BOM_EMBEDDED if (r_idx, idx_image) in embedded else RENDER_BOM_CELL
+            if key not in img_map:
+                img_map[key] = LazyImage(self.session)
+            img_map[key].add(page_idx, bbox, kind)
 
-                    try:
-                        has_embedded = _has_embedded_image_in_bbox(page, bbox)
-                        if has_embedded:
-                            png_data = _fitz_render_cell(pdf_path, page.page_number - 1, bbox, dpi=250)
-                            if png_data:
-                                img_map[key] = png_data
-                                continue
-                        pil = _crop_cell_image(page, bbox, resolution=250)
-                        if pil is None:
-                            continue
-                        if not has_embedded:
-                            pil = _trim_pil_to_content(pil)
-                        if _is_blank(pil):
-                            continue
-                        buf = BytesIO()
-                        pil.save(buf, format="PNG")
-                        img_map[key] = buf.getvalue()
-                    except Exception:
-                        continue
 
-    return img_map
+def extract_bom_image_map_from_pdf(pdf: PdfSource) -> Dict[Tuple[str, str, str], bytes]:
+    """
+    Extract images from BOM Details table 'Image' column for specific sections
+    (Packaging and Labels, Graphic).
+    Returns mapping: (category, product, material_name) -> PNG bytes
+    
+    ★ 개선: 연속 테이블(헤더 없는 페이지)도 처리하여 Packaging 이미지 추출
+    """
+    with open_session(pdf) as session:
+        collector = BomImageMapCollector(session)
+        visit_page_tables(session, [collector])
+        return {k: png for k, png in ((k, v.get()) for k, v in collector.img_map.items()) if png}
@@ -6,14 +6,36 @@ BOM PDF → Excel Template Auto Filler
   utils.py          - 텍스트 정제 유틸리티
   models.py         - BomRow 데이터 모델
   image_handler.py  - 이미지 추출/삽입
+  pdf_session.py    - PdfSession (PDF 1회 open, 페이지/텍스트/테이블 공유 캐시)
+  resource_cache.py - 세션 단위 용량 제한 LRU 캐시 (hit/miss/bytes 카운터)
+  page_classifier.py - 키워드 기반 페이지 분류 (BOM / Measurement / ColorMatrix ...)
+  spatial_index.py  - 페이지 이미지 rect 공간 인덱스 (셀 bbox 겹침 조회)
   pdf_parser.py     - PDF 파싱 (Master, BOM Details, ColorMatrix)
+  master_fields.py  - Master 블록 라벨 스캐너 (라벨/stop 라벨 단일 패스, early stop)
+  color_header_index.py - ColorMatrix 컬러 헤더 인덱스 (CC Number 해시 / prefix trie / 부분 문자열 매칭)
   excel_template.py - 엑셀 템플릿 탐색/스타일 헬퍼
+  template_layout.py - 컴파일된 템플릿 레이아웃 (양식 파일 SHA-256 키, 메모리/디스크 재사용)
+  template_pool.py   - 양식 워크북 풀 (양식당 한 번 파싱, 스냅샷 복제본 제공)
   excel_writer.py   - fill_template 메인 로직
+  xlsx_patch_writer.py - xlsx 직접 패치 writer (BOM_WRITER_ENGINE=xml, 바뀌는 파트만 다시 씀 / 합본 스트리밍 쓰기)
+  parse_cache.py    - 파싱 결과 디스크 캐시 (PDF 내용 SHA-256 + 파서 버전, LRU 용량 상한)
+  batch.py          - 복수 PDF 배치 (워커 프로세스 병렬 파싱 → 제출 순서대로 시트 기록, 큰 합본은 파일 분할 + 인덱스)
   gui.py            - tkinter GUI
+  bom_fill.py       - GUI 없는 배치 실행 (bom-fill CLI, JSON 요약) - main.py에 인자를 주면 이쪽으로 실행
+  watch_folder.py   - 감시 폴더 자동 처리 (inotify/폴링, 쓰기 완료 대기, 처리 기록으로 재시작 시 중복 없음)
+  table_backend_parity.py - pdfplumber / pymupdf 테이블 백엔드 결과 비교 스크립트
+  writer_engine_bench.py - openpyxl / xml writer 엔진 속도·결과 비교 스크립트
 """
-from gui import App
+import sys
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 인자가 있으면 GUI 없이 배치 실행 (tkinter 없는 서버에서도 동작)
+        from bom_fill import main
+
+        sys.exit(main(sys.argv[1:]))
+    from gui import App
+
     app = App()
     app.mainloop()
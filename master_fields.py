@@ -0,0 +1,139 @@
+"""
+Master 블록 라벨 스캐너
+- Design Number / Description / BOM Number / Legacy Style Numbers / Hang/Fold Instructions
+  다섯 라벨과 각 라벨의 stop 라벨을 하나의 컴파일된 정규식으로 한 번만 훑어서 값 추출
+- 다섯 필드가 모두 잡히면 남은 텍스트는 보지 않음 (early stop)
+- 결과는 기존 라벨별 정규식과 동일:
+    label\\s+(.*?)(?=\\s+(?:stop...))   (DOTALL, 200자 미만만 채택)
+  스캐너로 못 잡은 필드만 같은 정규식(미리 컴파일)으로 다시 시도하고,
+  그래도 없으면 label\\s+(한두 줄) fallback
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from utils import clean_text
+
+# (field, label, stop labels)
+MASTER_FIELDS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("design_number", "Design Number", (
+        "Design Concept", "Description", "Category", "BOM Number", "Tech Pack",
+    )),
+    ("description", "Description", (
+        "Category", "BOM Number", "Design BOM", "Design Type", "Tech Pack",
+    )),
+    ("bom_number", "BOM Number", (
+        "Sub-", "SubCategory", "Sub-Category", "Design BOM", "Tech Pack BOM",
+        "Category", "Legacy", "Status",
+    )),
+    ("legacy_style_numbers", "Legacy Style Numbers", (
+        "Carryover", "Hang/Fold", "Season Planning", "Brand/Division",
+        "Booking", "Good/Better", "Supplier", "Hard Tag", "RFID",
+    )),
+    ("hang_fold_instructions", "Hang/Fold Instructions", (
+        "Booking Track", "Season Planning", "Brand/Division", "Department",
+        "Collection", "BOM Comments", "Revision", "Good/Better",
+    )),
+)
+
+MAX_CAPTURE_LEN = 200
+
+_WS_RUN_RE = re.compile(r"\s*")
+
+
+def _compile_field_patterns(label: str, stops: Tuple[str, ...]):
+    stop = "|".join(re.escape(s) for s in stops)
+    lazy = re.compile(rf"{re.escape(label)}\s+(.*?)(?=\s+(?:{stop}))", re.DOTALL)
+    lines = re.compile(rf"{re.escape(label)}\s+([^\n]+(?:\n[^\n]+)?)")
+    return lazy, lines
+
+
+_FIELD_PATTERNS = {field: _compile_field_patterns(label, stops) for field, label, stops in MASTER_FIELDS}
+
+# 모든 라벨/stop 라벨을 한 정규식으로: 위치마다 (가장 긴) 토큰 하나, zero-width라 겹친 토큰도 모두 찾음
+_TOKENS: List[str] = sorted(
+    {label for _f, label, _s in MASTER_FIELDS} | {s for _f, _l, stops in MASTER_FIELDS for s in stops},
+    key=len, reverse=True,
+)
+_TOKEN_RE = re.compile("(?=(" + "|".join(re.escape(t) for t in _TOKENS) + "))")
+# 같은 위치에서 시작하는 더 짧은 토큰 (예: "Tech Pack BOM" → "Tech Pack")
+_TOKEN_PREFIXES: Dict[str, Tuple[str, ...]] = {
+    t: tuple(o for o in _TOKENS if o != t and t.startswith(o)) for t in _TOKENS
+}
+
+
+def _lines_fallback(field: str, text: str) -> str:
+    stops = next(s for f, _l, s in MASTER_FIELDS if f == field)
+    m = _FIELD_PATTERNS[field][1].search(text)
+    if not m:
+        return ""
+    result = clean_text(m.group(1))
+    for stop_word in stops:
+        if stop_word in result:
+            result = result.split(stop_word)[0].strip()
+    return result
+
+
+def _regex_field(field: str, text: str) -> str:
+    """라벨별 정규식 (스캐너로 결정하지 못한 필드용)."""
+    m = _FIELD_PATTERNS[field][0].search(text)
+    if m:
+        captured = clean_text(m.group(1))
+        if len(captured) < MAX_CAPTURE_LEN:
+            return captured
+    return _lines_fallback(field, text)
+
+
+def scan_master_fields(text: str, final: bool = True) -> Optional[Dict[str, str]]:
+    """
+    Master 필드 원문 값 (후처리 전).
+    final=False: text가 뒤에 더 이어질 수 있는 앞부분이면, 스캐너로 모든 필드가 확정된 경우에만 결과를
+                 돌려주고 아니면 None (이어지는 텍스트를 붙여 다시 호출)
+    """
+    label_of = {field: label for field, label, _s in MASTER_FIELDS}
+    stops_of = {field: frozenset(stops) for field, _l, stops in MASTER_FIELDS}
+    # 라벨 뒤 공백이 끝나는 위치 (값 시작). 필드당 첫 번째 라벨만 기다림
+    value_start: Dict[str, int] = {}
+    found: Dict[str, str] = {}
+    unresolved = set(label_of)
+
+    for m in _TOKEN_RE.finditer(text):
+        pos = m.start()
+        tok = m.group(1)
+        toks = (tok,) + _TOKEN_PREFIXES[tok]
+        after_ws = pos > 0 and text[pos - 1].isspace()
+
+        if after_ws:
+            for field, r in list(value_start.items()):
+                if pos <= r or not (stops_of[field].intersection(toks)):
+                    continue
+                # stop 앞 공백 시작 위치까지가 값
+                w = pos - 1
+                while w > r and text[w - 1].isspace():
+                    w -= 1
+                captured = clean_text(text[r:w])
+                if len(captured) >= MAX_CAPTURE_LEN and not final:
+                    # 줄 단위 fallback은 뒤에 이어질 줄에 따라 달라지므로 전체 텍스트에서 다시
+                    return None
+                del value_start[field]
+                unresolved.discard(field)
+                found[field] = captured if len(captured) < MAX_CAPTURE_LEN else _lines_fallback(field, text)
+
+        for field in unresolved:
+            if field in value_start or label_of[field] not in toks:
+                continue
+            q = pos + len(label_of[field])
+            r = _WS_RUN_RE.match(text, q).end()
+            if r > q:
+                value_start[field] = r
+
+        if not unresolved:
+            break
+
+    if unresolved:
+        if not final:
+            return None
+        # 뒤에 stop이 없는 경우 등: 원래 정규식 그대로 (백트래킹 포함)
+        for field in unresolved:
+            found[field] = _regex_field(field, text)
+
+    return {field: found[field] for field, _l, _s in MASTER_FIELDS}
@@ -3,9 +3,10 @@
 """
 import re
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
 
-from utils import clean_text
+from utils import TEXT_CACHE_SIZE, clean_text
 
 
 @dataclass
@@ -17,33 +18,124 @@ class BomRow:
     usage: str
     quality_details: str
     supplier: str
-    # key: formatted color header text (multi-line), value: color cell value
-    colors: Dict[str, str]
+    # key: color column id (ColorHeaderSet / ParseResult.color_headers index), value: color cell value
+    colors: Dict[int, str]
     # PNG bytes for BOM Details 'Image' column (optional)
+    # (image_handler.LazyImage while the parsing session is open; rendered on insert)
     image_png: Optional[bytes] = None
     # PNG bytes for color/print/graphic thumbnails inside color columns (Graphic section)
-    color_images: Dict[str, bytes] = field(default_factory=dict)
+    # (same: bytes or LazyImage, keyed by color column id)
+    color_images: Dict[int, bytes] = field(default_factory=dict)
 
 
+class ColorHeaderSet:
+    """
+    컬러 헤더 순서 집합 (color_headers_order).
+    - 헤더마다 고정 정수 컬럼 id(= 추가된 위치)를 부여하고, BomRow.colors / color_images는 이 id를 키로 사용
+    - 멤버십 검사 / id 조회는 dict 기반 O(1)
+    - rename()으로 헤더 텍스트만 바꿔도 id는 그대로 (잘린 헤더 보정 시 행 데이터 이동 불필요)
+    같은 텍스트가 여러 위치에 있으면(보정 결과 중복) id_of()는 첫 번째 위치를 돌려줌.
+    """
+
+    def __init__(self, headers: Iterable[str] = ()):
+        self.headers: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for h in headers:
+            self._ids.setdefault(h, len(self.headers))
+            self.headers.append(h)
+
+    def __contains__(self, header: object) -> bool:
+        return header in self._ids
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.headers)
+
+    def __getitem__(self, col_id: int) -> str:
+        return self.headers[col_id]
+
+    def add(self, header: str) -> int:
+        """헤더의 컬럼 id (없으면 맨 뒤에 추가)."""
+        col_id = self._ids.get(header)
+        if col_id is None:
+            col_id = len(self.headers)
+            self._ids[header] = col_id
+            self.headers.append(header)
+        return col_id
+
+    def id_of(self, header: str) -> Optional[int]:
+        return self._ids.get(header)
+
+    def rename(self, col_id: int, header: str) -> None:
+        self.headers[col_id] = header
+        self._ids = {}
+        for i, h in enumerate(self.headers):
+            self._ids.setdefault(h, i)
+
+    def to_list(self) -> List[str]:
+        return list(self.headers)
+
+
+def column_ids(color_headers: List[str]) -> List[int]:
+    """
+    컬럼 위치 → 값을 읽을 컬러 id.
+    헤더 텍스트가 중복되면 모두 첫 번째 위치의 id를 읽음 (같은 헤더 = 같은 값).
+    """
+    first: Dict[str, int] = {}
+    return [first.setdefault(h, j) for j, h in enumerate(color_headers)]
+
+
+@dataclass
+class ParseResult:
+    """
+    PDF 1개 파싱 결과 (엑셀 쓰기 전 단계).
+    bytes/str/dataclass로만 구성되어 워커 프로세스에서 메인 프로세스로 피클링 전달 가능.
+    """
+    pdf_path: str
+    master: Dict[str, str]
+    rows: List[BomRow]
+    # 컬러 컬럼 헤더 (index = BomRow.colors / color_images의 컬럼 id)
+    color_headers: List[str]
+    # Design Image (PNG bytes, 추출 실패 시 None)
+    design_image_png: Optional[bytes] = None
+
+
+# 섹션 헤더 패턴을 하나의 정규식으로 결합 (그룹 번호 → 섹션 이름)
+_SECTION_RE = re.compile(
+    r"^(?:(fabric)|(trim)|(graphic)|(packaging\s+and\s+labels)|(wash))\s*\(\d+\)\s*$",
+    re.IGNORECASE,
+)
+_SECTION_NAMES = (None, "Fabric", "Trim", "Graphic", "Packaging and Labels", "Wash")
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE, typed=True)
 def section_from_cell_text(s: str) -> Optional[str]:
     """
     Detect section header like 'Fabric (5)', 'Trim (6)', 'Graphic (1)', 'Packaging and Labels (10)'.
     Must match the section header pattern, not merely contain the word.
     """
     t = clean_text(s).lower()
-    patterns = [
-        (r"^fabric\s*\(\d+\)\s*$", "Fabric"),
-        (r"^trim\s*\(\d+\)\s*$", "Trim"),
-        (r"^graphic\s*\(\d+\)\s*$", "Graphic"),
-        (r"^packaging\s+and\s+labels\s*\(\d+\)\s*$", "Packaging and Labels"),
-        (r"^wash\s*\(\d+\)\s*$", "Wash"),
-    ]
-    for rx, name in patterns:
-        if re.match(rx, t, flags=re.IGNORECASE):
-            return name
+    m = _SECTION_RE.match(t)
+    if m:
+        return _SECTION_NAMES[m.lastindex]
     return None
 
 
+def material_group_key(r: BomRow) -> tuple:
+    """group_rows_by_material에서 한 행으로 합쳐지는 기준."""
+    return (
+        r.category,
+        r.product,
+        r.material_name,
+        r.supplier_article_number,
+        r.usage,
+        r.quality_details,
+        r.supplier,
+    )
+
+
 def group_rows_by_material(rows: List[BomRow]) -> List[BomRow]:
     """
     Same material -> one row; colors spread to the right as separate columns.
@@ -54,15 +146,7 @@ def group_rows_by_material(rows: List[BomRow]) -> List[BomRow]:
     order: List[Tuple[str, str, str, str, str, str, str]] = []
 
     for r in rows:
-        key = (
-            r.category,
-            r.product,
-            r.material_name,
-            r.supplier_article_number,
-            r.usage,
-            r.quality_details,
-            r.supplier,
-        )
+        key = material_group_key(r)
         if key not in grouped:
             grouped[key] = BomRow(
                 category=r.category,
@@ -79,7 +163,7 @@ def group_rows_by_material(rows: List[BomRow]) -> List[BomRow]:
             order.append(key)
 
         for h, v in (r.colors or {}).items():
-            if not h:
+            if h is None:
                 continue
             if h not in grouped[key].colors:
                 grouped[key].colors[h] = v
@@ -96,7 +180,29 @@ def group_rows_by_material(rows: List[BomRow]) -> List[BomRow]:
             if grouped[key].color_images is None:
                 grouped[key].color_images = {}
             for hk, bv in r.color_images.items():
-                if hk and bv and hk not in grouped[key].color_images:
+                if hk is not None and bv and hk not in grouped[key].color_images:
                     grouped[key].color_images[hk] = bv
 
     return [grouped[k] for k in order]
+
+
+# 섹션이 시작될 때 소제목 행을 넣는 카테고리 (소문자 카테고리 → 소제목)
+SUBTITLE_BY_CATEGORY = {
+    "packaging and labels": "Packaging and Labels",
+}
+
+
+def sheet_output_rows(rows: List[BomRow]) -> List[tuple]:
+    """
+    시트에 쓸 행 순서: 같은 자재 병합 + 섹션 시작 소제목 행.
+    ("subtitle", 소제목) / ("data", BomRow)
+    """
+    output_rows = []
+    prev_cat_norm = ""
+    for r in group_rows_by_material(rows):
+        cat_norm = (r.category or "").strip().lower()
+        if cat_norm in SUBTITLE_BY_CATEGORY and prev_cat_norm != cat_norm:
+            output_rows.append(("subtitle", SUBTITLE_BY_CATEGORY[cat_norm]))
+        output_rows.append(("data", r))
+        prev_cat_norm = cat_norm
+    return output_rows
@@ -0,0 +1,70 @@
+"""
+페이지 분류 모듈
+- 테이블 감지(find_tables) 전에 페이지 텍스트의 키워드만으로 페이지 종류를 태깅
+- 태그는 여러 개일 수 있음 (예: 표지에 Master 블록 + BOM Number)
+- Measurement/POM, Documents 페이지는 룰링이 많아 pdfplumber가 가장 느린 페이지이므로
+  BOM 신호가 없으면 BOM 파싱 대상에서 제외
+  (단, BOM 페이지 바로 뒤 페이지는 헤더 없는 BOM 행이 넘어왔을 수 있으므로 유지)
+"""
+import re
+from typing import FrozenSet, List, Sequence
+
+TAG_MASTER = "master"              # Design Number / BOM Number 라벨 블록
+TAG_COLORMATRIX = "colormatrix"    # BOMColorMatrix / CC Name
+TAG_COMPONENTS = "components"
+TAG_BOM = "bom"                    # BOM Details (full-header / color continuation)
+TAG_MEASUREMENT = "measurement"    # Measurement / POM grading
+TAG_DOCUMENTS = "documents"
+
+# BOM 신호가 없을 때 BOM 파싱을 건너뛰는 태그
+NON_BOM_TAGS = frozenset({TAG_MEASUREMENT, TAG_DOCUMENTS})
+
+_WS_RE = re.compile(r"\s+")
+_CC_NUMBER_RE = re.compile(r"\b\d{9,}\b")
+# BOM 섹션 행 (예: 'Fabric (5)', 'Packaging and Labels (10)')
+_SECTION_ROW_RE = re.compile(r"\b(?:Fabric|Trim|Graphic|Packaging and Labels|Wash) ?\(\d+\)")
+
+_BOM_KEYWORDS = ("BOM Details", "Material Name", "Only for Product Colors", "Supplier Article Number")
+_MEASUREMENT_KEYWORDS = ("Measurement", "POM Name", "Grade Rule", "Tol Fraction")
+
+
+def classify_page_text(text: str) -> FrozenSet[str]:
+    """페이지 텍스트(PyMuPDF / pdfplumber) → 태그 집합. 라벨 중간 줄바꿈은 공백 하나로 합친 뒤 비교."""
+    t = _WS_RE.sub(" ", text or "")
+    tags = set()
+    if "Design Number" in t and "BOM Number" in t:
+        tags.add(TAG_MASTER)
+    if "BOMColorMatrix" in t or "CC Name" in t:
+        tags.add(TAG_COLORMATRIX)
+    if "Components" in t:
+        tags.add(TAG_COMPONENTS)
+    if any(kw in t for kw in _BOM_KEYWORDS) or _CC_NUMBER_RE.search(t) or _SECTION_ROW_RE.search(t):
+        tags.add(TAG_BOM)
+    if any(kw in t for kw in _MEASUREMENT_KEYWORDS):
+        tags.add(TAG_MEASUREMENT)
+    if "Documents" in t:
+        tags.add(TAG_DOCUMENTS)
+    return frozenset(tags)
+
+
+def is_bom_candidate(tags: FrozenSet[str]) -> bool:
+    """BOM 신호가 있거나, Measurement/Documents로 판별되지 않은 페이지만 BOM 파싱 대상."""
+    if TAG_BOM in tags:
+        return True
+    return not (tags & NON_BOM_TAGS)
+
+
+def select_bom_pages(page_tags: Sequence[FrozenSet[str]]) -> List[int]:
+    """
+    BOM 파싱 대상 페이지 인덱스.
+    BOM 신호가 있는 페이지에서 이어지는 페이지는 Measurement/Documents 텍스트가 있어도 유지
+    (헤더 없이 넘어온 BOM 행 + 같은 페이지에서 다음 섹션 시작). BOM 신호 없이 비BOM 태그가 있는 페이지에서 흐름이 끊김.
+    """
+    selected = []
+    continuing = False  # 직전 페이지까지 BOM 표가 이어지고 있는지
+    for i, tags in enumerate(page_tags):
+        keep = is_bom_candidate(tags) or continuing
+        if keep:
+            selected.append(i)
+        continuing = TAG_BOM in tags or (continuing and not (tags & NON_BOM_TAGS))
+    return selected
@@ -0,0 +1,206 @@
+"""
+파싱 결과 디스크 캐시
+- 키: SHA-256(파서 버전 salt + 테이블 백엔드 + PDF 바이트) → 내용이 같으면 파일명/경로가 달라도 재사용
+- 값: ParseResult 피클 (Master, BOM 행, 컬러 헤더, 이미지 PNG bytes)
+- 용량 상한 초과 시 가장 오래 사용하지 않은 항목부터 삭제 (LRU, 파일 mtime 기준)
+  총 용량은 프로세스 안에서 누적 추적 → 상한을 넘을 수 있을 때만 캐시 폴더를 훑음
+
+환경변수:
+  BOM_PARSE_CACHE=0             캐시 사용 안 함
+  BOM_PARSE_CACHE_DIR=<경로>    캐시 위치 (기본 ~/.cache/bom_auto_filler/parse)
+  BOM_PARSE_CACHE_MAX_MB=<MB>   용량 상한 (기본 512)
+
+캐시 비우기:
+  python parse_cache.py purge
+"""
+import dataclasses
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from typing import List, Optional
+
+from models import ParseResult
+from pdf_parser import parse_pdf
+from pdf_session import DEFAULT_TABLE_BACKEND
+
+# 파싱 결과가 달라지는 변경(pdf_parser / image_handler / models)이 있으면 올려서 기존 캐시 무효화
+PARSER_VERSION = "3"
+
+CACHE_ENABLED = os.environ.get("BOM_PARSE_CACHE", "1") != "0"
+CACHE_DIR = os.environ.get(
+    "BOM_PARSE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bom_auto_filler", "parse"),
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("BOM_PARSE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+_SUFFIX = ".pkl"
+_CHUNK = 1024 * 1024
+
+# 이 프로세스가 알고 있는 캐시 총 용량 (None: 아직 폴더를 훑지 않음)
+# 다른 프로세스가 쓴 항목만큼 작게 잡힐 수 있지만, 상한을 넘으면 evict가 실제 용량으로 다시 맞춤
+_tracked_bytes: Optional[int] = None
+_tracked_lock = threading.Lock()
+# 저장 중 상한을 넘으면 상한의 90%까지 비움 (상한 근처에서 저장마다 폴더를 다시 훑지 않도록)
+_EVICT_LOW_WATER = 0.9
+
+
+def pdf_cache_key(pdf_path: str, bom_images: bool = True) -> str:
+    h = hashlib.sha256()
+    h.update(f"bom-parse:{PARSER_VERSION}:{DEFAULT_TABLE_BACKEND}:{int(bom_images)}:".encode("utf-8"))
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], key + _SUFFIX)
+
+
+def _iter_entries() -> List[str]:
+    paths = []
+    if not os.path.isdir(CACHE_DIR):
+        return paths
+    for root, _dirs, files in os.walk(CACHE_DIR):
+        for fn in files:
+            if fn.endswith(_SUFFIX):
+                paths.append(os.path.join(root, fn))
+    return paths
+
+
+def _scan_entries() -> List[tuple]:
+    """(mtime, size, 경로) 목록."""
+    entries = []
+    for p in _iter_entries():
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    return entries
+
+
+def load(key: str) -> Optional[ParseResult]:
+    path = _entry_path(key)
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # 손상/호환 안 되는 항목은 지우고 miss로 처리
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    if not isinstance(result, ParseResult):
+        return None
+    try:
+        os.utime(path)  # LRU: 마지막 사용 시각 갱신
+    except OSError:
+        pass
+    return result
+
+
+def store(key: str, result: ParseResult) -> None:
+    path = _entry_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        size = os.path.getsize(path)
+    except Exception:
+        # 캐시 쓰기 실패는 파싱 결과에 영향 없음
+        return
+    _note_stored(size)
+
+
+def _note_stored(size: int) -> None:
+    """저장한 만큼 누적 용량을 늘리고, 상한을 넘을 수 있을 때만 evict (배치 N개마다 폴더 전체 stat 방지)."""
+    global _tracked_bytes
+    with _tracked_lock:
+        if _tracked_bytes is None:
+            # 프로세스 첫 저장: 폴더를 한 번 훑어 기준 용량 확보 (방금 쓴 항목 포함)
+            _tracked_bytes = sum(entry[1] for entry in _scan_entries())
+        else:
+            _tracked_bytes += size
+        over = _tracked_bytes > CACHE_MAX_BYTES
+    if over:
+        evict(target_bytes=int(CACHE_MAX_BYTES * _EVICT_LOW_WATER))
+
+
+def evict(max_bytes: Optional[int] = None, target_bytes: Optional[int] = None) -> int:
+    """
+    총 용량이 상한을 넘으면 오래 사용하지 않은 항목부터 삭제. 삭제한 항목 수 반환.
+    target_bytes: 이 용량 이하가 될 때까지 삭제 (기본: 상한)
+    """
+    global _tracked_bytes
+    limit = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    target = limit if target_bytes is None else min(target_bytes, limit)
+    entries = _scan_entries()
+    total = sum(size for _mtime, size, _p in entries)
+
+    removed = 0
+    if total > limit:
+        for _mtime, size, p in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(p)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+    with _tracked_lock:
+        _tracked_bytes = total
+    return removed
+
+
+def purge() -> int:
+    """캐시 전체 삭제. 삭제한 항목 수 반환."""
+    return evict(max_bytes=0)
+
+
+def parse_pdf_cached(pdf_path: str, key: Optional[str] = None, bom_images: bool = True) -> ParseResult:
+    """
+    parse_pdf()의 캐시 버전. 같은 내용의 PDF를 이미 파싱했으면 PDF를 열지 않고 결과를 돌려줌.
+    key: 호출 측에서 이미 계산한 pdf_cache_key (배치 중복 제거 시 재계산 방지)
+    캐시가 꺼져 있으면 키와 상관없이 그대로 파싱 (load/store만 건너뜀)
+    """
+    if not CACHE_ENABLED:
+        return parse_pdf(pdf_path, bom_images=bom_images)
+
+    key = key or pdf_cache_key(pdf_path, bom_images=bom_images)
+    cached = load(key)
+    if cached is not None:
+        return dataclasses.replace(cached, pdf_path=pdf_path)
+
+    result = parse_pdf(pdf_path, bom_images=bom_images)
+    store(key, result)
+    return result
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["purge"]:
+        n = purge()
+        print(f"파싱 캐시 {n}개 삭제: {CACHE_DIR}")
+        return 0
+    print("사용법: python parse_cache.py purge")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -11,72 +11,88 @@ PDF íŒŒì‹± ëª¨ë“ˆ
 ì´ ëª¨ë“ˆì€ ì´ëŸ° ë¶„í• ì„ ì˜¬ë°”ë¥´ê²Œ ì²˜ë¦¬í•¨.
 """
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import clean_text, clean_row, normalize_header, clean_text_keep_newlines, format_color_header_text
+from models import BomRow, ColorHeaderSet, ParseResult, section_from_cell_text
+from image_handler import (
+    BomImageMapCollector,
+    GraphicColorImageCollector,
+    extract_continuation_graphic_images,
+    extract_design_image_png,
+    materialize_output_images,
+    materialize_row_images,
+)
+from pdf_session import PdfSession, PdfSource, open_session
+from page_classifier import TAG_COLORMATRIX, TAG_MASTER
+from color_header_index import ColorHeaderIndex, extract_cc_number
+from master_fields import scan_master_fields
+
+
+def parse_pdf(pdf: PdfSource, bom_images: bool = True) -> ParseResult:
+    """
+    PDF 1개를 엑셀 쓰기에 필요한 데이터로 파싱 (Master, BOM 행, 컬러 헤더, Design Image).
+    결과는 피클링 가능하므로 배치 모드에서는 워커 프로세스에서 호출됨.
+
+    bom_images=False: 템플릿에 Image 컬럼이 없을 때 BOM 'Image' 컬럼 이미지 수집을 생략.
+    행 이미지는 LazyImage로 남아 시트에 삽입될 때 렌더링됨. 세션을 넘겨받은 경우 호출자가
+    세션을 닫기 전에 시트를 써야 하고, 경로로 받은 경우(파싱 캐시 / 배치 워커) 세션을 닫기 전에
+    시트에 들어갈 이미지만 여기서 렌더링해 확정함 (materialize_output_images).
+    """
+    with open_session(pdf) as session:
+        master = parse_master_from_pdf(session)
+        try:
+            design_image_png = extract_design_image_png(session)
+        except Exception:
+            design_image_png = None
+        rows, color_headers = extract_bom_rows_from_pdf(session, bom_images=bom_images)
+        if not isinstance(pdf, PdfSession):
+            materialize_output_images(rows, color_headers)
+        return ParseResult(
+            pdf_path=session.pdf_path,
+            master=master,
+            rows=rows,
+            color_headers=color_headers,
+            design_image_png=design_image_png,
+        )
+
+
+def _scan_master_pages(session: PdfSession, page_text: Callable[[int], str]):
+    """
+    Master 라벨 스캔 → (원문 필드 값, 첫 페이지 텍스트, 전체 대상 텍스트를 돌려주는 함수).
+    Master로 태깅된 페이지 중 라벨이 모두 있는 페이지만 스캔하고, 없으면 페이지를 앞에서부터
+    이어 붙이며 스캔해 모든 필드가 확정되면 남은 페이지 텍스트는 추출하지 않음.
+    """
+    first_page_text = page_text(0) if session.page_count else ""
+    for i in session.pages_with_tag(TAG_MASTER):
+        t = page_text(i)
+        if "Design Number" in t and "BOM Number" in t:
+            return scan_master_fields(t), first_page_text, lambda: t
 
-import pdfplumber
+    def _all_pages_text() -> str:
+        return "\n".join([page_text(i) for i in range(session.page_count)])
 
-from utils import clean_text, normalize_header, clean_text_keep_newlines, format_color_header_text
-from models import BomRow, section_from_cell_text
-from image_handler import extract_bom_image_map_from_pdf, extract_graphic_color_cell_images_from_pdf, extract_continuation_graphic_images
+    parts: List[str] = []
+    for i in range(session.page_count - 1):
+        parts.append(page_text(i))
+        fields = scan_master_fields("\n".join(parts), final=False)
+        if fields is not None:
+            return fields, first_page_text, _all_pages_text
+    return scan_master_fields(_all_pages_text()), first_page_text, _all_pages_text
 
 
-def parse_master_from_pdf(pdf_path: str) -> Dict[str, str]:
+def parse_master_from_pdf(pdf: PdfSource) -> Dict[str, str]:
     """
     Extract master fields from PDF text using label-based regex.
+    `pdf` may be a path or a shared PdfSession.
+    필드 값은 pdfplumber 텍스트(레이아웃 순서)에서만 읽음. PyMuPDF 텍스트는 content stream 순서라
+    2단 Master 블록에서 Description 등의 값이 달라지므로 페이지 분류(Master 태그)에만 사용.
     """
-    with pdfplumber.open(pdf_path) as pdf:
-        target_text = ""
-        first_page_text = ""
-        for i, p in enumerate(pdf.pages):
-            t = p.extract_text() or ""
-            if i == 0:
-                first_page_text = t
-            if "Design Number" in t and "BOM Number" in t:
-                target_text = t
-                break
-        if not target_text:
-            target_text = "\n".join([(p.extract_text() or "") for p in pdf.pages])
-
-    def rx(label: str, stop_labels: List[str]) -> str:
-        stop = "|".join([re.escape(s) for s in stop_labels])
-        pattern = rf"{re.escape(label)}\s+(.*?)(?=\s+(?:{stop}))"
-        m = re.search(pattern, target_text, flags=re.DOTALL)
-        if m:
-            captured = clean_text(m.group(1))
-            if len(captured) < 200:
-                return captured
-        
-        m2 = re.search(rf"{re.escape(label)}\s+([^\n]+(?:\n[^\n]+)?)", target_text)
-        if m2:
-            result = clean_text(m2.group(1))
-            for stop_word in stop_labels:
-                if stop_word in result:
-                    result = result.split(stop_word)[0].strip()
-            return result
-            
-        return ""
+    with open_session(pdf) as session:
+        master, first_page_text, target_text = _scan_master_pages(session, session.page_text)
+        # 전체 대상 텍스트는 아래 Design Number 보조 검색에만 쓰이므로 그때만 만듦
+        target_text = target_text() if not master["design_number"] else ""
 
-    master = {
-        "design_number": rx("Design Number", [
-            "Design Concept", "Description", "Category", "BOM Number", "Tech Pack"
-        ]),
-        "description": rx("Description", [
-            "Category", "BOM Number", "Design BOM", "Design Type", "Tech Pack"
-        ]),
-        "bom_number": rx("BOM Number", [
-            "Sub-", "SubCategory", "Sub-Category", "Design BOM", "Tech Pack BOM", 
-            "Category", "Legacy", "Status"
-        ]),
-        "legacy_style_numbers": rx("Legacy Style Numbers", [
-            "Carryover", "Hang/Fold", "Season Planning", "Brand/Division", 
-            "Booking", "Good/Better", "Supplier", "Hard Tag", "RFID"
-        ]),
-        "hang_fold_instructions": rx("Hang/Fold Instructions", [
-            "Booking Track", "Season Planning", "Brand/Division", "Department", 
-            "Collection", "BOM Comments", "Revision", "Good/Better"
-        ]),
-    }
-    
     # Design Number ì¶”ê°€ ê²€ìƒ‰
     if not master.get("design_number"):
         tech_pack_pattern = r'Tech Pack[^\n]*?(D\d{5,6})'
@@ -147,7 +163,7 @@ def parse_master_from_pdf(pdf_path: str) -> Dict[str, str]:
     return master
 
 
-def extract_color_headers_from_bom_colormatrix(pdf_path: str) -> List[str]:
+def extract_color_headers_from_bom_colormatrix(pdf: PdfSource) -> List[str]:
     """
     BOMColorMatrix ì„¹ì…˜ì—ì„œ ì»¬ëŸ¬ í—¤ë”ë¥¼ ì¶”ì¶œ.
     
@@ -162,9 +178,9 @@ def extract_color_headers_from_bom_colormatrix(pdf_path: str) -> List[str]:
         "BOMColorMatrix", "Displaying",
     ]
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
+    with open_session(pdf) as session:
+        for page_idx in session.pages_with_tag(TAG_COLORMATRIX):
+            text = session.page_text(page_idx)
 
             if "BOMColorMatrix" not in text and "CC Name" not in text:
                 continue
@@ -193,7 +209,7 @@ def extract_color_headers_from_bom_colormatrix(pdf_path: str) -> List[str]:
                     return headers
 
             # â”€â”€ ë°©ë²• 2: í…Œì´ë¸” ê¸°ë°˜ íŒŒì‹± â”€â”€
-            tables = page.extract_tables() or []
+            tables = [t.data for t in session.page_tables(page_idx)]
             for table in tables:
                 if not table or len(table) < 3:
                     continue
@@ -256,18 +272,29 @@ def extract_color_headers_from_bom_colormatrix(pdf_path: str) -> List[str]:
     return headers
 
 
-def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
+def extract_bom_rows_from_pdf(pdf: PdfSource, bom_images: bool = True) -> Tuple[List[BomRow], List[str]]:
     """
     Extract BOM Details table rows from PDF using pdfplumber.extract_tables().
+    Row images are LazyImage handles while the session is open, PNG bytes when given a path.
+    bom_images=False skips the 'Image' column.
     
     ê°€ë¡œ ë¶„í•  ì²˜ë¦¬:
     - full-header tableì—ì„œ ê° í–‰ì˜ raw index â†’ BomRow index ë§¤í•‘ ê¸°ë¡
     - continuation tableì—ì„œ ë™ì¼í•œ ë§¤í•‘ìœ¼ë¡œ ì»¬ëŸ¬ ë°ì´í„° ì •í™•ížˆ í• ë‹¹
     - ì»¬ëŸ¬ ìˆ˜ì— ë”°ë¼ 1~NíŽ˜ì´ì§€ì˜ continuationì„ ëª¨ë‘ ì²˜ë¦¬
     """
+    if not isinstance(pdf, PdfSession):
+        # 경로로 받은 경우: 세션을 닫기 전에 행 이미지를 PNG bytes로 확정
+        with PdfSession(pdf) as session:
+            rows, color_headers_order = extract_bom_rows_from_pdf(session, bom_images=bom_images)
+            materialize_row_images(rows)
+            return rows, color_headers_order
+
     rows: List[BomRow] = []
-    color_headers_order: List[str] = []
-    matrix_headers: List[str] = extract_color_headers_from_bom_colormatrix(pdf_path)
+    color_headers_order = ColorHeaderSet()
+    matrix_headers: List[str] = []
+    # matrix_headers 조회 인덱스 (ColorMatrix 파싱 후 다시 만듦)
+    header_index = ColorHeaderIndex(matrix_headers)
 
     # â”€â”€ í—¬í¼ í•¨ìˆ˜ë“¤ â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
@@ -281,42 +308,10 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
         return False
 
     def _map_value_to_matrix_header(value: str) -> str:
-        v = clean_text(value)
-        if not v or not matrix_headers:
-            return ""
-        base = re.sub(r"\s+\d{2,4}$", "", v).strip()
-        base_norm = normalize_header(base) if base else ""
-        if base_norm:
-            for h in matrix_headers:
-                if base_norm and base_norm in normalize_header(h):
-                    return h
-        lv = v.lower()
-        if "tango" in lv:
-            for h in matrix_headers:
-                hn = normalize_header(h)
-                if ("seasalt" in hn and "blue" in hn) or ("seasaltwblue" in hn):
-                    return h
-        return ""
-
-    def _extract_cc_number(text: str) -> str:
-        m = re.search(r"\b(\d{9,})\b", clean_text(text))
-        return m.group(1) if m else ""
+        return header_index.map_value(value)
 
     def _map_header_to_matrix_header(header_txt: str) -> str:
-        if not header_txt or not matrix_headers:
-            return ""
-        cc = _extract_cc_number(header_txt)
-        if cc:
-            for h in matrix_headers:
-                if _extract_cc_number(h) == cc:
-                    return h
-        hn = normalize_header(header_txt)
-        if hn:
-            for h in matrix_headers:
-                mh = normalize_header(h)
-                if hn in mh or mh in hn:
-                    return h
-        return ""
+        return header_index.map_header(header_txt)
 
     def _sanitize_color_header(header_txt: str, allow_loose: bool = False) -> str:
         h = format_color_header_text(header_txt)
@@ -338,7 +333,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
         if matrix_headers:
             mapped = _map_header_to_matrix_header(h)
             return mapped or ""
-        return h if _extract_cc_number(h) else ""
+        return h if extract_cc_number(h) else ""
 
     def _resolve_graphic_header(header_txt: str, value_txt: str, color_pos: int) -> str:
         """
@@ -362,27 +357,11 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
 
         return ""
 
-    def _find_graphic_color_image(prod: str, material: str, *header_variants) -> Optional[bytes]:
-        """
-        Try multiple header text variants then CC-number fallback
-        to find a graphic color image from graphic_color_images dict.
-        """
-        for htxt in header_variants:
-            if htxt:
-                b = graphic_color_images.get((prod, material, htxt))
-                if b:
-                    return b
-        # CC number fallback: match by same CC number in any stored key
-        for htxt in header_variants:
-            if not htxt:
-                continue
-            cc_m = re.search(r'\b(\d{9,})\b', htxt)
-            if cc_m:
-                cc_num = cc_m.group(1)
-                for (p, m, h), img_bytes in graphic_color_images.items():
-                    if p == prod and m == material and cc_num in h:
-                        return img_bytes
-        return None
+    def _color_column_id(header_txt: str, is_graphic: bool) -> Optional[int]:
+        """컬러 헤더 → 컬럼 id. Graphic은 기존 컬럼만 사용, 그 외는 처음 나오면 컬럼 추가."""
+        if is_graphic:
+            return color_headers_order.id_of(header_txt)
+        return color_headers_order.add(header_txt)
 
     def _is_full_header(header_norm: List[str]) -> bool:
         """í…Œì´ë¸”ì´ Product, Material Name ë“± ì „ì²´ í—¤ë”ë¥¼ ê°€ì§€ê³  ìžˆëŠ”ì§€"""
@@ -440,7 +419,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
         return any(bk in lvv for bk in bad_keywords)
 
     def _is_footer_or_noise_row(cells: List[str]) -> bool:
-        joined = " ".join([clean_text(x) for x in cells]).lower()
+        joined = " ".join(clean_row(cells)).lower()
         if not joined.strip():
             return True
         noise = [
@@ -506,17 +485,16 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
                     header_txt = _sanitize_color_header(raw_header_txt)
                 if not header_txt:
                     continue
-                if (not is_graphic) and header_txt not in color_headers_order:
-                    color_headers_order.append(header_txt)
-                current_block_rows[target_i].colors[header_txt] = v
+                col_id = _color_column_id(header_txt, is_graphic)
+                if col_id is None:
+                    continue
+                current_block_rows[target_i].colors[col_id] = v
                 appended_any = True
 
-                # Graphic: find color image with fallback matching
+                # Graphic: find color image with fallback matching (bound after the pass)
                 brow = current_block_rows[target_i]
                 if (brow.category or "").lower() == "graphic":
-                    b = _find_graphic_color_image(brow.product, brow.material_name, header_txt, raw_header_txt)
-                    if b:
-                        brow.color_images[header_txt] = b
+                    pending_graphic_images.append((brow, col_id, (header_txt, raw_header_txt)))
         return appended_any
 
     def _append_color_values_from_text_continuation(page_text: str) -> bool:
@@ -544,10 +522,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
         chunk_re = re.compile(r"([A-Z0-9][A-Za-z0-9\s\-/]*?\b\d{9,}\b)")
         header_chunks = [_sanitize_color_header(c) for c in chunk_re.findall(header_line)]
         header_chunks = [h for h in header_chunks if h]
-        if header_chunks:
-            for h in header_chunks:
-                if h not in color_headers_order:
-                    color_headers_order.append(h)
+        header_chunk_ids = [color_headers_order.add(h) for h in header_chunks]
 
         data_lines: List[str] = []
         for line in lines[start_idx + 1:]:
@@ -576,7 +551,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
                     tv = clean_text(t)
                     if not tv or _looks_like_noise_color_value(tv):
                         continue
-                    hk = header_chunks[col_i]
+                    hk = header_chunk_ids[col_i]
                     if current_block_rows[target_i].colors.get(hk) != tv:
                         current_block_rows[target_i].colors[hk] = tv
                         appended_any = True
@@ -586,43 +561,62 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
                     if not tv or _looks_like_noise_color_value(tv):
                         continue
                     header_key = _map_value_to_matrix_header(tv)
-                    if header_key and header_key not in color_headers_order:
-                        color_headers_order.append(header_key)
-                    if header_key and current_block_rows[target_i].colors.get(header_key) != tv:
-                        current_block_rows[target_i].colors[header_key] = tv
+                    if not header_key:
+                        continue
+                    key_id = color_headers_order.add(header_key)
+                    if current_block_rows[target_i].colors.get(key_id) != tv:
+                        current_block_rows[target_i].colors[key_id] = tv
                         appended_any = True
             target_i += 1
 
         return appended_any
 
-    # â”€â”€ ì´ë¯¸ì§€ ë§µ ì‚¬ì „ ì¶”ì¶œ â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
-
-    image_map = extract_bom_image_map_from_pdf(pdf_path)
-    graphic_color_images = extract_graphic_color_cell_images_from_pdf(pdf_path)
-
-    # â”€â”€ ë©”ì¸ íŒŒì‹± ë£¨í”„ â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
-
     last_valid_header_info = None
     current_block_rows: List[BomRow] = []
+    current_block_index: Dict[Tuple[str, str], List[int]] = {}  # (product, material) → current_block_rows 인덱스
     row_to_bomrow_map: Dict[int, int] = {}       # â˜… raw_data_idx â†’ BomRow ì¸ë±ìŠ¤
     last_full_table_raw_data_count: int = 0       # â˜… ì›ë³¸ í…Œì´ë¸”ì˜ ì „ì²´ data í–‰ ìˆ˜ (header ì œì™¸)
     rows_per_page = {}
+    # (BomRow, color header key, lookup header variants): Graphic 컬러 이미지 지연 연결 대상
+    pending_graphic_images: List[Tuple[BomRow, int, Tuple[str, ...]]] = []
+
+    # ColorMatrix / 이미지 맵 / 메인 루프가 같은 세션(문서·테이블 캐시)을 공유
+    with open_session(pdf) as session:
+        # map 단계: BOM/ColorMatrix 페이지의 테이블 감지를 페이지 병렬로 미리 수행
+        # (아래 순차 루프가 reduce 단계로 섹션/continuation/행 매핑을 페이지 순서대로 처리)
+        session.prefetch_tables(sorted(
+            set(session.bom_page_indices()) | set(session.pages_with_tag(TAG_COLORMATRIX))
+        ))
+        matrix_headers = extract_color_headers_from_bom_colormatrix(session)
+        header_index = ColorHeaderIndex(matrix_headers)
+
+        # ── 이미지 수집기: 메인 루프와 같은 패스에서 같은 테이블을 소비 ──
+        image_collector = BomImageMapCollector(session)
+        graphic_collector = GraphicColorImageCollector(session)
+        image_map = image_collector.img_map
+        collectors = [image_collector, graphic_collector] if bom_images else [graphic_collector]
+
+        # â”€â”€ ë©”ì¸ íŒŒì‹± ë£¨í”„ â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
-    with pdfplumber.open(pdf_path) as pdf:
         current_section: str = ""
 
-        for page_num, page in enumerate(pdf.pages, 1):
+        # Measurement/Documents 전용 페이지는 테이블 감지·텍스트 fallback 모두 건너뜀
+        for page_idx in session.bom_page_indices():
+            page_num = page_idx + 1
+            page = session.page(page_idx)
             page_row_count = 0
-            table_objs = page.find_tables() or []
             appended_continuation_this_page = False
 
-            for tbl_idx, tbl_obj in enumerate(table_objs):
-                tbl = tbl_obj.extract() or []
+            for tbl_idx, page_table in enumerate(session.page_tables(page_idx)):
+                for collector in collectors:
+                    collector.visit_table(page_idx, page_table)
+
+                tbl = page_table.data
                 if not tbl or len(tbl) < 1 or not tbl[0]:
                     continue
 
-                header = [clean_text_keep_newlines(c) for c in tbl[0]]
-                header_norm = [normalize_header(c) for c in header]
+                header = list(page_table.header)
+                header_norm = page_table.header_norm
 
                 # â”€â”€â”€ 1) ê°€ë¡œ ë¶„í•  ì»¬ëŸ¬ continuation í…Œì´ë¸” â”€â”€â”€
                 if _is_color_continuation_table(header, header_norm, tbl):
@@ -632,18 +626,25 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
                     # â˜… continuation í…Œì´ë¸”ì—ì„œë„ Graphic ì´ë¯¸ì§€ ì¶”ì¶œ
                     if current_block_rows and row_to_bomrow_map:
                         cont_imgs = extract_continuation_graphic_images(
-                            page, tbl_obj, row_to_bomrow_map,
+                            page, page_table, row_to_bomrow_map,
                             current_block_rows, header, header_norm,
-                            pdf_path=pdf_path,
+                            pdf=session,
                         )
-                        for (prod, mat, htxt), png_bytes in cont_imgs.items():
-                            for brow in current_block_rows:
-                                if brow.product == prod and brow.material_name == mat:
-                                    # Map raw continuation header to color_headers_order entry
-                                    resolved = _map_header_to_matrix_header(htxt) if htxt else ""
-                                    final_key = resolved if (resolved and resolved in color_headers_order) else htxt
-                                    if final_key and final_key not in brow.color_images:
-                                        brow.color_images[final_key] = png_bytes
+                        for (prod, mat, htxt), cont_img in cont_imgs.items():
+                            targets = current_block_index.get((prod, mat))
+                            if not targets:
+                                continue
+                            # Map raw continuation header to color_headers_order entry
+                            resolved = _map_header_to_matrix_header(htxt) if htxt else ""
+                            final_key = color_headers_order.id_of(resolved) if resolved else None
+                            if final_key is None:
+                                final_key = color_headers_order.id_of(htxt)
+                            if final_key is None:
+                                continue
+                            for bi in targets:
+                                brow = current_block_rows[bi]
+                                if final_key not in brow.color_images:
+                                    brow.color_images[final_key] = cont_img
                     continue
 
                 # â”€â”€â”€ 2) Full-header í…Œì´ë¸” ì²˜ë¦¬ â”€â”€â”€
@@ -738,6 +739,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
 
                 # â”€â”€â”€ 3) ë°ì´í„° í–‰ íŒŒì‹± + row mapping êµ¬ì¶• â”€â”€â”€
                 block_rows: List[BomRow] = []
+                block_index: Dict[Tuple[str, str], List[int]] = {}
                 new_row_mapping: Dict[int, int] = {}  # raw_idx â†’ BomRow index
 
                 for r_idx in range(data_start, len(tbl)):
@@ -749,7 +751,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
 
                     prod = clean_text(r[idx_product] if idx_product < len(r) else "")
                     material = clean_text(r[idx_material] if idx_material < len(r) else "")
-                    row_cells_text = [prod, material] + [clean_text(x) for x in r]
+                    row_cells_text = [prod, material] + clean_row(r)
 
                     # footer/noise â†’ skip (ë§¤í•‘ ì•ˆ í•¨)
                     if _is_footer_or_noise_row(row_cells_text):
@@ -777,7 +779,7 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
                     supplier = clean_text(r[idx_supplier] if idx_supplier < len(r) else "")
 
                     # ì´ í…Œì´ë¸”ì— í¬í•¨ëœ ì»¬ëŸ¬ ì¶”ì¶œ
-                    colors: Dict[str, str] = {}
+                    colors: Dict[int, str] = {}
                     actual_color_end = min(color_end, len(r))
                     color_col_position = 0  # color_start부터의 위치 (matrix_headers 매칭용)
                     for ci in range(color_start, actual_color_end):
@@ -814,45 +816,44 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
                             continue
                         if not v:
                             continue
-                        if (not is_graphic_row) and header_txt not in color_headers_order:
-                            color_headers_order.append(header_txt)
-                        colors[header_txt] = v
+                        col_id = _color_column_id(header_txt, is_graphic_row)
+                        if col_id is None:
+                            continue
+                        colors[col_id] = v
 
-                    color_images: Dict[str, bytes] = {}
-                    if (current_section or "").lower() == "graphic":
-                        for htxt in list(colors.keys()):
-                            b = _find_graphic_color_image(prod, material, htxt, raw_header_txt)
-                            if b:
-                                color_images[htxt] = b
                     bomrow_idx = len(block_rows)
                     new_row_mapping[raw_idx] = bomrow_idx  # â˜… ë§¤í•‘ ê¸°ë¡
 
-                    block_rows.append(
-                        BomRow(
-                            category=current_section,
-                            product=prod,
-                            material_name=material,
-                            supplier_article_number=supp_art,
-                            usage=usage,
-                            quality_details=quality,
-                            supplier=supplier,
-                            colors=colors,
-                            image_png=image_map.get((current_section, prod, material)),
-                            color_images=color_images,
-                        )
+                    brow = BomRow(
+                        category=current_section,
+                        product=prod,
+                        material_name=material,
+                        supplier_article_number=supp_art,
+                        usage=usage,
+                        quality_details=quality,
+                        supplier=supplier,
+                        colors=colors,
+                        color_images={},
                     )
+                    if (current_section or "").lower() == "graphic":
+                        for col_id in colors:
+                            htxt = color_headers_order[col_id]
+                            pending_graphic_images.append((brow, col_id, (htxt, raw_header_txt)))
+                    block_index.setdefault((brow.product, brow.material_name), []).append(bomrow_idx)
+                    block_rows.append(brow)
                     page_row_count += 1
 
                 if block_rows:
                     rows.extend(block_rows)
                     current_block_rows = block_rows
+                    current_block_index = block_index
                     row_to_bomrow_map = new_row_mapping
                     last_full_table_raw_data_count = len(tbl) - data_start  # â˜… ì „ì²´ data í–‰ ìˆ˜ ê¸°ë¡
 
             # í…Œì´ë¸”ë¡œ ëª» ìž¡ì€ continuation â†’ í…ìŠ¤íŠ¸ fallback
             if current_block_rows and not appended_continuation_this_page:
                 try:
-                    page_text = page.extract_text() or ""
+                    page_text = session.page_text(page_idx)
                     if _append_color_values_from_text_continuation(page_text):
                         appended_continuation_this_page = True
                 except Exception:
@@ -860,19 +861,28 @@ def extract_bom_rows_from_pdf(pdf_path: str) -> Tuple[List[BomRow], List[str]]:
 
             rows_per_page[page_num] = page_row_count
 
+    # 이미지 맵은 전체 페이지를 본 뒤에 완성되므로 행 이미지는 패스 종료 후 한 번에 연결
+    for brow in rows:
+        brow.image_png = image_map.get((brow.category, brow.product, brow.material_name))
+    for brow, col_id, header_variants in pending_graphic_images:
+        b = graphic_collector.find(brow.product, brow.material_name, *header_variants)
+        if b:
+            brow.color_images[col_id] = b
+
     if not color_headers_order and matrix_headers:
-        color_headers_order = matrix_headers.copy()
+        color_headers_order = ColorHeaderSet(matrix_headers)
 
     # â˜… ìž˜ë¦° í—¤ë” ë³´ì •: BOMColorMatrixì—ì„œ ê°€ì ¸ì˜¨ ì „ì²´ í—¤ë”ì™€ ë§¤ì¹­
     if matrix_headers and color_headers_order:
-        _fix_truncated_headers(color_headers_order, matrix_headers, rows)
+        _fix_truncated_headers(color_headers_order, matrix_headers, rows, header_index=header_index)
 
-    return rows, color_headers_order
+    return rows, color_headers_order.to_list()
 
 
-def _fix_truncated_headers(color_headers_order: List[str],
+def _fix_truncated_headers(color_headers_order: ColorHeaderSet,
                            matrix_headers: List[str],
-                           rows: List[BomRow]) -> None:
+                           rows: List[BomRow],
+                           header_index: Optional[ColorHeaderIndex] = None) -> None:
     """
     pdfplumberê°€ ì¢ì€ ì»¬ëŸ¼ì—ì„œ ìž˜ë¼ë‚¸ í—¤ë”ë¥¼
     BOMColorMatrixì˜ ì „ì²´ í—¤ë”ë¡œ êµì²´.
@@ -881,10 +891,6 @@ def _fix_truncated_headers(color_headers_order: List[str],
     ë‹¨, BOM Detail í—¤ë”ê°€ ì´ë¯¸ ì™„ì „í•œ CC Numberë¥¼ ê°€ì§€ê³  ìžˆìœ¼ë©´ êµì²´í•˜ì§€ ì•ŠìŒ
     (BOMColorMatrix í…Œì´ë¸” íŒŒì‹± ì‹œ ì…€ ë³‘í•© ì•„í‹°íŒ©íŠ¸ë¡œ CC Nameì´ ì˜¤ì—¼ë  ìˆ˜ ìžˆìœ¼ë¯€ë¡œ)
     """
-    def _extract_cc_number(h: str) -> str:
-        m = re.search(r'(\d{9,})', h)
-        return m.group(1) if m else ""
-
     def _has_complete_cc_number(h: str) -> bool:
         """í—¤ë”ê°€ ì™„ì „í•œ 9ìžë¦¬+ CC Numberë¥¼ í¬í•¨í•˜ëŠ”ì§€"""
         m = re.search(r'\d{9,}', h)
@@ -894,14 +900,10 @@ def _fix_truncated_headers(color_headers_order: List[str],
         # "000003239937" â†’ ì™„ì „, "0" ë˜ëŠ” "00" â†’ ìž˜ë¦° ê²ƒ
         return len(m.group()) >= 9
 
-    # matrix í—¤ë”ë¥¼ CC Numberë¡œ ì¸ë±ì‹±
-    matrix_by_cc: Dict[str, str] = {}
-    for mh in matrix_headers:
-        cc = _extract_cc_number(mh)
-        if cc:
-            matrix_by_cc[cc] = mh
-
-    if not matrix_by_cc:
+    # matrix 헤더 CC Number prefix 인덱스 (없으면 여기서 만듦)
+    if header_index is None:
+        header_index = ColorHeaderIndex(matrix_headers)
+    if not header_index.has_cc_numbers:
         return
 
     # êµì²´ í•„ìš”í•œ í—¤ë” ì°¾ê¸° (CC Numberê°€ ìž˜ë¦° ê²ƒë§Œ)
@@ -914,24 +916,39 @@ def _fix_truncated_headers(color_headers_order: List[str],
         trailing = re.findall(r'(\d+)\s*$', old_h.replace('\n', ' '))
         if not trailing:
             continue
-        partial = trailing[-1]
-        for full_cc, full_h in matrix_by_cc.items():
-            if full_cc.startswith(partial) and len(partial) < len(full_cc):
-                replacements[old_h] = full_h
-                break
+        full_h = header_index.complete_truncated_cc(trailing[-1])
+        if full_h:
+            replacements[old_h] = full_h
 
     if not replacements:
         return
 
-    # color_headers_order êµì²´
-    for i, h in enumerate(color_headers_order):
+    # color_headers_order 교체 (컬럼 id는 그대로, 헤더 텍스트만 변경)
+    renamed: List[int] = []
+    for i, h in enumerate(color_headers_order.headers):
         if h in replacements:
-            color_headers_order[i] = replacements[h]
-
-    # ëª¨ë“  BomRowì˜ colors/color_images í‚¤ êµì²´
-    for row in rows:
-        for old_h, new_h in replacements.items():
-            if old_h in row.colors:
-                row.colors[new_h] = row.colors.pop(old_h)
-            if old_h in row.color_images:
-                row.color_images[new_h] = row.color_images.pop(old_h)
+            color_headers_order.rename(i, replacements[h])
+            renamed.append(i)
+
+    # 교체 결과 같은 헤더가 된 컬럼들: 값은 첫 번째 컬럼 id로 모음
+    # (기존 헤더 값 위에 교체된 헤더 값을 컬럼 순서대로 덮어씀)
+    merged: Dict[int, List[int]] = {}
+    for i in renamed:
+        canon = color_headers_order.id_of(color_headers_order[i])
+        if canon not in merged:
+            merged[canon] = [
+                j for j, h in enumerate(color_headers_order.headers)
+                if h == color_headers_order[i] and j not in renamed
+            ]
+        merged[canon].append(i)
+    for canon, members in merged.items():
+        if members == [canon]:
+            continue
+        for row in rows:
+            for store in (row.colors, row.color_images):
+                value = None
+                for j in members:
+                    if j in store:
+                        value = store.pop(j)
+                if value is not None:
+                    store[canon] = value
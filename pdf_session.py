@@ -0,0 +1,363 @@
+"""
+PDF 세션 모듈
+- 하나의 PDF를 fill 작업 동안 한 번만 열어 모든 추출기가 공유
+- pdfplumber 문서 / PyMuPDF 문서는 처음 필요할 때 open
+- 페이지 텍스트, 테이블은 lazy 로드 후 캐시
+- text_layer: 페이지당 텍스트 레이어 1개 (pdfplumber 텍스트 + 단어 위치 + PyMuPDF 텍스트)
+  Master / ColorMatrix / 텍스트 continuation / Design Image 위치 탐색이 모두 공유
+- visit_page_tables: 페이지당 find_tables()를 1회만 돌리고 여러 소비자가 같은 테이블을 공유
+- page_tags: 키워드 기반 페이지 분류 (page_classifier) 캐시
+- caches: 페이지 렌더/이미지 등 용량 제한 LRU 캐시 (close 시 정리, cache_stats()로 조회)
+- 테이블 추출 백엔드 선택: pdfplumber (기본) / pymupdf
+  (BOM_TABLE_BACKEND 환경변수 또는 PdfSession(table_backend=...))
+- prefetch_tables: 페이지별 테이블 감지(map 단계)를 프로세스 풀에서 병렬 수행해 캐시에 채움
+  섹션/continuation/행 매핑(reduce 단계)은 호출 측에서 페이지 순서대로 순차 처리
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pdfplumber
+from pdfplumber.utils.text import WordExtractor, WordMap
+
+from utils import clean_row_keep_newlines, normalize_row
+from page_classifier import classify_page_text, select_bom_pages
+from resource_cache import CacheRegistry
+
+try:
+    import fitz as _fitz  # PyMuPDF
+except ImportError:
+    _fitz = None
+
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class PageTable:
+    """
+    페이지에서 감지된 테이블 1개.
+    추출 데이터, 셀 bbox, 정규화된 헤더를 한 번만 계산해 모든 소비자가 공유함.
+    header는 공유 객체이므로 수정이 필요하면 list(t.header)로 복사해서 사용.
+    """
+    page_index: int
+    data: List[List[Optional[str]]]
+    # cells[r][c]: data[r][c] 셀의 bbox (x0, top, x1, bottom), 병합 셀은 None
+    cells: List[List[Optional[BBox]]]
+    header: List[str] = field(init=False)
+    header_norm: List[str] = field(init=False)
+
+    def __post_init__(self):
+        first = self.data[0] if (self.data and self.data[0]) else []
+        self.header = clean_row_keep_newlines(first)
+        self.header_norm = normalize_row(self.header)
+
+    def cell_bbox(self, row_idx: int, col_idx: int) -> Optional[BBox]:
+        if row_idx >= len(self.cells) or col_idx >= len(self.cells[row_idx]):
+            return None
+        return self.cells[row_idx][col_idx]
+
+
+# ----------------------------
+# 테이블 추출 백엔드
+# 두 백엔드 모두 같은 PageTable(data / 셀 bbox / 헤더) 구조를 돌려줌
+# ----------------------------
+def _pdfplumber_page_tables(session: "PdfSession", page_idx: int) -> List[PageTable]:
+    tables = []
+    for tbl_obj in (session.page(page_idx).find_tables() or []):
+        tables.append(PageTable(
+            page_index=page_idx,
+            data=tbl_obj.extract() or [],
+            cells=[list(row.cells) for row in tbl_obj.rows],
+        ))
+    return tables
+
+
+def _pymupdf_page_tables(session: "PdfSession", page_idx: int) -> List[PageTable]:
+    """
+    PyMuPDF page.find_tables() (C 구현) 기반.
+    PyMuPDF가 테이블 바깥 텍스트를 헤더로 추정한 경우(header.external)는
+    extract()에 포함되지 않으므로 pdfplumber와 동일하게 테이블 첫 행이 헤더가 됨.
+    """
+    doc = session.fitz_doc
+    if doc is None:
+        return _pdfplumber_page_tables(session, page_idx)
+    tables = []
+    for tbl_obj in doc[page_idx].find_tables().tables:
+        tables.append(PageTable(
+            page_index=page_idx,
+            data=tbl_obj.extract() or [],
+            cells=[
+                [tuple(c) if c is not None else None for c in row.cells]
+                for row in tbl_obj.rows
+            ],
+        ))
+    return tables
+
+
+TABLE_BACKENDS = {
+    "pdfplumber": _pdfplumber_page_tables,
+    "pymupdf": _pymupdf_page_tables,
+}
+DEFAULT_TABLE_BACKEND = os.environ.get("BOM_TABLE_BACKEND", "pdfplumber")
+
+# 페이지 병렬 map 단계 설정
+# BOM_PARSE_WORKERS: 0/미설정이면 CPU 수, 1이면 병렬 처리 안 함
+PARSE_WORKERS = int(os.environ.get("BOM_PARSE_WORKERS", "0") or 0)
+# 이보다 페이지가 적으면 프로세스 풀 기동 비용이 더 커서 순차 처리
+PARALLEL_MIN_PAGES = 8
+# 워커 1개가 한 번에 처리하는 페이지 수 (워커마다 PDF를 한 번씩 open)
+PAGES_PER_TASK = 4
+
+
+def _scan_pages_worker(pdf_path: str, table_backend: str, page_indices: List[int]) -> List[Tuple[int, List[PageTable]]]:
+    """map 단계: 상태 없이 페이지별 테이블(data + 셀 bbox)만 추출. 워커 프로세스에서 실행."""
+    with PdfSession(pdf_path, table_backend=table_backend) as session:
+        return [(i, session.page_tables(i)) for i in page_indices]
+
+
+class PageTextLayer:
+    """
+    페이지 1개의 텍스트 레이어 (각 항목은 처음 필요할 때 1회만 계산).
+    - text / words: pdfplumber 단어 추출 1회로 함께 만듦
+      (page.extract_text() / page.extract_words() 기본 설정 결과와 동일)
+    - fitz_text: PyMuPDF page.get_text() (PyMuPDF 없거나 실패 시 None)
+    """
+
+    def __init__(self, session: "PdfSession", page_idx: int):
+        self._session = session
+        self._page_idx = page_idx
+        self._text: Optional[str] = None
+        self._words: Optional[List[dict]] = None
+        self._fitz_text: Optional[str] = None
+        self._fitz_done = False
+
+    def _extract(self) -> None:
+        page = self._session.page(self._page_idx)
+        try:
+            tuples = list(WordExtractor().iter_extract_tuples(page.chars))
+            textmap = WordMap(tuples).to_textmap(
+                presorted=True,
+                layout_bbox=page.bbox,
+                layout_width=page.width,
+                layout_height=page.height,
+            )
+            self._words = [word for word, _chars in tuples]
+            self._text = textmap.as_string or ""
+        except Exception:
+            # pdfplumber 내부 API가 다른 버전: 공개 API로 각각 추출
+            self._text = page.extract_text() or ""
+            self._words = page.extract_words() or []
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._extract()
+        return self._text
+
+    @property
+    def words(self) -> List[dict]:
+        if self._words is None:
+            self._extract()
+        return self._words
+
+    @property
+    def fitz_text(self) -> Optional[str]:
+        if not self._fitz_done:
+            self._fitz_done = True
+            doc = self._session.fitz_doc
+            if doc is not None:
+                try:
+                    self._fitz_text = doc[self._page_idx].get_text() or ""
+                except Exception:
+                    self._fitz_text = None
+        return self._fitz_text
+
+
+class PdfSession:
+    """
+    PDF 한 개에 대한 공유 핸들.
+    경로 대신 넘겨주면 각 추출 함수가 PDF를 다시 열지 않고 이 세션의 문서/캐시를 재사용함.
+    """
+
+    def __init__(self, pdf_path: str, table_backend: Optional[str] = None):
+        backend = (table_backend or DEFAULT_TABLE_BACKEND).strip().lower()
+        if backend not in TABLE_BACKENDS:
+            raise ValueError(f"알 수 없는 테이블 백엔드: {backend} (사용 가능: {', '.join(TABLE_BACKENDS)})")
+        self.pdf_path = pdf_path
+        self.table_backend = backend
+        self._plumber = None
+        self._fitz_doc = None
+        self._text_layers: Dict[int, PageTextLayer] = {}
+        self._tables_cache: Dict[int, List[PageTable]] = {}
+        self._tags_cache: Dict[int, FrozenSet[str]] = {}
+        # 이미지 처리용 캐시 (image_handler가 이름별로 생성)
+        self.caches = CacheRegistry()
+
+    # ── 문서 핸들 ─────────────────────────────────────────────
+
+    @property
+    def plumber(self):
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self.pdf_path)
+        return self._plumber
+
+    @property
+    def fitz_doc(self):
+        """PyMuPDF 문서 (PyMuPDF 미설치 또는 open 실패 시 None)."""
+        if self._fitz_doc is None and _fitz is not None:
+            try:
+                self._fitz_doc = _fitz.open(self.pdf_path)
+            except Exception:
+                self._fitz_doc = None
+        return self._fitz_doc
+
+    @property
+    def pages(self) -> list:
+        return self.plumber.pages
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def page(self, page_idx: int):
+        return self.pages[page_idx]
+
+    # ── lazy 페이지 데이터 ─────────────────────────────────────
+
+    def text_layer(self, page_idx: int) -> PageTextLayer:
+        layer = self._text_layers.get(page_idx)
+        if layer is None:
+            layer = PageTextLayer(self, page_idx)
+            self._text_layers[page_idx] = layer
+        return layer
+
+    def page_text(self, page_idx: int) -> str:
+        """page.extract_text() 결과 (페이지당 1회만 계산)."""
+        return self.text_layer(page_idx).text
+
+    def page_words(self, page_idx: int) -> List[dict]:
+        """page.extract_words() 결과 (page_text와 같은 단어 추출 1회로 계산)."""
+        return self.text_layer(page_idx).words
+
+    def fitz_page_text(self, page_idx: int) -> Optional[str]:
+        """PyMuPDF page.get_text() 결과 (페이지당 1회, PyMuPDF 없거나 실패 시 None)."""
+        return self.text_layer(page_idx).fitz_text
+
+    def page_tables(self, page_idx: int) -> List[PageTable]:
+        """선택된 백엔드의 find_tables() + extract() 결과 (페이지당 1회만 계산)."""
+        if page_idx not in self._tables_cache:
+            self._tables_cache[page_idx] = TABLE_BACKENDS[self.table_backend](self, page_idx)
+        return self._tables_cache[page_idx]
+
+    def prefetch_tables(self, page_indices: Sequence[int], workers: Optional[int] = None) -> None:
+        """
+        page_tables() 캐시를 프로세스 풀로 미리 채움 (map 단계).
+        결과는 순차 추출과 동일한 PageTable이므로 이후 처리 결과는 달라지지 않음.
+        워커 1개이거나 페이지가 적으면 아무것도 하지 않고, 풀 실패 시에도 순차 lazy 추출로 진행.
+        """
+        todo = [i for i in page_indices if i not in self._tables_cache]
+        n_workers = workers if workers is not None else (PARSE_WORKERS or os.cpu_count() or 1)
+        n_workers = min(n_workers, (len(todo) + PAGES_PER_TASK - 1) // PAGES_PER_TASK)
+        if n_workers <= 1 or len(todo) < PARALLEL_MIN_PAGES:
+            return
+
+        chunks = [todo[i:i + PAGES_PER_TASK] for i in range(0, len(todo), PAGES_PER_TASK)]
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = [
+                    pool.submit(_scan_pages_worker, self.pdf_path, self.table_backend, chunk)
+                    for chunk in chunks
+                ]
+                for fut in futures:
+                    for page_idx, tables in fut.result():
+                        self._tables_cache[page_idx] = tables
+        except Exception:
+            # 풀 기동/피클링 실패 등: 채우지 못한 페이지는 page_tables()가 순차로 추출
+            pass
+
+    # ── 페이지 분류 ──────────────────────────────────────────
+
+    def page_tags(self, page_idx: int) -> FrozenSet[str]:
+        """
+        페이지 종류 태그 (page_classifier.TAG_*).
+        PyMuPDF 텍스트(페이지당 수 ms)를 우선 사용하고, 없으면 pdfplumber 텍스트로 분류.
+        """
+        if page_idx not in self._tags_cache:
+            self._tags_cache[page_idx] = classify_page_text(self._classifier_text(page_idx))
+        return self._tags_cache[page_idx]
+
+    def _classifier_text(self, page_idx: int) -> str:
+        text = self.fitz_page_text(page_idx)
+        if text is not None:
+            return text
+        return self.page_text(page_idx)
+
+    def pages_with_tag(self, tag: str) -> List[int]:
+        return [i for i in range(self.page_count) if tag in self.page_tags(i)]
+
+    def bom_page_indices(self) -> List[int]:
+        """BOM Details 파싱 대상 페이지 (Measurement/Documents 전용 페이지 제외, BOM 페이지에서 이어지는 페이지는 유지)."""
+        return select_bom_pages([self.page_tags(i) for i in range(self.page_count)])
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """캐시별 hit / miss / eviction / bytes 카운터 (close 후에도 조회 가능)."""
+        return self.caches.stats()
+
+    # ── 종료 ─────────────────────────────────────────────────
+
+    def close(self):
+        self._text_layers.clear()
+        self._tables_cache.clear()
+        self._tags_cache.clear()
+        self.caches.close()
+        if self._plumber is not None:
+            try:
+                self._plumber.close()
+            except Exception:
+                pass
+            self._plumber = None
+        if self._fitz_doc is not None:
+            try:
+                self._fitz_doc.close()
+            except Exception:
+                pass
+            self._fitz_doc = None
+
+    def __enter__(self) -> "PdfSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+PdfSource = Union[str, PdfSession]
+
+
+@contextmanager
+def open_session(pdf: PdfSource) -> Iterator[PdfSession]:
+    """
+    경로 또는 PdfSession을 받아 세션을 돌려줌.
+    경로로 열었으면 블록 종료 시 닫고, 넘겨받은 세션은 호출자가 닫도록 그대로 둠.
+    """
+    if isinstance(pdf, PdfSession):
+        yield pdf
+        return
+    session = PdfSession(pdf)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def visit_page_tables(session: PdfSession, consumers: Sequence[object]) -> None:
+    """
+    BOM 후보 페이지의 테이블을 한 번씩 순회하며 각 소비자의 visit_table(page_idx, table)을 호출.
+    테이블 감지/추출은 세션 캐시를 통해 페이지당 1회만 수행됨.
+    """
+    for page_idx in session.bom_page_indices():
+        for table in session.page_tables(page_idx):
+            for consumer in consumers:
+                consumer.visit_table(page_idx, table)
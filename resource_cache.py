@@ -0,0 +1,104 @@
+"""
+세션 단위 리소스 캐시
+- 바이트 용량 상한 + LRU 삭제
+- hit / miss / eviction / 현재 bytes 카운터 조회 (stats)
+- 소유자(PdfSession)가 close()할 때 함께 비워짐 → 장시간 실행되는 프로세스(Streamlit)에서도 메모리가 쌓이지 않음
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class BoundedCache:
+    """
+    바이트 용량 상한이 있는 LRU 캐시.
+    sizeof(value)로 항목 크기를 계산하며, 상한보다 큰 단일 항목은 저장하지 않음.
+    """
+
+    def __init__(self, name: str, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = max(0, int(self._sizeof(value)))
+        if key in self._data:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._data[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._data:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """있으면 반환, 없으면 factory()로 만들어 저장 후 반환 (None은 저장하지 않음)."""
+        if key in self._data:
+            return self.get(key)
+        self.misses += 1
+        value = factory()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def _remove(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class CacheRegistry:
+    """이름별 BoundedCache 모음. 소유자 수명에 맞춰 한 번에 조회/정리."""
+
+    def __init__(self):
+        self._caches: Dict[str, BoundedCache] = {}
+
+    def get(self, name: str, max_bytes: int, sizeof: Callable[[Any], int]) -> BoundedCache:
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = BoundedCache(name, max_bytes, sizeof)
+            self._caches[name] = cache
+        return cache
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+    def close(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
@@ -0,0 +1,76 @@
+"""
+페이지 단위 사각형 공간 인덱스 (균일 그리드)
+- 이미지 rect를 한 번만 그리드에 등록하고, 셀 bbox와 겹칠 수 있는 후보만 돌려줌
+- 정확한 겹침 면적 판정은 호출 측에서 후보에 대해서만 수행
+- 조회 범위는 등록된 그리드 범위로 잘라서, 비정상적으로 큰 bbox도 빈 칸을 끝없이 훑지 않음
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+# 그리드 셀 크기 (pt). BOM 테이블 셀/썸네일 크기와 비슷한 수준
+DEFAULT_CELL_SIZE = 48.0
+
+
+def overlap_area(a: BBox, b: BBox) -> float:
+    w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    return w * h
+
+
+class RectIndex:
+    """
+    (x0, top, x1, bottom) 사각형 목록에 대한 균일 그리드 인덱스.
+    query() 결과는 등록 순서(원래 리스트 순서)로 정렬되어, 선형 스캔과 같은 순서로 후보를 평가할 수 있음.
+    """
+
+    def __init__(self, rects: Sequence[BBox], cell_size: float = DEFAULT_CELL_SIZE):
+        self.rects: List[BBox] = [tuple(float(v) for v in r) for r in rects]
+        self.cell_size = cell_size
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for i, r in enumerate(self.rects):
+            for key in self._cells_for(r):
+                self._grid.setdefault(key, []).append(i)
+        # 등록된 그리드 칸의 범위 (gx0, gy0, gx1, gy1), 비어 있으면 None
+        self._extent = None
+        if self._grid:
+            gxs = [k[0] for k in self._grid]
+            gys = [k[1] for k in self._grid]
+            self._extent = (min(gxs), min(gys), max(gxs), max(gys))
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def _cells_for(self, bbox: BBox, extent=None):
+        """bbox가 걸치는 그리드 칸. extent가 있으면 그 범위 안의 칸만."""
+        x0, top, x1, bottom = bbox
+        if x1 < x0 or bottom < top:
+            return
+        s = self.cell_size
+        gx0, gx1 = math.floor(x0 / s), math.floor(x1 / s)
+        gy0, gy1 = math.floor(top / s), math.floor(bottom / s)
+        if extent is not None:
+            gx0, gy0 = max(gx0, extent[0]), max(gy0, extent[1])
+            gx1, gy1 = min(gx1, extent[2]), min(gy1, extent[3])
+        for gx in range(gx0, gx1 + 1):
+            for gy in range(gy0, gy1 + 1):
+                yield gx, gy
+
+    def query(self, bbox: BBox) -> List[int]:
+        """bbox와 겹칠 수 있는 사각형 인덱스 (등록 순서)."""
+        if not self._grid:
+            return []
+        found = set()
+        for key in self._cells_for(bbox, self._extent):
+            ids = self._grid.get(key)
+            if ids:
+                found.update(ids)
+        return sorted(found)
+
+    def any_overlap(self, bbox: BBox, min_area: float = 0.0) -> bool:
+        """겹침 면적이 min_area보다 큰 사각형이 하나라도 있는지."""
+        return any(overlap_area(bbox, self.rects[i]) > min_area for i in self.query(bbox))
+
+    def any_overlap_many(self, bboxes: Sequence[BBox], min_area: float = 0.0) -> List[bool]:
+        return [self.any_overlap(b, min_area) for b in bboxes]
@@ -3,23 +3,25 @@ BOM PDF -> Excel Auto Filler  (Streamlit Web App)
 
 기존 tkinter GUI의 모든 기능을 100% 동일하게 웹에서 제공합니다.
 - 단일 PDF  → 단일 Excel 파일
-- 복수 PDF  → 하나의 Excel 파일, PDF별 시트 분리
+- 복수 PDF  → 하나의 Excel 파일, PDF별 시트 분리 (너무 크면 여러 파일 + 인덱스, zip으로 다운로드)
 - 이미지 처리 (Design Image, BOM Row Image, Graphic Color Image) 동일
 """
 
+import io
 import os
 import sys
 import tempfile
+import zipfile
 
 import streamlit as st
-from openpyxl import load_workbook
 
 # 같은 디렉토리의 모듈을 import 할 수 있도록 경로 보장
 _APP_DIR = os.path.dirname(os.path.abspath(__file__))
 if _APP_DIR not in sys.path:
     sys.path.insert(0, _APP_DIR)
 
-from excel_writer import fill_template, fill_sheet, sanitize_sheet_name
+from excel_writer import fill_template
+from batch import fill_combined_workbooks
 
 # ── 페이지 설정 ──────────────────────────────────────────────
 st.set_page_config(
@@ -32,10 +34,11 @@ st.title("📋 BOM PDF → Excel 자동 입력")
 st.caption("PDF에서 BOM 데이터를 추출하여 Excel 양식에 자동으로 입력합니다.")
 
 DEFAULT_TEMPLATE = os.path.join(_APP_DIR, "양식.xlsx")
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
 # ── Session State 초기화 ─────────────────────────────────────
 if "result" not in st.session_state:
-    st.session_state.result = None        # (filename, bytes)
+    st.session_state.result = None        # (filename, bytes, mime)
 if "logs" not in st.session_state:
     st.session_state.logs = []
 
@@ -113,7 +116,7 @@ if st.button("🚀 실행하기", disabled=not can_run, use_container_width=True
                     st.write(f"   ✅ 완료")
 
                     with open(out_path, "rb") as f:
-                        st.session_state.result = (out_name, f.read())
+                        st.session_state.result = (out_name, f.read(), XLSX_MIME)
                 except Exception as e:
                     logs.append(f"   ❌ 실패: {e}")
                     st.error(f"실패: {e}")
@@ -122,67 +125,50 @@ if st.button("🚀 실행하기", disabled=not can_run, use_container_width=True
 
             else:
                 # ── 복수 PDF → 하나의 파일, 시트별 분리 ──
-                wb = load_workbook(tpl_path)
-                original_sheets = list(wb.sheetnames)
-                template_ws = wb.active
-
-                sheet_names_used = set()
-                success_count = 0
-                fail_count = 0
-
-                for idx, (pdf_path, pdf_file) in enumerate(
-                    zip(pdf_paths, uploaded_pdfs)
-                ):
-                    pdf_name = pdf_file.name
+                # 파싱은 워커 프로세스에서 병렬, 시트는 업로드 순서대로 기록
+                def _on_result(idx, total, pdf_name, sheet_name, error):
                     progress.progress(
                         idx / total,
-                        text=f"[{idx + 1}/{total}] {pdf_name}",
+                        text=f"[{idx}/{total}] {pdf_name}",
                     )
-                    st.write(f"📄 [{idx + 1}/{total}] **{pdf_name}**")
-                    logs.append(f"📄 [{idx + 1}/{total}] 처리 중: {pdf_name}")
-
-                    try:
-                        new_ws = wb.copy_worksheet(template_ws)
-                        design_number = fill_sheet(new_ws, pdf_path)
-
-                        # 시트 이름 결정
-                        name = design_number or os.path.splitext(pdf_name)[0]
-                        name = sanitize_sheet_name(name)
-                        base_name = name
-                        counter = 1
-                        while name in sheet_names_used:
-                            suffix = f"_{counter}"
-                            name = sanitize_sheet_name(
-                                base_name[: 31 - len(suffix)] + suffix
-                            )
-                            counter += 1
-                        sheet_names_used.add(name)
-                        new_ws.title = name
-
-                        logs.append(f"   ✅ 완료 → 시트: {name}")
-                        st.write(f"   ✅ → 시트: **{name}**")
-                        success_count += 1
-
-                    except Exception as e:
-                        logs.append(f"   ❌ 실패: {e}")
-                        st.write(f"   ❌ 실패: {e}")
-                        fail_count += 1
-
-                # 원본 템플릿 시트 모두 삭제
-                for sn in original_sheets:
-                    if sn in wb.sheetnames:
-                        wb.remove(wb[sn])
+                    st.write(f"📄 [{idx}/{total}] **{pdf_name}**")
+                    logs.append(f"📄 [{idx}/{total}] 처리: {pdf_name}")
+                    if error is None:
+                        logs.append(f"   ✅ 완료 → 시트: {sheet_name}")
+                        st.write(f"   ✅ → 시트: **{sheet_name}**")
+                    else:
+                        logs.append(f"   ❌ 실패: {error}")
+                        st.write(f"   ❌ 실패: {error}")
 
                 out_name = "BOM_combined_filled.xlsx"
                 out_path = os.path.join(tmpdir, out_name)
-                wb.save(out_path)
+                out = fill_combined_workbooks(
+                    tpl_path,
+                    pdf_paths,
+                    out_path,
+                    labels=[f.name for f in uploaded_pdfs],
+                    on_result=_on_result,
+                )
 
-                with open(out_path, "rb") as f:
-                    st.session_state.result = (out_name, f.read())
+                if not out.files:
+                    logs.append("\n❌ 모든 PDF 처리에 실패해 합본 파일을 만들지 못했습니다.")
+                    st.error("모든 PDF 처리에 실패해 합본 파일을 만들지 못했습니다.")
+                elif out.index_path:
+                    # 여러 파일로 나뉜 경우: 합본들 + 인덱스를 zip 하나로
+                    buf = io.BytesIO()
+                    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+                        for p in out.files + [out.index_path]:
+                            zf.write(p, os.path.basename(p))
+                    st.session_state.result = ("BOM_combined_filled.zip", buf.getvalue(), "application/zip")
+                    logs.append(f"\n📚 {len(out.files)}개 파일로 나눠 저장 (+ 인덱스)")
+                    st.write(f"📚 {len(out.files)}개 파일로 나눠 저장 (+ 인덱스)")
+                else:
+                    with open(out_path, "rb") as f:
+                        st.session_state.result = (out_name, f.read(), XLSX_MIME)
 
                 progress.progress(1.0, text="완료!")
                 logs.append(
-                    f"\n📊 결과: 성공 {success_count}개 / 실패 {fail_count}개"
+                    f"\n📊 결과: 성공 {out.success_count}개 / 실패 {out.fail_count}개"
                 )
 
         status.update(label="✅ 처리 완료!", state="complete")
@@ -190,12 +176,12 @@ if st.button("🚀 실행하기", disabled=not can_run, use_container_width=True
 # ── 4) 결과 다운로드 ────────────────────────────────────────
 if st.session_state.result:
     st.subheader("4. 결과 다운로드")
-    fname, fbytes = st.session_state.result
+    fname, fbytes, fmime = st.session_state.result
     st.download_button(
         label=f"📥 {fname} 다운로드",
         data=fbytes,
         file_name=fname,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        mime=fmime,
         use_container_width=True,
     )
 
@@ -0,0 +1,74 @@
+"""
+테이블 백엔드 parity 점검
+- 같은 PDF를 pdfplumber / pymupdf 백엔드로 각각 파싱해 결과를 비교
+- 비교 대상: 컬러 헤더 순서, BOM 행(텍스트/컬러 값), 이미지 유무
+
+사용법:
+  python table_backend_parity.py <pdf 또는 glob> [...]
+  (차이가 있으면 종료 코드 1)
+"""
+import glob
+import os
+import sys
+from typing import List
+
+from pdf_parser import extract_bom_rows_from_pdf
+from pdf_session import PdfSession
+
+
+def _row_key(r, headers: List[str]) -> tuple:
+    # 컬러 id → 헤더 텍스트 (백엔드별 컬럼 순서가 달라도 내용으로 비교)
+    return (
+        r.category, r.product, r.material_name, r.supplier_article_number,
+        r.usage, r.quality_details, r.supplier,
+        tuple(sorted((headers[k], v) for k, v in r.colors.items())),
+        r.image_png is not None,
+        tuple(sorted(headers[k] for k in r.color_images)),
+    )
+
+
+def compare_backends(pdf_path: str) -> List[str]:
+    """두 백엔드의 파싱 결과 차이를 사람이 읽을 수 있는 문자열 목록으로 반환 (같으면 빈 리스트)."""
+    results = {}
+    for backend in ("pdfplumber", "pymupdf"):
+        with PdfSession(pdf_path, table_backend=backend) as session:
+            results[backend] = extract_bom_rows_from_pdf(session)
+
+    (rows_a, headers_a), (rows_b, headers_b) = results["pdfplumber"], results["pymupdf"]
+    diffs: List[str] = []
+
+    if headers_a != headers_b:
+        diffs.append(f"color headers: {headers_a} != {headers_b}")
+    if len(rows_a) != len(rows_b):
+        diffs.append(f"row count: {len(rows_a)} != {len(rows_b)}")
+    for i, (ra, rb) in enumerate(zip(rows_a, rows_b)):
+        if _row_key(ra, headers_a) != _row_key(rb, headers_b):
+            diffs.append(f"row {i}: {ra.product} / {ra.material_name} != {rb.product} / {rb.material_name}")
+    return diffs
+
+
+def main(argv: List[str]) -> int:
+    paths: List[str] = []
+    for arg in argv:
+        paths.extend(sorted(glob.glob(arg)) or [arg])
+    if not paths:
+        print("사용법: python table_backend_parity.py <pdf 또는 glob> [...]")
+        return 2
+
+    failed = 0
+    for p in paths:
+        diffs = compare_backends(p)
+        if diffs:
+            failed += 1
+            print(f"❌ {os.path.basename(p)}")
+            for d in diffs:
+                print(f"   - {d}")
+        else:
+            print(f"✅ {os.path.basename(p)}")
+
+    print(f"\n{len(paths) - failed}/{len(paths)} 일치")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,245 @@
+"""
+컴파일된 템플릿 레이아웃 (TemplateLayout)
+- 양식 시트에서 매번 다시 찾던 값들을 한 번만 계산해 둠:
+  Master 값 셀 좌표, BOM 헤더 행/컬럼 맵, 템플릿 테이블 끝 컬럼(컬러 슬롯 수), 본문 행 용량,
+  첫 본문 행 스타일 팔레트, Design Image 영역
+- 키: SHA-256(레이아웃 버전 salt + 템플릿 파일 바이트) → 같은 양식이면 PDF/세션/실행이 달라도 재사용
+- 프로세스 안에서는 메모리, 실행 간에는 디스크(피클)에 보관
+
+환경변수:
+  BOM_TEMPLATE_CACHE=0            디스크 보관 안 함 (프로세스 안 메모리 재사용은 유지)
+  BOM_TEMPLATE_CACHE_DIR=<경로>   보관 위치 (기본 ~/.cache/bom_auto_filler/template)
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.worksheet.worksheet import Worksheet
+
+from excel_template import (
+    StylePalette,
+    find_master_value_cells,
+    find_bom_header_row_and_cols,
+)
+from image_handler import design_image_range
+
+# 레이아웃 계산 방식이 바뀌면 올려서 기존 보관본 무효화
+LAYOUT_VERSION = "1"
+
+CACHE_ENABLED = os.environ.get("BOM_TEMPLATE_CACHE", "1") != "0"
+CACHE_DIR = os.environ.get(
+    "BOM_TEMPLATE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bom_auto_filler", "template"),
+)
+
+_SUFFIX = ".pkl"
+_CHUNK = 1024 * 1024
+
+
+def _has_any_border(cell) -> bool:
+    b = cell.border
+    if b is None:
+        return False
+    return any(
+        getattr(side, "style", None)
+        for side in (b.left, b.right, b.top, b.bottom)
+    )
+
+
+@dataclass
+class TemplateLayout:
+    sheet_title: str
+    master_cells: Dict[str, Tuple[int, int]]
+    header_row: int
+    col_map: Dict[str, int]
+    # 헤더/본문 테두리·값으로 찾은 원래 테이블 끝 컬럼
+    template_end_col: int
+    design_image_range: Tuple[int, int, int, int]
+    # 본문(start_row 이후) 컬럼별 마지막 셀 행
+    body_last_rows: Dict[int, int] = field(default_factory=dict)
+    # start_row 셀 스타일 id 묶음 (StyleArray 값)
+    start_row_styles: Dict[int, Tuple[int, ...]] = field(default_factory=dict)
+    # 탐색 과정에서 시트에 생기던 빈 셀 좌표 (prime()에서 그대로 만들어 출력 동일하게 유지)
+    scan_cells: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def start_row(self) -> int:
+        return self.header_row + 1
+
+    @property
+    def has_image_column(self) -> bool:
+        return "image" in self.col_map
+
+    @property
+    def c_supplier(self) -> int:
+        c = self.col_map.get("supplierallocate") or self.col_map.get("supplier")
+        return c if c is not None else self.col_map["qualitydetails"]
+
+    @property
+    def c_color_start(self) -> int:
+        return self.c_supplier + 1
+
+    @property
+    def style_start_col(self) -> int:
+        return self.col_map.get("category") or self.col_map["product"]
+
+    @property
+    def color_capacity(self) -> int:
+        """템플릿에 원래 준비된 컬러 컬럼 수."""
+        return max(0, self.template_end_col - self.c_color_start + 1)
+
+    def max_existing_row(self, start_col: int, end_col: int) -> int:
+        """start_col~end_col 본문의 마지막 행 (본문이 비었으면 start_row - 1)."""
+        rows = [r for c, r in self.body_last_rows.items() if start_col <= c <= end_col]
+        return max(rows, default=self.start_row - 1)
+
+    @property
+    def row_capacity(self) -> int:
+        """템플릿에 원래 준비된 본문 행 수."""
+        return max(0, self.max_existing_row(self.style_start_col, self.template_end_col) - self.start_row + 1)
+
+    def start_row_palette(self, start_col: int, end_col: int) -> StylePalette:
+        """row_style_palette(ws, start_row, start_col, end_col)와 같은 팔레트."""
+        return {
+            c: StyleArray(self.start_row_styles[c]) if c in self.start_row_styles else StyleArray()
+            for c in range(start_col, end_col + 1)
+        }
+
+    def prime(self, ws: Worksheet):
+        """탐색 없이 쓰는 시트에도 탐색이 만들던 빈 셀을 만들어 둠 (시트 범위/행 용량 동일)."""
+        for r, c in self.scan_cells:
+            ws.cell(r, c)
+
+
+def compile_template_layout(ws: Worksheet) -> TemplateLayout:
+    """양식 시트에서 레이아웃을 계산. 값을 쓰기 전(원본 양식 상태)의 시트여야 함."""
+    master_cells = find_master_value_cells(ws)
+    box_range = design_image_range(ws)
+    header_row, col_map = find_bom_header_row_and_cols(ws)
+    layout = TemplateLayout(
+        sheet_title=ws.title,
+        master_cells=master_cells,
+        header_row=header_row,
+        col_map=col_map,
+        template_end_col=0,
+        design_image_range=box_range,
+    )
+
+    # Detect original template table end column from header/body border footprint.
+    style_start_col = layout.style_start_col
+    template_end_col = max(layout.c_supplier, col_map["qualitydetails"], col_map.get("image") or 0)
+    blank_streak = 0
+    scan_row_end = min(ws.max_row, layout.start_row + 2)
+    for cc in range(style_start_col, ws.max_column + 1):
+        marked = False
+        for rr in range(header_row, scan_row_end + 1):
+            cell = ws.cell(rr, cc)
+            if _has_any_border(cell) or bool(cell.value):
+                marked = True
+                break
+        if marked:
+            template_end_col = cc
+            blank_streak = 0
+        else:
+            blank_streak += 1
+            if cc > template_end_col and blank_streak >= 8:
+                break
+    layout.template_end_col = template_end_col
+
+    start_row = layout.start_row
+    for (r, c), cell in ws._cells.items():
+        if r >= start_row and r > layout.body_last_rows.get(c, 0):
+            layout.body_last_rows[c] = r
+        if r == start_row:
+            layout.start_row_styles[c] = tuple(cell._style)
+        if cell._value is None and not cell.has_style:
+            layout.scan_cells.append((r, c))
+    layout.scan_cells.sort()
+    return layout
+
+
+# ----------------------------
+# 템플릿 파일 단위 재사용
+# ----------------------------
+_layouts: Dict[str, TemplateLayout] = {}
+# (절대 경로, mtime, size) → 키 (같은 파일을 반복해서 해시하지 않음)
+_path_keys: Dict[Tuple[str, int, int], str] = {}
+
+
+def template_cache_key(template_path: str) -> str:
+    st = os.stat(template_path)
+    path_key = (os.path.abspath(template_path), st.st_mtime_ns, st.st_size)
+    key = _path_keys.get(path_key)
+    if key is None:
+        h = hashlib.sha256()
+        h.update(f"bom-template:{LAYOUT_VERSION}:".encode("utf-8"))
+        with open(template_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        key = h.hexdigest()
+        _path_keys[path_key] = key
+    return key
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key + _SUFFIX)
+
+
+def _load(key: str) -> Optional[TemplateLayout]:
+    path = _entry_path(key)
+    try:
+        with open(path, "rb") as f:
+            layout = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return layout if isinstance(layout, TemplateLayout) else None
+
+
+def _store(key: str, layout: TemplateLayout) -> None:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(layout, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, _entry_path(key))
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+    except Exception:
+        # 보관 실패는 결과에 영향 없음 (다음 실행에서 다시 계산)
+        return
+
+
+def template_layout_for(template_path: str, ws: Worksheet) -> TemplateLayout:
+    """
+    template_path 양식의 레이아웃. ws는 그 양식을 load_workbook한 시트(원본 상태)로,
+    메모리/디스크에 없을 때만 탐색에 사용.
+    """
+    try:
+        key = template_cache_key(template_path)
+    except OSError:
+        return compile_template_layout(ws)
+
+    layout = _layouts.get(key)
+    if layout is None and CACHE_ENABLED:
+        layout = _load(key)
+    if layout is None or layout.sheet_title != ws.title:
+        layout = compile_template_layout(ws)
+        if CACHE_ENABLED:
+            _store(key, layout)
+    _layouts[key] = layout
+    return layout
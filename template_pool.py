@@ -0,0 +1,106 @@
+"""
+양식 워크북 풀
+- 양식 xlsx는 템플릿 파일당 한 번만 load_workbook으로 파싱하고, 원본 상태 워크북 스냅샷(피클)을 보관
+- 작업마다 스냅샷에서 복제본을 만들어 줌 (셀 값/스타일 id 배열, 스타일 테이블, 행/열 크기가 그대로 복원되므로
+  load_workbook 결과와 저장 결과가 같음). 복제본은 서로/원본과 공유하는 가변 상태가 없어 마음대로 수정해도 됨
+- 키: template_layout.template_cache_key (양식 파일 SHA-256) → TemplateLayout과 함께 보관
+- 피클로 스냅샷을 뜰 수 없는 양식(openpyxl이 피클 못 하는 객체 포함)은 레이아웃만 보관하고 매번 load_workbook
+
+환경변수:
+  BOM_TEMPLATE_POOL=0           풀 사용 안 함 (매번 load_workbook)
+  BOM_TEMPLATE_POOL_SIZE=<개수> 보관할 양식 수 (기본 4, 오래 사용하지 않은 것부터 제거)
+"""
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.workbook.workbook import Workbook
+
+from template_layout import TemplateLayout, template_cache_key, template_layout_for
+
+POOL_ENABLED = os.environ.get("BOM_TEMPLATE_POOL", "1") != "0"
+POOL_SIZE = max(1, int(os.environ.get("BOM_TEMPLATE_POOL_SIZE", "4") or 4))
+
+
+def _clone(snapshot: bytes) -> Workbook:
+    wb = pickle.loads(snapshot)
+    # DimensionHolder(defaultdict)는 피클 복원 시 default_factory/worksheet 연결이 빠지므로 다시 연결
+    for ws in wb.worksheets:
+        for holder, factory in ((ws.row_dimensions, ws._add_row), (ws.column_dimensions, ws._add_column)):
+            holder.worksheet = ws
+            holder.default_factory = factory
+    return wb
+
+
+def _load(template_path: str) -> Tuple[Workbook, Optional[TemplateLayout]]:
+    wb = load_workbook(template_path)
+    try:
+        layout = template_layout_for(template_path, wb.active)
+    except ValueError:
+        # 양식 오류는 시트를 쓸 때 (write_sheet) 같은 예외로 보고
+        layout = None
+    return wb, layout
+
+
+class TemplatePool:
+    def __init__(self, max_templates: int = POOL_SIZE):
+        self.max_templates = max_templates
+        # 키 → (원본 워크북 스냅샷, 레이아웃). 스냅샷이 None이면 피클 불가 양식 → 매번 load_workbook
+        self._entries: "OrderedDict[str, Tuple[Optional[bytes], Optional[TemplateLayout]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def checkout(self, template_path: str) -> Tuple[Workbook, Optional[TemplateLayout]]:
+        """
+        양식 워크북 복제본과 레이아웃. 복제본은 호출 측 소유.
+        layout이 None이면 양식에서 Master 라벨/BOM 헤더를 찾지 못한 것.
+        """
+        try:
+            key = template_cache_key(template_path)
+        except OSError:
+            return _load(template_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            snapshot, layout = entry
+            if snapshot is None:
+                return load_workbook(template_path), layout
+            return _clone(snapshot), layout
+
+        wb, layout = _load(template_path)
+        try:
+            snapshot = pickle.dumps(wb, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # 피클 못 하는 객체가 든 양식: 이 양식은 요청마다 load_workbook (레이아웃은 재사용)
+            snapshot = None
+        with self._lock:
+            self._entries[key] = (snapshot, layout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_templates:
+                self._entries.popitem(last=False)
+        # 방금 읽은 워크북은 스냅샷과 상태를 공유하지 않으므로 그대로 넘겨줌
+        return wb, layout
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_pool = TemplatePool()
+
+
+def checkout_template(template_path: str) -> Tuple[Workbook, Optional[TemplateLayout]]:
+    """양식 워크북(복제본)과 레이아웃. BOM_TEMPLATE_POOL=0이면 매번 load_workbook."""
+    if not POOL_ENABLED:
+        return _load(template_path)
+    return _pool.checkout(template_path)
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 사용자 캐시(~/.cache)를 건드리지 않도록 모듈 import 전에 지정
+os.environ.setdefault("BOM_PARSE_CACHE_DIR", tempfile.mkdtemp(prefix="bom_parse_cache_"))
+
+TEMPLATE_PATH = os.path.join(ROOT, "양식.xlsx")
+
+
+@pytest.fixture
+def template_path() -> str:
+    return TEMPLATE_PATH
+
+
+@pytest.fixture(scope="session")
+def sample_pdfs(tmp_path_factory):
+    """합성 BOM PDF 3개 (a: 2컬러, b: 다른 Design Number, c: 4컬러 + Measurement 여러 장)."""
+    from pdf_factory import make_bom_pdf
+
+    d = tmp_path_factory.mktemp("pdfs")
+    return [
+        make_bom_pdf(str(d / "a.pdf")),
+        make_bom_pdf(str(d / "b.pdf"), design="D70001", nfabric=2),
+        make_bom_pdf(str(d / "c.pdf"), design="D70002", ncolors=4, nfabric=5, measurement_pages=3),
+    ]
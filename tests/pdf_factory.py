@@ -0,0 +1,119 @@
+"""
+테스트용 합성 BOM PDF 생성 (PyMuPDF로 선/텍스트/이미지를 직접 그림)
+- 표지(Master 블록 + Design Image), BOMColorMatrix, BOM Details(+ 컬러 continuation), Measurement 페이지
+"""
+import io
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import fitz
+from PIL import Image
+
+COLORS = [
+    ("A STONES THROW", "000003239937"), ("NAVY BLUE", "000003239938"),
+    ("RED SUN", "000003239939"), ("GREEN MOSS", "000003239940"),
+]
+PAGE = dict(width=842, height=595)
+
+
+def png(color, size=(40, 30)) -> bytes:
+    im = Image.new("RGB", size, color)
+    for x in range(5, 20):
+        for y in range(5, 15):
+            im.putpixel((x, y), (0, 0, 0))
+    buf = io.BytesIO()
+    im.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def draw_table(page, x0: float, y0: float, widths: Sequence[float], heights: Sequence[float],
+               cells: List[List[str]], images: Optional[Dict[Tuple[int, int], bytes]] = None):
+    xs = [x0]
+    for w in widths:
+        xs.append(xs[-1] + w)
+    ys = [y0]
+    for h in heights:
+        ys.append(ys[-1] + h)
+    for x in xs:
+        page.draw_line((x, ys[0]), (x, ys[-1]), width=0.5)
+    for y in ys:
+        page.draw_line((xs[0], y), (xs[-1], y), width=0.5)
+    for ri, row in enumerate(cells):
+        for ci, txt in enumerate(row):
+            if txt:
+                page.insert_textbox(fitz.Rect(xs[ci] + 1, ys[ri] + 1, xs[ci + 1] - 1, ys[ri + 1] - 1), txt, fontsize=5)
+    for (ri, ci), data in (images or {}).items():
+        page.insert_image(fitz.Rect(xs[ci] + 3, ys[ri] + 8, xs[ci + 1] - 3, ys[ri + 1] - 2), stream=data)
+
+
+MASTER_TEXT = (
+    "Design Number {design} Design Concept X\nDescription DISNEY 365 TOP SET Category Girls\n"
+    "BOM Number 000795275 Sub-Category Tops\nLegacy Style Numbers 805554 Carryover No\n"
+    "Hang/Fold Instructions Tops- Hang Booking Track Y\nDesign Image"
+)
+
+BOM_HEADER = ["Product", "Material Name", "Supplier\nArticle Number", "Usage", "Image", "Quality\nDetails",
+              "Supplier\n[Allocate]", "Only for\nProduct Colors"]
+BOM_WIDTHS = [50, 80, 60, 40, 50, 60, 60, 50]
+
+
+def add_cover(doc, design: str = "D64229"):
+    p = doc.new_page(**PAGE)
+    p.insert_text((40, 40), f"Tech Pack {design}", fontsize=12)
+    p.insert_textbox(fitz.Rect(40, 60, 500, 160), MASTER_TEXT.format(design=design), fontsize=8)
+    p.insert_image(fitz.Rect(60, 170, 360, 420), stream=png((200, 220, 240), (300, 250)))
+    return p
+
+
+def add_colormatrix(doc, colors=COLORS):
+    p = doc.new_page(**PAGE)
+    p.insert_text((40, 40), "BOMColorMatrix", fontsize=10)
+    rows = [["CC Name", "Type", "BOM CC Number"]] + [[n, "Color", cc] for n, cc in colors]
+    draw_table(p, 40, 60, [200, 80, 120], [20] * len(rows), rows)
+    return p
+
+
+def fabric_rows(n: int, ncolors: int, start: int = 0) -> List[List[str]]:
+    return [
+        [f"1000{i}1", f"Jersey {i}", f"ART{i}", "Body", "", "100% Cotton", "ACME", ""]
+        + [f"Color {i}-{j}" for j in range(ncolors)] + [""]
+        for i in range(start, start + n)
+    ]
+
+
+def add_bom_page(doc, colors, body: List[List[str]], images=None, title: str = "BOM Details"):
+    hdr = BOM_HEADER + [f"{n} -\n{cc}" for n, cc in colors] + ["Comment"]
+    p = doc.new_page(**PAGE)
+    p.insert_text((40, 30), title, fontsize=10)
+    draw_table(p, 20, 40, BOM_WIDTHS + [90] * len(colors) + [60], [30] + [36] * len(body), [hdr] + body, images)
+    return p
+
+
+def add_measurement(doc, n_rows: int = 20):
+    p = doc.new_page(**PAGE)
+    p.insert_text((40, 30), "Measurement POM Name Grade Rule", fontsize=10)
+    rows = [["POM", "Description", "Tol", "S", "M", "L"]] + [
+        [f"P{j}", "Body Length", "1/2", "10", "11", "12"] for j in range(n_rows)
+    ]
+    draw_table(p, 20, 40, [60, 200, 50, 50, 50, 50], [18] * len(rows), rows)
+    return p
+
+
+def make_bom_pdf(path: str, design: str = "D64229", ncolors: int = 2, nfabric: int = 3, measurement_pages: int = 1):
+    """표지 + ColorMatrix + BOM Details 한 페이지(Fabric/Graphic/Packaging) + Measurement."""
+    doc = fitz.open()
+    colors = COLORS[:ncolors]
+    add_cover(doc, design)
+    add_colormatrix(doc, colors)
+    body = [[f"Fabric ({nfabric})"] + [""] * (len(BOM_HEADER) + ncolors)]
+    body += fabric_rows(nfabric, ncolors)
+    body.append(["Graphic (1)"] + [""] * (len(BOM_HEADER) + ncolors))
+    body.append(["", "Screen Print", "GR1", "Front", "", "Ink", "PRINTCO", ""] + [f"Print {j}" for j in range(ncolors)] + [""])
+    body.append(["Packaging and Labels (1)"] + [""] * (len(BOM_HEADER) + ncolors))
+    body.append(["200001", "Hang Tag", "HT1", "Tag", "", "Paper", "TAGCO", ""] + ["White 01"] * ncolors + [""])
+    gi, pi = nfabric + 3, nfabric + 5
+    images = {(gi, len(BOM_HEADER)): png((255, 0, 0)), (pi, 4): png((0, 0, 255))}
+    add_bom_page(doc, colors, body, images)
+    for _ in range(measurement_pages):
+        add_measurement(doc)
+    doc.save(path)
+    return path
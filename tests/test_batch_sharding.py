@@ -0,0 +1,84 @@
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+import batch
+from batch import NO_SHARDING, ShardLimits, fill_combined_workbooks
+
+ENGINES = ["openpyxl", "xml"]
+
+
+@pytest.fixture
+def bad_pdf(tmp_path):
+    path = tmp_path / "bad.pdf"
+    path.write_bytes(b"not a pdf")
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_single_file_without_sharding(template_path, sample_pdfs, tmp_path, engine):
+    out_path = str(tmp_path / "combined.xlsx")
+    out = fill_combined_workbooks(template_path, sample_pdfs, out_path, workers=1, engine=engine, limits=NO_SHARDING)
+    assert (out.success_count, out.fail_count) == (3, 0)
+    assert out.files == [out_path] and out.index_path is None
+    assert load_workbook(out_path).sheetnames == ["D64229", "D70001", "D70002"]
+    assert set(out.sheet_files.values()) == {out_path}
+    assert sorted(os.listdir(tmp_path)) == ["combined.xlsx"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_shards_by_sheet_count_with_index(template_path, sample_pdfs, tmp_path, engine):
+    out_path = str(tmp_path / "combined.xlsx")
+    out = fill_combined_workbooks(
+        template_path, sample_pdfs, out_path, workers=1, engine=engine, limits=ShardLimits(2, 0, 0),
+    )
+    part1, part2 = str(tmp_path / "combined_part01.xlsx"), str(tmp_path / "combined_part02.xlsx")
+    assert out.files == [part1, part2]
+    assert out.index_path == str(tmp_path / "combined_index.xlsx")
+    assert not os.path.exists(out_path)
+    assert load_workbook(part1).sheetnames == ["D64229", "D70001"]
+    assert load_workbook(part2).sheetnames == ["D70002"]
+    assert out.sheet_files == {"D64229": part1, "D70001": part1, "D70002": part2}
+
+    rows = list(load_workbook(out.index_path)["Index"].iter_rows(values_only=True))
+    assert rows[0] == ("Design Number", "File", "Sheet", "PDF")
+    assert rows[1:] == [
+        ("D64229", "combined_part01.xlsx", "D64229", "a.pdf"),
+        ("D70001", "combined_part01.xlsx", "D70001", "b.pdf"),
+        ("D70002", "combined_part02.xlsx", "D70002", "c.pdf"),
+    ]
+
+
+def test_shard_limits_exceeded():
+    limits = ShardLimits(max_sheets=0, max_bytes=1000, max_images=3)
+    assert not limits.exceeded(500, 1000, 3)
+    assert limits.exceeded(1, 1001, 0)
+    assert limits.exceeded(1, 0, 4)
+    assert not NO_SHARDING.exceeded(10 ** 6, 10 ** 12, 10 ** 6)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_all_failed_leaves_no_file(template_path, bad_pdf, tmp_path, engine):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    results = []
+    out = fill_combined_workbooks(
+        template_path, [bad_pdf, bad_pdf], str(out_dir / "combined.xlsx"), workers=1, engine=engine,
+        on_result=lambda idx, total, label, sheet, error: results.append((idx, sheet, error is not None)),
+    )
+    assert (out.success_count, out.fail_count, out.files, out.index_path) == (0, 2, [], None)
+    assert results == [(1, None, True), (2, None, True)]
+    assert os.listdir(out_dir) == []
+
+
+def test_failed_close_removes_partial_shard(template_path, sample_pdfs, tmp_path, monkeypatch):
+    def _broken_close(self):
+        with open(self.output_path, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(batch._OpenpyxlBook, "close", _broken_close)
+    with pytest.raises(OSError):
+        fill_combined_workbooks(template_path, sample_pdfs[:1], str(tmp_path / "c.xlsx"), workers=1, engine="openpyxl")
+    assert os.listdir(tmp_path) == []
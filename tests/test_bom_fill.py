@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+import bom_fill
+
+SUMMARY_KEYS = {
+    "template", "mode", "engine", "workers", "output_dir", "total", "succeeded", "failed",
+    "skipped", "discarded", "elapsed_seconds", "outputs", "index", "pdfs",
+}
+RECORD_KEYS = {"pdf", "status", "output", "sheet", "seconds", "error"}
+
+
+@pytest.fixture
+def bad_pdf(tmp_path):
+    path = tmp_path / "bad.pdf"
+    path.write_bytes(b"not a pdf")
+    return str(path)
+
+
+def _run(argv, tmp_path):
+    summary_path = str(tmp_path / "summary.json")
+    code = bom_fill.main(argv + ["--summary", summary_path])
+    with open(summary_path, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert set(summary) == SUMMARY_KEYS
+    assert all(set(rec) == RECORD_KEYS for rec in summary["pdfs"])
+    return code, summary
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_per_file_success(template_path, sample_pdfs, tmp_path, workers):
+    out_dir = str(tmp_path / "out")
+    code, summary = _run(["-t", template_path, "-o", out_dir, "--workers", workers] + sample_pdfs[:2], tmp_path)
+    assert code == 0
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (2, 2, 0)
+    assert summary["outputs"] == [os.path.join(out_dir, "a_filled.xlsx"), os.path.join(out_dir, "b_filled.xlsx")]
+    assert all(os.path.isfile(p) for p in summary["outputs"])
+    assert all(rec["status"] == "ok" and rec["seconds"] > 0 for rec in summary["pdfs"])
+
+
+def test_per_file_failure_exit_code(template_path, sample_pdfs, bad_pdf, tmp_path):
+    code, summary = _run(["-t", template_path, "-o", str(tmp_path / "out"), sample_pdfs[0], bad_pdf], tmp_path)
+    assert code == 1
+    ok, failed = summary["pdfs"]
+    assert ok["status"] == "ok"
+    assert failed["status"] == "failed" and failed["output"] is None and failed["error"]
+
+
+def test_combined_records_sheet_and_output(template_path, sample_pdfs, bad_pdf, tmp_path):
+    out_dir = str(tmp_path / "out")
+    code, summary = _run(
+        ["-t", template_path, "-o", out_dir, "--mode", "combined", "--workers", "1", sample_pdfs[0], bad_pdf],
+        tmp_path,
+    )
+    combined = os.path.join(out_dir, bom_fill.COMBINED_NAME)
+    assert code == 1
+    assert summary["outputs"] == [combined] and summary["index"] is None
+    ok, failed = summary["pdfs"]
+    assert (ok["status"], ok["sheet"], ok["output"]) == ("ok", "D64229", combined)
+    assert (failed["status"], failed["sheet"], failed["output"]) == ("failed", None, None)
+
+
+def test_combined_fail_fast_discards_written_sheets(template_path, sample_pdfs, bad_pdf, tmp_path):
+    out_dir = tmp_path / "out"
+    code, summary = _run(
+        ["-t", template_path, "-o", str(out_dir), "--mode", "combined", "--workers", "1", "--fail-fast",
+         sample_pdfs[0], bad_pdf, sample_pdfs[1]],
+        tmp_path,
+    )
+    assert code == 1
+    assert [rec["status"] for rec in summary["pdfs"]] == ["discarded", "failed", "skipped"]
+    assert (summary["succeeded"], summary["failed"], summary["skipped"], summary["discarded"]) == (0, 1, 1, 1)
+    assert summary["outputs"] == [] and os.listdir(out_dir) == []
+
+
+def test_input_errors_exit_2(template_path, sample_pdfs, tmp_path, capsys):
+    out_dir = str(tmp_path / "out")
+    assert bom_fill.main(["-t", str(tmp_path / "missing.xlsx"), "-o", out_dir, sample_pdfs[0]]) == 2
+    assert bom_fill.main(["-t", template_path, "-o", out_dir, str(tmp_path / "missing.pdf")]) == 2
+    assert bom_fill.main(["-t", template_path, "-o", out_dir, str(tmp_path / "*.pdf")]) == 2
+    assert capsys.readouterr().out == ""
+
+
+def test_expand_inputs_and_output_names(tmp_path):
+    d = tmp_path / "in"
+    (d / "sub").mkdir(parents=True)
+    for name in ("b.pdf", "a.PDF", "note.txt", "sub/a.pdf"):
+        (d / name).write_bytes(b"")
+    paths = bom_fill.expand_inputs([str(d), str(d / "**" / "*.pdf"), str(d / "b.pdf")])
+    assert paths == [str(d / "a.PDF"), str(d / "b.pdf"), str(d / "sub" / "a.pdf")]
+    assert bom_fill.per_file_output_names(paths) == ["a_filled.xlsx", "b_filled.xlsx", "a_1_filled.xlsx"]
@@ -0,0 +1,68 @@
+from models import BomRow, ColorHeaderSet, column_ids
+from pdf_parser import _fix_truncated_headers
+
+NAVY = "NAVY BLUE - 000003239938"
+RED = "RED SUN - 000003239939"
+
+
+def _row(colors):
+    return BomRow("Fabric", "1", "Jersey", "ART", "Body", "Cotton", "ACME", colors)
+
+
+def test_ids_are_insertion_positions():
+    headers = ColorHeaderSet(["A", "B"])
+    assert headers.add("C") == 2
+    assert headers.add("A") == 0
+    assert len(headers) == 3 and list(headers) == ["A", "B", "C"]
+    assert "B" in headers and "Z" not in headers
+    assert headers.id_of("C") == 2 and headers.id_of("Z") is None
+    assert headers[1] == "B"
+
+
+def test_duplicates_resolve_to_first_position():
+    headers = ColorHeaderSet(["A", "B", "A"])
+    assert len(headers) == 3
+    assert headers.id_of("A") == 0
+    assert column_ids(headers.to_list()) == [0, 1, 0]
+    assert column_ids([]) == []
+
+
+def test_rename_keeps_ids_and_reindexes():
+    headers = ColorHeaderSet(["A -\n00", "B", "A"])
+    headers.rename(0, "A")
+    assert headers.to_list() == ["A", "B", "A"]
+    assert headers.id_of("A") == 0 and headers.id_of("A -\n00") is None
+    headers.rename(0, "C")
+    assert headers.id_of("A") == 2 and headers.id_of("C") == 0
+
+
+def test_to_list_is_a_copy():
+    headers = ColorHeaderSet(["A"])
+    out = headers.to_list()
+    out.append("B")
+    assert headers.to_list() == ["A"] and "B" not in headers
+
+
+def test_truncated_header_replaced_without_moving_values():
+    headers = ColorHeaderSet(["NAVY BLUE -\n0000032", RED])
+    rows = [_row({0: "Navy 10", 1: "Red 40"})]
+    _fix_truncated_headers(headers, [NAVY, RED], rows)
+    assert headers.to_list() == [NAVY, RED]
+    assert rows[0].colors == {0: "Navy 10", 1: "Red 40"}
+
+
+def test_truncated_header_merged_into_existing_column():
+    # 잘린 헤더가 보정 후 이미 있는 헤더와 같아짐 → 값은 첫 번째 컬럼 id로 모으고, 교체된 컬럼 값이 우선
+    headers = ColorHeaderSet(["NAVY BLUE -\n0000032", RED, NAVY])
+    rows = [_row({0: "from truncated", 1: "Red", 2: "from full"}), _row({1: "Red", 2: "only full"})]
+    _fix_truncated_headers(headers, [NAVY, RED], rows)
+    assert headers.to_list() == [NAVY, RED, NAVY]
+    assert column_ids(headers.to_list()) == [0, 1, 0]
+    assert rows[0].colors == {0: "from truncated", 1: "Red"}
+    assert rows[1].colors == {0: "only full", 1: "Red"}
+
+
+def test_complete_headers_are_not_replaced():
+    headers = ColorHeaderSet(["NAVY - 000003239938"])
+    _fix_truncated_headers(headers, [NAVY], [])
+    assert headers.to_list() == ["NAVY - 000003239938"]
@@ -0,0 +1,61 @@
+import fitz
+import pytest
+
+import pdf_factory as F
+from master_fields import scan_master_fields
+from pdf_parser import parse_master_from_pdf
+
+
+def _two_column_master(path: str) -> str:
+    """왼쪽/오른쪽 열을 따로 그린 Master 블록 (content stream 순서 ≠ 레이아웃 순서)."""
+    doc = fitz.open()
+    p = doc.new_page(**F.PAGE)
+    p.insert_text((40, 40), "Tech Pack D55501", fontsize=12)
+    left = ["Design Number D55501", "Description Crew Tee", "BOM Number 000812345", "Hang/Fold Instructions Tops- Fold"]
+    right = ["Category Boys", "Legacy Style Numbers 777777", "Sub-Category Tops", "Carryover No"]
+    for i, t in enumerate(left):
+        p.insert_text((40, 70 + 14 * i), t, fontsize=8)
+    for i, t in enumerate(right):
+        p.insert_text((300, 70 + 14 * i), t, fontsize=8)
+    doc.save(path)
+    return path
+
+
+def test_two_column_master_block_matches_layout_text(tmp_path):
+    # 기대값은 pdfplumber 레이아웃 텍스트 기준 (기존 라벨별 정규식 결과와 동일)
+    master = parse_master_from_pdf(_two_column_master(str(tmp_path / "master.pdf")))
+    assert master == {
+        "design_number": "D55501",
+        "description": "Crew Tee Legacy Style Numbers 777777",
+        "bom_number": "000812345",
+        "legacy_style_numbers": "777777",
+        "hang_fold_instructions": "Tops- Fold",
+    }
+
+
+def test_cover_page_master_fields(sample_pdfs):
+    assert parse_master_from_pdf(sample_pdfs[0]) == {
+        "design_number": "D64229",
+        "description": "DISNEY 365 TOP SET",
+        "bom_number": "000795275",
+        "legacy_style_numbers": "805554",
+        "hang_fold_instructions": "Tops- Hang",
+    }
+
+
+def test_scanner_stops_at_next_label():
+    text = "Design Number D1 Design Concept X\nDescription Tee Category Girls\nBOM Number 00012345678 Sub-Category"
+    fields = scan_master_fields(text)
+    assert fields["design_number"] == "D1"
+    assert fields["description"] == "Tee"
+    assert fields["bom_number"] == "00012345678"
+
+
+@pytest.mark.parametrize("final", [True, False])
+def test_scanner_partial_text(final):
+    fields = scan_master_fields("Design Number D1 Description", final=final)
+    if final:
+        assert fields["design_number"] == "D1"
+    else:
+        # 다섯 필드가 모두 확정되지 않으면 None → 호출 측이 다음 페이지를 이어 붙임
+        assert fields is None
@@ -0,0 +1,56 @@
+import fitz
+
+import pdf_factory as F
+from page_classifier import (
+    TAG_BOM, TAG_MASTER, TAG_MEASUREMENT, classify_page_text, select_bom_pages,
+)
+from pdf_parser import extract_bom_rows_from_pdf
+
+
+def test_classify_tags():
+    assert TAG_MASTER in classify_page_text("Design Number D1\nBOM\nNumber 0001")
+    assert classify_page_text("Measurement POM Name") == {TAG_MEASUREMENT}
+    assert TAG_BOM in classify_page_text("Fabric (3)\n100001 Jersey")
+
+
+def test_measurement_pages_skipped_without_bom_signal():
+    tags = [
+        classify_page_text("Design Number D1 BOM Number 1"),
+        classify_page_text("BOM Details Material Name"),
+        classify_page_text("Measurement POM Name"),
+        classify_page_text("Measurement Grade Rule"),
+    ]
+    # BOM 페이지 바로 뒤 페이지만 유지, 그 뒤 Measurement 전용 페이지는 제외
+    assert select_bom_pages(tags) == [0, 1, 2]
+
+
+def test_overflow_chain_across_plain_pages():
+    tags = [
+        classify_page_text("BOM Details"),
+        classify_page_text("200001 Hang Tag"),
+        classify_page_text("200002 Care Label Measurement"),
+        classify_page_text("Measurement POM Name"),
+    ]
+    assert select_bom_pages(tags) == [0, 1, 2]
+
+
+def test_cover_does_not_start_continuation():
+    tags = [classify_page_text("Design Number D1 BOM Number 1"), classify_page_text("Measurement")]
+    assert select_bom_pages(tags) == [0]
+
+
+def test_headerless_overflow_rows_before_measurement(tmp_path):
+    """헤더/CC Number 없는 BOM 넘김 행 + 같은 페이지 Measurement 텍스트 → 행이 빠지지 않아야 함."""
+    doc = fitz.open()
+    colors = F.COLORS[:2]
+    F.add_cover(doc)
+    F.add_colormatrix(doc, colors)
+    F.add_bom_page(doc, colors, [["Fabric (4)"] + [""] * 10] + F.fabric_rows(2, 2))
+    p = doc.new_page(**F.PAGE)
+    F.draw_table(p, 20, 40, F.BOM_WIDTHS + [90, 90, 60], [36, 36], F.fabric_rows(2, 2, start=2))
+    p.insert_text((40, 200), "Measurement", fontsize=10)
+    path = str(tmp_path / "overflow.pdf")
+    doc.save(path)
+
+    rows, _headers = extract_bom_rows_from_pdf(path)
+    assert [r.product for r in rows] == ["100001", "100011", "100021", "100031"]
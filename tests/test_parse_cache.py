@@ -0,0 +1,126 @@
+import os
+import pickle
+import shutil
+
+import pytest
+
+import batch
+import parse_cache
+from models import ParseResult
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    d = tmp_path / "cache"
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(d))
+    monkeypatch.setattr(parse_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(parse_cache, "_tracked_bytes", None)
+    return d
+
+
+def _result(path="x.pdf", payload=b""):
+    return ParseResult(path, {"design_number": "D1"}, [], ["A - 1"], payload or None)
+
+
+def _same_content(a, b):
+    return (a.master, a.rows, a.color_headers, a.design_image_png) == (b.master, b.rows, b.color_headers, b.design_image_png)
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_key_depends_on_content_version_and_images(tmp_path, monkeypatch):
+    a = _write(tmp_path / "a.pdf", b"%PDF same")
+    b = _write(tmp_path / "renamed.pdf", b"%PDF same")
+    c = _write(tmp_path / "c.pdf", b"%PDF other")
+
+    key = parse_cache.pdf_cache_key(a)
+    assert parse_cache.pdf_cache_key(b) == key
+    assert parse_cache.pdf_cache_key(c) != key
+    assert parse_cache.pdf_cache_key(a, bom_images=False) != key
+    monkeypatch.setattr(parse_cache, "PARSER_VERSION", parse_cache.PARSER_VERSION + "-next")
+    assert parse_cache.pdf_cache_key(a) != key
+
+
+def test_store_and_load_round_trip(cache_dir):
+    parse_cache.store("ab" * 32, _result(payload=b"png"))
+    loaded = parse_cache.load("ab" * 32)
+    assert loaded == _result(payload=b"png")
+    assert parse_cache.load("cd" * 32) is None
+
+
+@pytest.mark.parametrize("data", [b"not a pickle", pickle.dumps({"not": "a result"})])
+def test_corrupt_or_foreign_entry_is_a_miss(cache_dir, data):
+    key = "ef" * 32
+    path = parse_cache._entry_path(key)
+    os.makedirs(os.path.dirname(path))
+    _write(path, data)
+    assert parse_cache.load(key) is None
+    if data == b"not a pickle":
+        # 손상된 항목은 지워서 다음 저장이 덮어쓸 수 있게 함
+        assert not os.path.exists(path)
+
+
+def test_eviction_tracks_size_and_drops_oldest(cache_dir, monkeypatch):
+    payload = b"x" * 4000
+    parse_cache.store("00" * 32, _result(payload=payload))
+    entry_size = os.path.getsize(parse_cache._entry_path("00" * 32))
+    assert parse_cache._tracked_bytes == entry_size
+
+    # 4개 반이 들어가는 상한: 5번째 저장에서 상한의 90%까지 비움 → 가장 오래된 1개 삭제
+    monkeypatch.setattr(parse_cache, "CACHE_MAX_BYTES", entry_size * 4 + entry_size // 2)
+    keys = [f"{i:02d}" * 32 for i in range(5)]
+    for key in keys[1:4]:
+        parse_cache.store(key, _result(payload=payload))
+    for age, key in enumerate(keys[:4]):
+        os.utime(parse_cache._entry_path(key), (1000 + age, 1000 + age))
+    assert parse_cache._tracked_bytes == entry_size * 4
+    parse_cache.store(keys[4], _result(payload=payload))
+
+    left = [k for k in keys if os.path.exists(parse_cache._entry_path(k))]
+    assert left == keys[1:]
+    assert parse_cache._tracked_bytes == entry_size * 4
+    assert parse_cache._tracked_bytes <= parse_cache.CACHE_MAX_BYTES * parse_cache._EVICT_LOW_WATER
+
+
+def test_purge_removes_everything(cache_dir):
+    for i in range(3):
+        parse_cache.store(f"{i:02d}" * 32, _result())
+    assert parse_cache.purge() == 3
+    assert parse_cache._iter_entries() == []
+    assert parse_cache._tracked_bytes == 0
+    assert parse_cache.purge() == 0
+
+
+def test_cached_parse_skips_parser_on_hit(cache_dir, monkeypatch, sample_pdfs):
+    first = parse_cache.parse_pdf_cached(sample_pdfs[0])
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("parse_pdf called on cache hit")
+
+    monkeypatch.setattr(parse_cache, "parse_pdf", _fail)
+    copy = shutil.copy(sample_pdfs[0], str(cache_dir.parent / "copy.pdf"))
+    second = parse_cache.parse_pdf_cached(copy)
+    assert second.pdf_path == copy
+    assert _same_content(first, second)
+
+
+def test_batch_dedupes_identical_pdfs_with_cache_disabled(cache_dir, monkeypatch, sample_pdfs, tmp_path):
+    monkeypatch.setattr(parse_cache, "CACHE_ENABLED", False)
+    copy = shutil.copy(sample_pdfs[0], str(tmp_path / "copy.pdf"))
+    paths = [sample_pdfs[0], sample_pdfs[1], copy]
+    keys = batch._dedupe_keys(paths, True)
+    assert keys[0] == keys[2] != keys[1]
+    assert batch._dedupe_keys([str(tmp_path / "missing.pdf")], True) == ["#0"]
+
+    timings = {}
+    items = list(batch.iter_parse_results(paths, workers=1, timings=timings))
+    assert [(idx, error) for idx, _path, _result, error in items] == [(1, None), (2, None), (3, None)]
+    assert items[2][2].pdf_path == copy
+    assert _same_content(items[0][2], items[2][2])
+    assert timings[3] == 0.0 and timings[1] > 0
+    # 캐시가 꺼져 있으면 디스크에 아무것도 남기지 않음
+    assert not cache_dir.exists()
@@ -0,0 +1,53 @@
+import random
+
+from spatial_index import RectIndex, overlap_area
+
+
+def _random_rects(rng, n, span=800.0):
+    rects = []
+    for _ in range(n):
+        x0, top = rng.uniform(-50, span), rng.uniform(-50, span)
+        rects.append((x0, top, x0 + rng.uniform(0, 120), top + rng.uniform(0, 120)))
+    return rects
+
+
+def test_matches_linear_scan():
+    rng = random.Random(7)
+    rects = _random_rects(rng, 200)
+    index = RectIndex(rects, cell_size=40.0)
+    for bbox in _random_rects(rng, 300, span=900.0):
+        overlapping = [i for i, r in enumerate(rects) if overlap_area(bbox, r) > 0]
+        candidates = index.query(bbox)
+        assert candidates == sorted(candidates)
+        assert set(overlapping) <= set(candidates)
+        for min_area in (0.0, 25.0):
+            expected = any(overlap_area(bbox, r) > min_area for r in rects)
+            assert index.any_overlap(bbox, min_area) == expected
+
+
+def test_huge_bbox_is_clamped_to_indexed_extent():
+    rects = [(10, 10, 20, 20), (500, 300, 520, 330)]
+    index = RectIndex(rects, cell_size=10.0)
+    huge = (-1e12, -1e12, 1e12, 1e12)
+    cells = list(index._cells_for(huge, index._extent))
+    gx0, gy0, gx1, gy1 = index._extent
+    assert len(cells) == (gx1 - gx0 + 1) * (gy1 - gy0 + 1)
+    assert index.query(huge) == [0, 1]
+    assert index.any_overlap_many([huge, (100, 100, 110, 110)]) == [True, False]
+
+
+def test_outside_extent_and_degenerate_boxes():
+    index = RectIndex([(100, 100, 150, 150)])
+    assert index.query((1000, 1000, 2000, 2000)) == []
+    assert index.query((-500, -500, -400, -400)) == []
+    # 뒤집힌 bbox는 아무 칸에도 걸치지 않음
+    assert index.query((150, 150, 100, 100)) == []
+    assert not index.any_overlap((120, 120, 130, 130), min_area=100.0)
+    assert index.any_overlap((120, 120, 130, 130), min_area=99.0)
+
+
+def test_empty_index():
+    index = RectIndex([])
+    assert len(index) == 0
+    assert index.query((0, 0, 1e9, 1e9)) == []
+    assert index.any_overlap_many([(0, 0, 1, 1)]) == [False]
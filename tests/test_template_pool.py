@@ -0,0 +1,61 @@
+import pickle
+
+import template_pool
+from template_pool import TemplatePool
+
+
+def _cell_values(wb):
+    return [[c.value for c in row] for row in wb.active.iter_rows()]
+
+
+def test_clones_are_independent(template_path):
+    pool = TemplatePool()
+    first, layout = pool.checkout(template_path)
+    original = _cell_values(first)
+    first.active["A1"] = "changed"
+    first.active.row_dimensions[1].height = 99
+
+    second, layout2 = pool.checkout(template_path)
+    third, _ = pool.checkout(template_path)
+    assert (pool.misses, pool.hits) == (1, 2)
+    assert layout2 is layout
+    assert _cell_values(second) == original
+    second.active["A1"] = "again"
+    assert _cell_values(third) == original
+    assert third.active.row_dimensions[1].height != 99
+
+
+def test_unpicklable_template_falls_back_to_load_workbook(template_path, monkeypatch):
+    loads = []
+    real_load = template_pool.load_workbook
+
+    def _counting_load(path):
+        loads.append(path)
+        return real_load(path)
+
+    def _unpicklable(*_args, **_kwargs):
+        raise pickle.PicklingError("cannot pickle")
+
+    monkeypatch.setattr(template_pool, "load_workbook", _counting_load)
+    monkeypatch.setattr(template_pool.pickle, "dumps", _unpicklable)
+    pool = TemplatePool()
+
+    first, layout = pool.checkout(template_path)
+    second, layout2 = pool.checkout(template_path)
+    assert len(loads) == 2
+    assert second is not first and layout2 is layout
+    assert (pool.misses, pool.hits) == (1, 1)
+    assert _cell_values(second) == _cell_values(first)
+
+
+def test_evicts_least_recently_used(template_path, tmp_path):
+    other = str(tmp_path / "other.xlsx")
+    wb, _ = template_pool._load(template_path)
+    wb.active["A1"] = "other"
+    wb.save(other)
+
+    pool = TemplatePool(max_templates=1)
+    pool.checkout(template_path)
+    pool.checkout(other)
+    pool.checkout(template_path)
+    assert (pool.misses, pool.hits) == (3, 0)
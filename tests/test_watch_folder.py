@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+import pytest
+
+import watch_folder
+from watch_folder import FolderWatcher, Ledger
+
+
+def _fake_fill(template_path, pdf_path, output_path, engine):
+    """워커에서 실행: crash*.pdf는 워커 프로세스를 죽이고, 나머지는 잠시 처리한 뒤 출력 파일을 씀."""
+    name = os.path.basename(pdf_path)
+    if name.startswith("crash"):
+        time.sleep(0.05)
+        os._exit(1)
+    if name.startswith("bad"):
+        return 0.01, "ValueError: broken table"
+    time.sleep(0.3)
+    with open(output_path, "wb") as f:
+        f.write(b"xlsx")
+    return 0.3, None
+
+
+@pytest.fixture
+def folders(tmp_path):
+    watch_dir, out_dir = tmp_path / "in", tmp_path / "out"
+    watch_dir.mkdir()
+    return str(watch_dir), str(out_dir)
+
+
+def _add(watch_dir, *names):
+    for name in names:
+        with open(os.path.join(watch_dir, name), "wb") as f:
+            f.write(name.encode())
+
+
+def _run_once(template_path, watch_dir, out_dir, workers=2):
+    watcher = FolderWatcher(template_path, watch_dir, out_dir, workers=workers, settle=0, use_inotify=False)
+    watcher.run(once=True)
+    return watcher, Ledger(os.path.join(out_dir, watch_folder.LEDGER_NAME)).entries
+
+
+def test_crashing_pdf_is_isolated(template_path, folders, monkeypatch):
+    monkeypatch.setattr(watch_folder, "_fill_job", _fake_fill)
+    watch_dir, out_dir = folders
+    _add(watch_dir, "a.pdf", "crash.pdf", "b.pdf", "c.pdf", "bad.pdf")
+
+    watcher, entries = _run_once(template_path, watch_dir, out_dir)
+    status = {name: entry["status"] for name, entry in entries.items()}
+    assert status == {"a.pdf": "ok", "b.pdf": "ok", "c.pdf": "ok", "crash.pdf": "failed", "bad.pdf": "failed"}
+    assert "3번 연속 종료" in entries["crash.pdf"]["error"]
+    assert entries["bad.pdf"]["error"] == "ValueError: broken table"
+    assert entries["a.pdf"]["output"] == os.path.join(out_dir, "a_filled.xlsx")
+    assert (watcher.processed, watcher.failed) == (3, 2)
+    assert watcher._suspects == {} and watcher._pool_retries == {}
+
+
+def test_done_files_are_skipped_and_touched_files_reuse_record(template_path, folders, monkeypatch):
+    monkeypatch.setattr(watch_folder, "_fill_job", _fake_fill)
+    watch_dir, out_dir = folders
+    _add(watch_dir, "a.pdf")
+    first, entries = _run_once(template_path, watch_dir, out_dir, workers=1)
+    assert first.processed == 1 and entries["a.pdf"]["seconds"] > 0
+
+    again, _ = _run_once(template_path, watch_dir, out_dir, workers=1)
+    assert again.processed == 0
+
+    # 수정 시각만 바뀜 → 다시 처리하지 않고 기록만 갱신
+    os.utime(os.path.join(watch_dir, "a.pdf"), ns=(1, 1))
+    touched, entries = _run_once(template_path, watch_dir, out_dir, workers=1)
+    assert touched.processed == 0
+    assert (entries["a.pdf"]["status"], entries["a.pdf"]["seconds"], entries["a.pdf"]["mtime_ns"]) == ("ok", 0.0, 1)
+
+
+def test_ledger_keeps_last_entry_per_file(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    ledger = Ledger(path)
+    ledger.record("a.pdf", (10, 100), "h1", "failed", error="x")
+    ledger.record("a.pdf", (10, 200), "h1", "ok", output="a_filled.xlsx")
+    ledger.record("b.pdf", (20, 100), "h2", "failed", error="y")
+    ledger.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"file": "c.pdf", "si')  # 쓰다 만 마지막 줄
+
+    ledger = Ledger(path)
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [entry["file"] for entry in lines] == ["a.pdf", "b.pdf"]
+    assert ledger.is_done("a.pdf", (10, 200)) and not ledger.is_done("a.pdf", (10, 100))
+    assert not ledger.is_done("c.pdf", (1, 1))
+    assert ledger.done_with_hash("a.pdf", "h1")["output"] == "a_filled.xlsx"
+    assert ledger.done_with_hash("a.pdf", "other") is None
+    # 실패 기록은 같은 내용이어도 재사용하지 않음
+    assert ledger.done_with_hash("b.pdf", "h2") is None
+    ledger.close()
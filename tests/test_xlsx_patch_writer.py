@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from batch import NO_SHARDING, ShardLimits, fill_combined_workbooks
+from excel_writer import fill_template
+from writer_engine_bench import _diff, _snapshot, _synthetic_result, _write_openpyxl, _write_xml
+from xlsx_patch_writer import StreamingWorkbookWriter
+
+
+@pytest.mark.parametrize("index", [0, 2])
+def test_single_file_matches_openpyxl(template_path, sample_pdfs, tmp_path, index):
+    out_a, out_b = str(tmp_path / "openpyxl.xlsx"), str(tmp_path / "xml.xlsx")
+    fill_template(template_path, sample_pdfs[index], out_a, engine="openpyxl")
+    fill_template(template_path, sample_pdfs[index], out_b, engine="xml")
+    assert _diff(_snapshot(out_a), _snapshot(out_b)) == []
+
+
+@pytest.mark.parametrize("spec", ["40x12", "3x0"])
+def test_synthetic_result_matches_openpyxl(template_path, tmp_path, spec):
+    # 컬러 컬럼이 양식보다 많거나 없고, 소제목 / 컬러 이미지가 섞인 결과
+    result = _synthetic_result(spec)
+    out_a, out_b = str(tmp_path / "openpyxl.xlsx"), str(tmp_path / "xml.xlsx")
+    _write_openpyxl(template_path, result, out_a)
+    _write_xml(template_path, result, out_b)
+    snap = _snapshot(out_b)
+    assert _diff(_snapshot(out_a), snap) == []
+    if spec == "40x12":
+        assert snap[snap["sheets"][0]]["images"]
+
+
+def test_template_is_reused_across_writes(template_path, tmp_path):
+    # 같은 양식 객체로 두 번 써도 앞 결과가 뒤 파일에 섞이지 않음
+    first, second = _synthetic_result("30x8"), _synthetic_result("5x2")
+    out_a, out_b = str(tmp_path / "openpyxl.xlsx"), str(tmp_path / "xml.xlsx")
+    _write_xml(template_path, first, str(tmp_path / "first.xlsx"))
+    _write_xml(template_path, second, out_b)
+    _write_openpyxl(template_path, second, out_a)
+    assert _diff(_snapshot(out_a), _snapshot(out_b)) == []
+
+
+def _combined(template_path, pdfs, out_path, engine, limits=NO_SHARDING):
+    events = []
+    out = fill_combined_workbooks(
+        template_path, pdfs, out_path, workers=1, engine=engine, limits=limits,
+        on_result=lambda idx, total, label, sheet, error: events.append((idx, label, sheet, type(error).__name__)),
+    )
+    return out, events
+
+
+def test_streaming_combined_matches_openpyxl(template_path, sample_pdfs, tmp_path):
+    # 중복 PDF(시트 이름 _1)와 실패 PDF 포함
+    pdfs = sample_pdfs + [sample_pdfs[0], str(tmp_path / "missing.pdf")]
+    out_a, events_a = _combined(template_path, pdfs, str(tmp_path / "openpyxl.xlsx"), "openpyxl")
+    out_b, events_b = _combined(template_path, pdfs, str(tmp_path / "xml.xlsx"), "xml")
+    assert (out_a.success_count, out_a.fail_count) == (out_b.success_count, out_b.fail_count) == (4, 1)
+    assert events_a == events_b
+    snap = _snapshot(out_b.files[0])
+    assert snap["sheets"] == ["D64229", "D70001", "D70002", "D64229_1"]
+    assert _diff(_snapshot(out_a.files[0]), snap) == []
+
+
+def test_streaming_shards_match_openpyxl(template_path, sample_pdfs, tmp_path):
+    limits = ShardLimits(max_sheets=2, max_bytes=0, max_images=0)
+    out_a, _ = _combined(template_path, sample_pdfs, str(tmp_path / "a.xlsx"), "openpyxl", limits)
+    out_b, _ = _combined(template_path, sample_pdfs, str(tmp_path / "b.xlsx"), "xml", limits)
+    assert len(out_a.files) == len(out_b.files) == 2
+    for part_a, part_b in zip(out_a.files, out_b.files):
+        assert _diff(_snapshot(part_a), _snapshot(part_b)) == []
+
+
+def test_streaming_writer_discard_removes_file(template_path, tmp_path):
+    out_path = str(tmp_path / "partial.xlsx")
+    writer = StreamingWorkbookWriter(template_path, out_path)
+    writer.add_sheet(_synthetic_result("5x2"), lambda design: design)
+    writer.discard()
+    assert not os.path.exists(out_path)
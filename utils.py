@@ -1,8 +1,24 @@
 """
 공통 텍스트 유틸리티 함수들
+- 정규식은 모듈 로드 시 한 번만 컴파일
+- 헤더 단위 함수(normalize_header / clean_text_keep_newlines / format_color_header_text)는
+  같은 셀 텍스트가 패스마다 반복되므로 크기 제한 LRU로 메모이즈
+- 행 단위 배치 API: clean_row, clean_row_keep_newlines, normalize_row
 """
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# 메모이즈 항목 수 상한 (함수별)
+TEXT_CACHE_SIZE = 8192
+
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_SPACES_TABS_RE = re.compile(r"[ \t]+")
+_SPACE_AFTER_NL_RE = re.compile(r"\n[ \t]+")
+_SPACE_BEFORE_NL_RE = re.compile(r"[ \t]+\n")
+_MULTI_NL_RE = re.compile(r"\n{2,}")
+_CC_NUMBER_RE = re.compile(r"(\b\d{9,}\b)")
 
 
 def clean_text(s: Optional[str]) -> str:
@@ -10,16 +26,18 @@ def clean_text(s: Optional[str]) -> str:
     if not s:
         return ""
     s = str(s).replace("\r", " ").replace("\n", " ")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
+@lru_cache(maxsize=TEXT_CACHE_SIZE, typed=True)
 def normalize_header(s: Optional[str]) -> str:
     s = clean_text(s).lower()
-    s = re.sub(r"[^a-z0-9]+", "", s)  # keep alnum only
+    s = _NON_ALNUM_RE.sub("", s)  # keep alnum only
     return s
 
 
+@lru_cache(maxsize=TEXT_CACHE_SIZE, typed=True)
 def clean_text_keep_newlines(s: Optional[str]) -> str:
     """
     Similar to clean_text(), but preserves newlines inside the string.
@@ -29,13 +47,14 @@ def clean_text_keep_newlines(s: Optional[str]) -> str:
         return ""
     s = str(s).replace("\r", "\n")
     # normalize spaces around newlines
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n[ \t]+", "\n", s)
-    s = re.sub(r"[ \t]+\n", "\n", s)
-    s = re.sub(r"\n{2,}", "\n", s)
+    s = _SPACES_TABS_RE.sub(" ", s)
+    s = _SPACE_AFTER_NL_RE.sub("\n", s)
+    s = _SPACE_BEFORE_NL_RE.sub("\n", s)
+    s = _MULTI_NL_RE.sub("\n", s)
     return s.strip()
 
 
+@lru_cache(maxsize=TEXT_CACHE_SIZE, typed=True)
 def format_color_header_text(s: Optional[str]) -> str:
     """
     Format the color column header text we want to write into Excel (multi-line).
@@ -45,7 +64,7 @@ def format_color_header_text(s: Optional[str]) -> str:
     if not t:
         return ""
     # If the header contains a long numeric token (BOM CC number), try to put it on its own line.
-    m = re.search(r"(\b\d{9,}\b)", t)
+    m = _CC_NUMBER_RE.search(t)
     if m:
         cc = m.group(1)
         # IMPORTANT: keep trailing '-' if present in the PDF header (e.g., 'NY Athl Div -')
@@ -54,3 +73,19 @@ def format_color_header_text(s: Optional[str]) -> str:
         before = before.replace(" - ", " -\n")
         return (before + "\n" + cc).strip()
     return t.replace(" - ", " -\n").strip()
+
+
+# ----------------------------
+# 행/테이블 단위 배치 API
+# ----------------------------
+def clean_row(row: Iterable[Optional[str]]) -> List[str]:
+    return [clean_text(c) for c in row]
+
+
+def clean_row_keep_newlines(row: Iterable[Optional[str]]) -> List[str]:
+    return [clean_text_keep_newlines(c) for c in row]
+
+
+def normalize_row(row: Iterable[Optional[str]]) -> List[str]:
+    return [normalize_header(c) for c in row]
+
@@ -0,0 +1,460 @@
+"""
+감시 폴더 자동 처리 (상시 실행)
+- 감시 폴더에 새로 들어오거나 바뀐 PDF를 fill_template으로 채워 출력 폴더에 <PDF이름>_filled.xlsx로 저장
+- 변경 감지: Linux는 inotify(ctypes, 추가 패키지 없음)로 바로 깨어나고, 그 외/실패 시 주기적 폴링
+- 쓰는 중인 파일 제외: 크기/수정 시각이 --settle 초 동안 그대로일 때만 처리
+- 처리 기록(ledger, JSON lines): 파일별 크기/수정 시각/SHA-256/결과를 남겨 재시작해도 끝난 파일은 다시 하지 않음
+  (수정 시각만 바뀌고 내용이 같으면 기록만 갱신, 실패한 파일은 바뀌기 전까지 재시도하지 않음)
+- 워커 프로세스 풀에서 병렬 처리, --stats-interval 초마다 처리량/대기 수 로그
+- 종료(SIGTERM/SIGINT)는 메인 프로세스만 받아서 처리 중인 파일을 끝까지 기록하고 종료
+  (시작하지 않은 작업은 취소 → 기록 없이 다음 실행에서 처리)
+- 워커 프로세스가 죽는 등 풀 오류는 실패로 기록하지 않고 풀을 다시 만들어 재시도
+  (깨질 때 처리 중이던 파일들은 한 개씩 단독으로 다시 실행해 원인 파일을 가려냄,
+   단독 실행에서 연속 _MAX_POOL_RETRIES번 풀을 깨뜨린 파일만 실패로 기록)
+
+사용법:
+  python watch_folder.py -t 양식.xlsx -w <감시 폴더> -o <출력 폴더> [--ledger 경로] [--workers N]
+                         [--settle 초] [--poll 초] [--stats-interval 초] [--engine openpyxl|xml] [--no-inotify] [--once]
+  --once: 지금 있는 파일만 처리하고 종료 (cron 등)
+"""
+import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import logging
+import os
+import select
+import signal
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+# 일부 PyMuPDF 버전은 import 시 stdout에 경고를 출력 → 로그(stderr)와 같은 곳으로
+with contextlib.redirect_stdout(sys.stderr):
+    import batch
+    from excel_writer import fill_template
+
+log = logging.getLogger("watch_folder")
+
+LEDGER_NAME = ".bom_fill_ledger.jsonl"
+_CHUNK = 1024 * 1024
+# 같은 파일을 단독으로 처리하다 워커 풀이 연속으로 깨지면 이 횟수에서 실패로 기록 (PDF가 워커를 죽이는 경우 무한 재시도 방지)
+_MAX_POOL_RETRIES = 3
+
+# (크기, 수정 시각 ns)
+FileStamp = Tuple[int, int]
+
+
+def _fill_job(template_path: str, pdf_path: str, output_path: str, engine: Optional[str]) -> Tuple[float, Optional[str]]:
+    """
+    워커에서 실행: (소요 초, 오류 문자열). fill_template 자체의 예외만 오류로 돌려줌
+    (Future 예외는 풀/취소 오류뿐이므로 일시적인 것으로 구분 가능).
+    """
+    t = time.perf_counter()
+    try:
+        fill_template(template_path, pdf_path, output_path, engine)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - t, error
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stamp(path: str) -> Optional[FileStamp]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+# ----------------------------
+# 처리 기록
+# ----------------------------
+class Ledger:
+    """
+    처리 기록 (JSON lines, 파일 경로별 마지막 줄이 유효).
+    열 때 파일별 마지막 기록만 남기도록 정리해서 다시 씀.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 마지막 줄이 쓰다 만 경우 등
+                        continue
+                    self.entries[entry["file"]] = entry
+        except FileNotFoundError:
+            pass
+        self._compact()
+        self._f = open(path, "a", encoding="utf-8")
+
+    def _compact(self):
+        d = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(d, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def is_done(self, name: str, stamp: FileStamp) -> bool:
+        """이 크기/수정 시각으로 이미 처리(성공/실패)한 파일인지."""
+        entry = self.entries.get(name)
+        return entry is not None and (entry["size"], entry["mtime_ns"]) == tuple(stamp)
+
+    def done_with_hash(self, name: str, sha256: str) -> Optional[dict]:
+        """같은 내용으로 성공한 기록 (수정 시각만 바뀐 경우)."""
+        entry = self.entries.get(name)
+        if entry is not None and entry["status"] == "ok" and entry["sha256"] == sha256:
+            return entry
+        return None
+
+    def record(self, name: str, stamp: FileStamp, sha256: str, status: str, **extra):
+        entry = {
+            "file": name, "size": stamp[0], "mtime_ns": stamp[1], "sha256": sha256,
+            "status": status, "at": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra,
+        }
+        self.entries[name] = entry
+        self._f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+# ----------------------------
+# inotify (Linux, ctypes)
+# ----------------------------
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """폴더 변경 알림. wait()은 변경이 있거나 timeout이 지나면 돌아옴."""
+
+    def __init__(self, folder: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, "inotify_add_watch failed")
+
+    def wait(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return False
+        # 이벤트 내용은 쓰지 않음 (깨어나서 폴더를 다시 훑음)
+        try:
+            while os.read(self.fd, 64 * (_EVENT_HEADER.size + 256)):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Polling:
+    def wait(self, timeout: float) -> bool:
+        time.sleep(max(timeout, 0))
+        return False
+
+    def close(self):
+        pass
+
+
+# ----------------------------
+# 감시 루프
+# ----------------------------
+class FolderWatcher:
+    def __init__(
+        self,
+        template_path: str,
+        watch_dir: str,
+        output_dir: str,
+        ledger_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        settle: float = 2.0,
+        poll_interval: float = 5.0,
+        stats_interval: float = 60.0,
+        engine: Optional[str] = None,
+        use_inotify: bool = True,
+    ):
+        self.template_path = template_path
+        self.watch_dir = watch_dir
+        self.output_dir = output_dir
+        self.ledger = Ledger(ledger_path or os.path.join(output_dir, LEDGER_NAME))
+        self.workers = max(1, workers or batch.BATCH_WORKERS or os.cpu_count() or 1)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.engine = engine
+        self.use_inotify = use_inotify
+        self._stop = False
+        # 파일 이름 → (마지막으로 본 stamp, 그 stamp가 처음 보인 시각)
+        self._pending: Dict[str, Tuple[FileStamp, float]] = {}
+        # Future → (파일 이름, stamp, sha256, 출력 경로)
+        self._running: Dict[Future, Tuple[str, FileStamp, str, str]] = {}
+        # (파일 이름, sha256) → 단독 처리 중 워커 풀이 깨진 횟수
+        self._pool_retries: Dict[Tuple[str, str], int] = {}
+        self._pool_broken = False
+        # 이번에 풀이 깨질 때 처리 중이던 파일들 (이름, stamp, sha256, 예외)
+        self._broken: List[Tuple[str, FileStamp, str, BaseException]] = []
+        # 풀을 깨뜨렸을 수 있는 파일 이름 → sha256. 남아 있는 동안은 이 파일들만 한 개씩 단독 실행
+        self._suspects: Dict[str, str] = {}
+        self.processed = 0
+        self.failed = 0
+        self._interval_done = 0
+        self._last_stats = time.monotonic()
+
+    def stop(self, *_args):
+        self._stop = True
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Ctrl-C / 서비스 종료 신호는 프로세스 그룹 전체로 가므로 워커는 무시 → 종료는 메인 프로세스가 정리
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=batch.init_worker, initargs=(True,))
+
+    def _scan(self, now: float):
+        """폴더를 훑어 처리 대기 목록 갱신 (끝난 파일/처리 중인 파일 제외)."""
+        in_flight = {name for name, _s, _h, _t in self._running.values()}
+        seen = set()
+        with os.scandir(self.watch_dir) as it:
+            for e in it:
+                if not e.name.lower().endswith(".pdf") or not e.is_file():
+                    continue
+                seen.add(e.name)
+                stamp = _stamp(e.path)
+                if stamp is None or e.name in in_flight or self.ledger.is_done(e.name, stamp):
+                    self._pending.pop(e.name, None)
+                    continue
+                prev = self._pending.get(e.name)
+                if prev is None or prev[0] != stamp:
+                    self._pending[e.name] = (stamp, now)
+        for name in list(self._pending):
+            if name not in seen:
+                del self._pending[name]
+        # 지워졌거나 이미 기록된 파일은 더 가려낼 필요 없음
+        for name in list(self._suspects):
+            if name not in self._pending and name not in in_flight:
+                del self._suspects[name]
+
+    def _ready(self, now: float):
+        for name, (stamp, since) in list(self._pending.items()):
+            if now - since >= self.settle:
+                yield name, stamp
+
+    def _submit(self, pool: ProcessPoolExecutor, now: float):
+        for name, stamp in self._ready(now):
+            if len(self._running) >= self.workers * 2:
+                return
+            if self._suspects and (self._running or name not in self._suspects):
+                # 풀을 깨뜨린 파일을 가려내는 중: 의심 파일만 한 개씩 단독 실행, 나머지는 대기
+                continue
+            del self._pending[name]
+            path = os.path.join(self.watch_dir, name)
+            try:
+                sha256 = _sha256(path)
+            except OSError:
+                continue
+            if _stamp(path) != stamp:
+                # 해시 중에 바뀜 → 다시 기다림
+                continue
+            entry = self.ledger.done_with_hash(name, sha256)
+            if entry is not None:
+                self.ledger.record(name, stamp, sha256, "ok", output=entry.get("output"), seconds=0.0)
+                log.info("변경 없음 (내용 동일): %s", name)
+                continue
+            output = os.path.join(self.output_dir, f"{os.path.splitext(name)[0]}_filled.xlsx")
+            try:
+                fut = pool.submit(_fill_job, self.template_path, path, output, self.engine)
+            except BrokenProcessPool:
+                # 풀이 깨짐 → 기록 없이 다음 스캔에서 다시 대기 (풀은 run에서 다시 만듦)
+                self._pool_broken = True
+                return
+            self._running[fut] = (name, stamp, sha256, output)
+
+    def _collect(self):
+        for fut in [f for f in self._running if f.done()]:
+            name, stamp, sha256, output = self._running.pop(fut)
+            if fut.cancelled():
+                # 종료 중 취소: 기록하지 않음 (다음 실행에서 처리)
+                continue
+            pool_error = fut.exception()
+            if pool_error is not None:
+                if isinstance(pool_error, BrokenProcessPool):
+                    # 원인 파일은 같은 풀의 작업을 모두 모은 뒤 _isolate_broken에서 판단
+                    self._pool_broken = True
+                    self._broken.append((name, stamp, sha256, pool_error))
+                else:
+                    # 일시적 오류: 기록 없이 두면 다음 스캔에서 다시 대기 목록에 올라감
+                    log.warning("워커 풀 오류, 다시 시도: %s - %r", name, pool_error)
+                continue
+            seconds, error = fut.result()
+            self._finish(name, stamp, sha256, output, round(seconds, 3), error)
+
+    def _finish(
+        self, name: str, stamp: FileStamp, sha256: str, output: Optional[str], seconds: Optional[float], error: Optional[str]
+    ):
+        self._pool_retries.pop((name, sha256), None)
+        self._suspects.pop(name, None)
+        if error is None:
+            self.processed += 1
+            self.ledger.record(name, stamp, sha256, "ok", output=output, seconds=seconds)
+            log.info("완료: %s (%.2fs)", name, seconds)
+        else:
+            self.failed += 1
+            self.ledger.record(name, stamp, sha256, "failed", error=error, seconds=seconds)
+            log.warning("실패: %s - %s", name, error)
+        self._interval_done += 1
+
+    def _isolate_broken(self):
+        """
+        풀이 깨질 때 처리 중이던 파일 정리.
+        여러 개였으면 원인을 알 수 없으므로 모두 의심 파일로 두고 한 개씩 단독 실행 (재시도 횟수는 세지 않음),
+        단독 실행 중 깨진 파일만 재시도 횟수를 늘리고 _MAX_POOL_RETRIES번이면 실패로 기록.
+        """
+        broken, self._broken = self._broken, []
+        # 기록하지 않은 파일은 안정화 대기 없이 바로 다시 실행
+        ready_since = time.monotonic() - self.settle
+        if len(broken) > 1:
+            log.warning("워커 풀이 깨짐 → 처리 중이던 %d개를 한 개씩 다시 실행", len(broken))
+        for name, stamp, sha256, pool_error in broken:
+            if len(broken) == 1:
+                retries = self._pool_retries.get((name, sha256), 0) + 1
+                self._pool_retries[(name, sha256)] = retries
+                if retries >= _MAX_POOL_RETRIES:
+                    error = f"워커 프로세스가 {retries}번 연속 종료됨 ({type(pool_error).__name__})"
+                    self._finish(name, stamp, sha256, None, None, error)
+                    continue
+                log.warning("워커 풀 오류 (단독 실행), 다시 시도: %s (%d/%d)", name, retries, _MAX_POOL_RETRIES)
+            self._suspects[name] = sha256
+            self._pending[name] = (stamp, ready_since)
+
+    def _stats(self, force: bool = False):
+        now = time.monotonic()
+        elapsed = now - self._last_stats
+        if not force and elapsed < self.stats_interval:
+            return
+        rate = self._interval_done / elapsed * 60 if elapsed > 0 else 0.0
+        log.info(
+            "처리량 %.1f개/분 | 대기 %d (처리 중 %d) | 누적 성공 %d / 실패 %d",
+            rate, len(self._pending) + len(self._running), len(self._running), self.processed, self.failed,
+        )
+        self._interval_done = 0
+        self._last_stats = now
+
+    def run(self, once: bool = False):
+        os.makedirs(self.output_dir, exist_ok=True)
+        waiter = _Polling()
+        if self.use_inotify and not once:
+            try:
+                waiter = _Inotify(self.watch_dir)
+            except (OSError, AttributeError) as e:
+                log.info("inotify 사용 불가 → 폴링 (%s)", e)
+        log.info(
+            "감시 시작: %s → %s (워커 %d, %s)", self.watch_dir, self.output_dir, self.workers,
+            "inotify" if isinstance(waiter, _Inotify) else f"폴링 {self.poll_interval}s",
+        )
+        pool = self._new_pool()
+        try:
+            while not self._stop:
+                now = time.monotonic()
+                self._scan(now)
+                if once:
+                    # 지금 있는 파일은 안정화를 기다리지 않고 처리
+                    self._pending = {n: (s, now - self.settle) for n, (s, _t) in self._pending.items()}
+                self._submit(pool, now)
+                self._collect()
+                if self._pool_broken:
+                    log.warning("워커 풀이 깨짐 → 다시 만듦")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    # 깨진 풀의 나머지 작업도 끝난 것으로 모아서 어느 파일이 원인인지 판단
+                    wait(list(self._running))
+                    self._collect()
+                    self._isolate_broken()
+                    pool = self._new_pool()
+                    self._pool_broken = False
+                self._stats()
+                if once and not self._pending and not self._running:
+                    break
+                # 대기 중/처리 중인 파일이 있으면 자주 깨어남
+                busy = self._pending or self._running
+                timeout = min(self.settle / 2, 0.5) if busy else self.poll_interval
+                waiter.wait(timeout)
+            # 종료 요청: 시작하지 않은 작업은 취소, 처리 중인 파일은 끝까지 기록
+            for fut in self._running:
+                fut.cancel()
+            wait(list(self._running))
+            self._collect()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            waiter.close()
+            self._stats(force=True)
+            self.ledger.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="watch_folder", description="감시 폴더의 BOM PDF 자동 처리")
+    parser.add_argument("-t", "--template", required=True, help="엑셀 양식 (.xlsx)")
+    parser.add_argument("-w", "--watch-dir", required=True, help="감시 폴더")
+    parser.add_argument("-o", "--output-dir", required=True, help="출력 폴더")
+    parser.add_argument("--ledger", default=None, help=f"처리 기록 파일 (기본: <출력 폴더>/{LEDGER_NAME})")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: BOM_BATCH_WORKERS 또는 CPU 수)")
+    parser.add_argument("--settle", type=float, default=2.0, help="크기/수정 시각이 이 시간(초) 동안 그대로면 처리")
+    parser.add_argument("--poll", type=float, default=5.0, help="폴링 간격(초), inotify 사용 시 최대 대기")
+    parser.add_argument("--stats-interval", type=float, default=60.0, help="처리량/대기 수 로그 간격(초)")
+    parser.add_argument("--engine", choices=("openpyxl", "xml"), default=None, help="writer 엔진 (기본: BOM_WRITER_ENGINE)")
+    parser.add_argument("--no-inotify", action="store_true", help="inotify 대신 폴링")
+    parser.add_argument("--once", action="store_true", help="지금 있는 파일만 처리하고 종료")
+    return parser
+
+
+def main(argv) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not os.path.isfile(args.template) or not os.path.isdir(args.watch_dir):
+        log.error("양식 파일 또는 감시 폴더가 없습니다: %s / %s", args.template, args.watch_dir)
+        return 2
+    watcher = FolderWatcher(
+        args.template, args.watch_dir, args.output_dir,
+        ledger_path=args.ledger, workers=args.workers, settle=args.settle, poll_interval=args.poll,
+        stats_interval=args.stats_interval, engine=args.engine, use_inotify=not args.no_inotify,
+    )
+    signal.signal(signal.SIGTERM, watcher.stop)
+    signal.signal(signal.SIGINT, watcher.stop)
+    watcher.run(once=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,179 @@
+"""
+writer 엔진 벤치마크 / 결과 비교 (openpyxl vs xml 직접 패치)
+- 같은 양식 + 같은 파싱 결과를 두 엔진으로 각각 저장하고 시간 측정
+- 저장 결과를 openpyxl로 다시 읽어 비교: 셀 값, 셀 스타일, 열 너비/행 높이, 병합, 이미지(위치/크기/내용), 다른 시트
+- PDF는 한 번만 파싱해 두 엔진에 같은 결과를 넘김 (쓰기 시간만 비교)
+
+사용법:
+  python writer_engine_bench.py <양식.xlsx> <pdf 또는 glob> [...] [--repeat N]
+  python writer_engine_bench.py <양식.xlsx> --synthetic 300x60 [--repeat N]
+  (결과가 다르면 종료 코드 1)
+"""
+import glob
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from typing import Callable, Dict, List, Tuple
+
+from openpyxl import load_workbook
+from PIL import Image as PILImage
+
+from models import BomRow, ParseResult
+from pdf_parser import parse_pdf
+from pdf_session import open_session
+from template_pool import checkout_template
+from excel_writer import write_sheet
+from xlsx_patch_writer import load_xlsx_template
+
+
+def _synthetic_result(spec: str) -> ParseResult:
+    """'행x컬러' 크기의 가짜 파싱 결과 (소제목/컬러 이미지 포함)."""
+    n_rows, n_colors = (int(x) for x in spec.lower().split("x"))
+    headers = [f"COLOR {i}\n{3239900000 + i:012d}" for i in range(n_colors)]
+    buf = BytesIO()
+    PILImage.new("RGB", (20, 20), (200, 10, 10)).save(buf, format="PNG")
+    png = buf.getvalue()
+    categories = ["Fabric", "Trim", "Graphic", "Packaging and Labels"]
+    rows = []
+    for i in range(n_rows):
+        cat = categories[i * len(categories) // max(n_rows, 1)]
+        rows.append(BomRow(
+            cat, f"{100000 + i}", f"Mat {i}", f"ART{i}", "Body", "Cotton", "ACME",
+            {j: f"V{i}-{j}" for j in range(n_colors) if (i + j) % 3}, None,
+            {j: png for j in range(0, n_colors, 7)} if cat == "Graphic" and i % 5 == 0 else {},
+        ))
+    master = {
+        "design_number": "D1", "description": "synthetic", "bom_number": "00012345678",
+        "legacy_style_numbers": "123456", "hang_fold_instructions": "Tops-",
+    }
+    return ParseResult(f"synthetic {spec}", master, rows, headers, None)
+
+
+def _write_openpyxl(template_path: str, result: ParseResult, output_path: str):
+    wb, layout = checkout_template(template_path)
+    write_sheet(wb.active, result, layout)
+    wb.save(output_path)
+
+
+def _write_xml(template_path: str, result: ParseResult, output_path: str):
+    load_xlsx_template(template_path).write(result, output_path)
+
+
+def _snapshot(path: str) -> Dict[str, object]:
+    """저장 결과를 비교용 값으로 정리."""
+    wb = load_workbook(path)
+    snap: Dict[str, object] = {"sheets": wb.sheetnames}
+    for ws in wb.worksheets:
+        cells = {}
+        for row in ws.iter_rows():
+            for c in row:
+                style = repr((c.font, c.border, c.fill, c.number_format, c.alignment, c.protection))
+                if c.value is not None or c.has_style:
+                    cells[c.coordinate] = (c.value, style)
+        images = sorted(
+            (img.anchor._from.row, img.anchor._from.col, img.width, img.height,
+             hashlib.sha1(img._data()).hexdigest())
+            for img in ws._images
+        )
+        snap[ws.title] = {
+            "cells": cells,
+            "cols": sorted((k, v.width) for k, v in ws.column_dimensions.items() if v.customWidth),
+            "rows": sorted((k, v.height) for k, v in ws.row_dimensions.items() if v.height is not None),
+            "merged": sorted(map(str, ws.merged_cells.ranges)),
+            "images": images,
+        }
+    return snap
+
+
+def _diff(a: Dict[str, object], b: Dict[str, object]) -> List[str]:
+    diffs: List[str] = []
+    if a["sheets"] != b["sheets"]:
+        return [f"sheets: {a['sheets']} != {b['sheets']}"]
+    for title in a["sheets"]:
+        sa, sb = a[title], b[title]
+        for key in ("cols", "rows", "merged", "images"):
+            if sa[key] != sb[key]:
+                diffs.append(f"{title} {key}: {sa[key]} != {sb[key]}")
+        ca, cb = sa["cells"], sb["cells"]
+        for coord in sorted(set(ca) | set(cb)):
+            if ca.get(coord) != cb.get(coord):
+                diffs.append(f"{title}!{coord}: {ca.get(coord)} != {cb.get(coord)}")
+                if len(diffs) > 20:
+                    return diffs
+    return diffs
+
+
+def _time(write: Callable[[str], None], output_path: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        write(output_path)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def bench(template_path: str, result: ParseResult, repeat: int, tmp_dir: str) -> Tuple[float, float, List[str]]:
+    """(openpyxl 초, xml 초, 결과 차이)"""
+    out_a = os.path.join(tmp_dir, "openpyxl.xlsx")
+    out_b = os.path.join(tmp_dir, "xml.xlsx")
+    # 첫 실행은 양식 파싱(풀/캐시 채우기)이라 측정에서 제외
+    _write_openpyxl(template_path, result, out_a)
+    _write_xml(template_path, result, out_b)
+    t_a = _time(lambda p: _write_openpyxl(template_path, result, p), out_a, repeat)
+    t_b = _time(lambda p: _write_xml(template_path, result, p), out_b, repeat)
+    return t_a, t_b, _diff(_snapshot(out_a), _snapshot(out_b))
+
+
+def main(argv: List[str]) -> int:
+    repeat = 3
+    synthetic: List[str] = []
+    args: List[str] = []
+    it = iter(argv)
+    for arg in it:
+        if arg == "--repeat":
+            repeat = max(1, int(next(it)))
+        elif arg == "--synthetic":
+            synthetic.append(next(it))
+        else:
+            args.append(arg)
+    if not args or (len(args) < 2 and not synthetic):
+        print("사용법: python writer_engine_bench.py <양식.xlsx> <pdf 또는 glob> [...] [--synthetic 300x60] [--repeat N]")
+        return 2
+
+    template_path = args[0]
+    paths: List[str] = []
+    for arg in args[1:]:
+        paths.extend(sorted(glob.glob(arg)) or [arg])
+    bom_images = load_xlsx_template(template_path).layout.has_image_column
+
+    failed = 0
+    total_a = total_b = 0.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs = [(spec, lambda spec=spec: _synthetic_result(spec)) for spec in synthetic]
+        jobs += [(os.path.basename(p), p) for p in paths]
+        for name, source in jobs:
+            if callable(source):
+                t_a, t_b, diffs = bench(template_path, source(), repeat, tmp_dir)
+            else:
+                # 행 이미지는 쓰기 때 렌더링되므로 세션을 연 채로 측정
+                with open_session(source) as session:
+                    result = parse_pdf(session, bom_images=bom_images)
+                    t_a, t_b, diffs = bench(template_path, result, repeat, tmp_dir)
+            total_a += t_a
+            total_b += t_b
+            mark = "✅" if not diffs else "❌"
+            print(f"{mark} {name}: openpyxl {t_a * 1000:.1f}ms / xml {t_b * 1000:.1f}ms (x{t_a / max(t_b, 1e-9):.1f})")
+            if diffs:
+                failed += 1
+                for d in diffs:
+                    print(f"   - {d}")
+
+    print(f"\n합계: openpyxl {total_a * 1000:.1f}ms / xml {total_b * 1000:.1f}ms, {len(jobs) - failed}/{len(jobs)} 일치")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
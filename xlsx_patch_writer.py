@@ -0,0 +1,1050 @@
+"""
+xlsx 직접 패치 writer (openpyxl 로드/저장 없이 쓰는 두 번째 엔진)
+- 양식 xlsx(zip)에서 채우기로 바뀌는 파트만 고쳐서 새 zip으로 스트리밍:
+  시트 XML(sheetData 행/셀, cols, dimension), sharedStrings(새 문자열 추가), styles(필요한 font/border/xf 추가),
+  drawing/media(이미지), rels, [Content_Types].xml
+- 나머지 파트(다른 시트, theme, docProps ...)는 바이트 그대로 복사
+- 셀 결과는 excel_writer.write_sheet (openpyxl 엔진)와 같음:
+  Master 값, 컬러 헤더 스타일/정렬, 행 용량 확장(첫 본문 행 스타일/높이), 추가 컬러 컬럼, 소제목 행,
+  남는 템플릿 영역 테두리 제거, Design/행 이미지 앵커·크기와 셀 크기 조정
+- 양식 파싱 결과(파트 바이트, 시트 셀, 스타일 테이블, TemplateLayout)는 양식 파일당 한 번만 만들어 재사용
+- 합본(PDF별 시트) 출력은 StreamingWorkbookWriter: 시트를 채우는 즉시 zip에 쓰고 메모리에서 내림
+  (styles / sharedStrings는 모든 시트 공용, 마지막에 한 번 씀)
+"""
+import os
+import posixpath
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from copy import copy
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.compat import safe_string
+from openpyxl.styles import Alignment, Border
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.xml.functions import tostring
+from PIL import Image as PILImage
+
+from models import ParseResult, column_ids, sheet_output_rows
+from image_handler import (
+    DESIGN_IMAGE_ANCHOR,
+    bom_row_image_size,
+    box_pixels,
+    design_image_size,
+    image_cell_extent,
+    resolve_image,
+)
+from template_layout import TemplateLayout, compile_template_layout, template_cache_key
+from template_pool import POOL_SIZE, checkout_template
+
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_REL_TYPE = _REL_NS + "/"
+_CT_DRAWING = "application/vnd.openxmlformats-officedocument.drawing+xml"
+_CT_SST = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+_CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+_CT_EXTENDED = "application/vnd.openxmlformats-officedocument.extended-properties+xml"
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_EMPTY_RELS = _XML_DECL + f'<Relationships xmlns="{_PKG_REL_NS}"></Relationships>'
+_EMPTY_DRAWING = _XML_DECL + (
+    '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"></xdr:wsDr>'
+)
+
+_ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*"([^"]*)"')
+_ROW_RE = re.compile(r"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_CELL_RE = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_REF_RE = re.compile(r"([A-Z]+)(\d+)")
+_SHEET_DATA_RE = re.compile(r"<sheetData\s*/>|<sheetData>(.*?)</sheetData>", re.S)
+_COLS_RE = re.compile(r"<cols>(.*?)</cols>", re.S)
+_COL_RE = re.compile(r"<col\b([^>]*?)/?>")
+_MERGE_RE = re.compile(r'<mergeCell\s+ref="([A-Z]+\d+)(?::([A-Z]+\d+))?"')
+_XF_RE = re.compile(r"<xf\b[^>]*?(?:/>|>.*?</xf>)", re.S)
+_ALIGNMENT_RE = re.compile(r"<alignment\b[^>]*?(?:/>|>.*?</alignment>)", re.S)
+_REL_RE = re.compile(r"<Relationship\b([^>]*?)/?>")
+
+# openpyxl 엔진과 같은 셀 스타일 변경
+HEADER_ALIGNMENT = Alignment(wrap_text=True, vertical="center", horizontal="center")
+SUBTITLE_ALIGNMENT = Alignment(vertical="center", horizontal="left")
+# 스타일이 없는 셀(openpyxl StyleArray 0)의 xf
+_BASE_XF = '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+_ZERO_STYLE = (0,) * 9
+# openpyxl ColumnDimension 기본 너비 (없는 컬럼 차원을 읽으면 이 값으로 생김)
+_DEFAULT_COLUMN_WIDTH = 13.0
+_MAX_CELL_TEXT = 32767
+
+
+def _attrs(s: str) -> "OrderedDict[str, str]":
+    return OrderedDict(_ATTR_RE.findall(s))
+
+
+def _attr_str(attrs: Dict[str, str]) -> str:
+    return "".join(f' {k}="{v}"' for k, v in attrs.items())
+
+
+def _split_ref(ref: str) -> Tuple[int, int]:
+    m = _REF_RE.match(ref)
+    return int(m.group(2)), column_index_from_string(m.group(1))
+
+
+def _resolve_target(base_dir: str, target: str) -> str:
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _rels_path(part: str) -> str:
+    d, name = posixpath.split(part)
+    return posixpath.join(d, "_rels", name + ".rels")
+
+
+def _parse_rels(xml: str) -> List["OrderedDict[str, str]"]:
+    return [_attrs(m.group(1)) for m in _REL_RE.finditer(xml)]
+
+
+def _next_rel_id(rels: List[Dict[str, str]]) -> str:
+    used = {r.get("Id") for r in rels}
+    n = 1
+    while f"rId{n}" in used:
+        n += 1
+    return f"rId{n}"
+
+
+def _append_before(xml: str, closing: str, fragment: str) -> str:
+    i = xml.rindex(closing)
+    return xml[:i] + fragment + xml[i:]
+
+
+def _append_to_section(xml: str, tag: str, items: List[str]) -> str:
+    """<tag count="N">...</tag> 끝에 항목을 붙이고 count 갱신."""
+    if not items:
+        return xml
+    m = re.search(rf"<{tag}\b([^>]*?)(/?)>", xml)
+    attrs = _attrs(m.group(1))
+    count = int(attrs.get("count", "0")) + len(items)
+    attrs["count"] = str(count)
+    if m.group(2):
+        return xml[:m.start()] + f"<{tag}{_attr_str(attrs)}>" + "".join(items) + f"</{tag}>" + xml[m.end():]
+    xml = xml[:m.start()] + f"<{tag}{_attr_str(attrs)}>" + xml[m.end():]
+    return _append_before(xml, f"</{tag}>", "".join(items))
+
+
+def _cell_value(value) -> Tuple[Optional[str], object]:
+    """openpyxl Cell 값 규칙: (셀 종류, 값). 종류: None(빈 셀) / 's' / 'f' / 'n' / 'b'"""
+    if value is None:
+        return None, None
+    if isinstance(value, bool):
+        return "b", value
+    if isinstance(value, (int, float)):
+        return "n", value
+    value = str(value)[:_MAX_CELL_TEXT]
+    if next(ILLEGAL_CHARACTERS_RE.finditer(value), None):
+        raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+    if value == "":
+        return None, None
+    if len(value) > 1 and value.startswith("="):
+        return "f", value
+    return "s", value
+
+
+def _with_image_defaults(ct_xml: str, exts) -> str:
+    """[Content_Types].xml에 이미지 확장자 Default 추가 (Default는 Override 앞에 둠)."""
+    for fmt in sorted(exts):
+        if not re.search(rf'<Default\b[^>]*Extension="{fmt}"', ct_xml, re.I):
+            i = re.search(r"<Types\b[^>]*>", ct_xml).end()
+            ct_xml = ct_xml[:i] + f'<Default Extension="{fmt}" ContentType="image/{fmt}"/>' + ct_xml[i:]
+    return ct_xml
+
+
+def _tail_with_drawing(tail: str, rid: str) -> str:
+    fragment = f'<drawing xmlns:r="{_REL_NS}" r:id="{rid}"/>'
+    # CT_Worksheet 순서: drawing은 legacyDrawing / picture / oleObjects / tableParts / extLst 앞
+    m = re.search(r"<(?:legacyDrawing|legacyDrawingHF|drawingHF|picture|oleObjects|controls|"
+                  r"webPublishItems|tableParts|extLst)\b", tail)
+    i = m.start() if m else tail.rindex("</worksheet>")
+    return tail[:i] + fragment + tail[i:]
+
+
+def _si(text: str) -> str:
+    space = ' xml:space="preserve"' if (text != text.strip() or "\n" in text) else ""
+    return f"<si><t{space}>{escape(text)}</t></si>"
+
+
+class _XlsxTemplate:
+    """양식 xlsx 한 개를 파싱한 결과 (읽기 전용, 채우기마다 _SheetPatch로 복사해서 사용)."""
+
+    def __init__(self, template_path: str):
+        wb, layout = checkout_template(template_path)
+        if layout is None:
+            # openpyxl 엔진과 같은 예외 (Master 라벨 / BOM 헤더 못 찾음)
+            layout = compile_template_layout(wb.active)
+        self.layout: TemplateLayout = layout
+
+        with zipfile.ZipFile(template_path) as zf:
+            self.part_names: List[str] = zf.namelist()
+            self.parts: Dict[str, bytes] = {n: zf.read(n) for n in self.part_names}
+
+        # 활성 시트 경로 (openpyxl wb.active와 같은 시트)
+        wb_rels = _parse_rels(self.parts["xl/_rels/workbook.xml.rels"].decode("utf-8"))
+        self.wb_rels = wb_rels
+        targets = {r["Id"]: _resolve_target("xl", r["Target"]) for r in wb_rels}
+        wb_xml = self.parts["xl/workbook.xml"].decode("utf-8")
+        sheet_rids = re.findall(r'<sheet\b[^>]*?r:id="([^"]+)"', wb_xml)
+        self.sheet_path = targets[sheet_rids[wb.index(wb.active)]]
+        self.sst_path = next(
+            (targets[r["Id"]] for r in wb_rels if r.get("Type") == _REL_TYPE + "sharedStrings"), None
+        )
+        self.styles_path = next(
+            targets[r["Id"]] for r in wb_rels if r.get("Type") == _REL_TYPE + "styles"
+        )
+        self.calc_chain_path = next(
+            (targets[r["Id"]] for r in wb_rels if r.get("Type") == _REL_TYPE + "calcChain"), None
+        )
+
+        # 시트 XML: sheetData 앞/뒤 + 셀/행 속성
+        sheet_xml = self.parts[self.sheet_path].decode("utf-8")
+        m = _SHEET_DATA_RE.search(sheet_xml)
+        self.sheet_head = _COLS_RE.sub("", sheet_xml[:m.start()])
+        self.sheet_tail = sheet_xml[m.end():]
+        self.cells: Dict[Tuple[int, int], tuple] = {}
+        self.row_attrs: Dict[int, "OrderedDict[str, str]"] = {}
+        row_no = 0
+        for rm in _ROW_RE.finditer(m.group(1) or ""):
+            attrs = _attrs(rm.group(1))
+            row_no = int(attrs.pop("r")) if "r" in attrs else row_no + 1
+            attrs.pop("spans", None)
+            if attrs:
+                self.row_attrs[row_no] = attrs
+            col_no = 0
+            for cm in _CELL_RE.finditer(rm.group(2) or ""):
+                cattrs = _attrs(cm.group(1))
+                ref = cattrs.pop("r", None)
+                col_no = _split_ref(ref)[1] if ref else col_no + 1
+                s = cattrs.pop("s", None)
+                t = cattrs.pop("t", None)
+                self.cells[(row_no, col_no)] = (
+                    int(s) if s is not None else None, t, cm.group(2) or "", _attr_str(cattrs),
+                )
+        # openpyxl row_dimensions에 있는 행 (네임스페이스 없는 속성이 있는 행)
+        self.dim_rows = {r for r, a in self.row_attrs.items() if any(not k.startswith("x14ac:") for k in a)}
+
+        cols_m = _COLS_RE.search(sheet_xml[:m.start()])
+        self.cols: "OrderedDict[int, OrderedDict[str, str]]" = OrderedDict()
+        for col_m in _COL_RE.finditer(cols_m.group(1) if cols_m else ""):
+            attrs = _attrs(col_m.group(1))
+            self.cols[int(attrs["min"])] = attrs
+
+        self.merged: List[Tuple[int, int, int, int]] = []
+        for mm in _MERGE_RE.finditer(self.sheet_tail):
+            r1, c1 = _split_ref(mm.group(1))
+            r2, c2 = _split_ref(mm.group(2) or mm.group(1))
+            self.merged.append((r1, c1, r2, c2))
+
+        # 스타일: 템플릿 xf 목록 + openpyxl 스타일 객체 (같은 워크북에서 읽은 것이므로 인덱스가 파일 순서와 같음)
+        self.styles_xml = self.parts[self.styles_path].decode("utf-8")
+        xfs_m = re.search(r"<cellXfs\b[^>]*>(.*?)</cellXfs>", self.styles_xml, re.S)
+        self.xfs: List[str] = _XF_RE.findall(xfs_m.group(1)) if xfs_m else []
+        self.style_arrays: List[tuple] = [tuple(a) for a in wb._cell_styles]
+        self.fonts = list(wb._fonts)
+        self.borders = list(wb._borders)
+
+        self.sst_xml = self.parts[self.sst_path].decode("utf-8") if self.sst_path else None
+        self.sst_count = len(re.findall(r"<si\b", self.sst_xml)) if self.sst_xml else 0
+
+    def write(self, result: ParseResult, output_path: str) -> str:
+        """result를 채운 xlsx를 output_path에 씀. Returns: design_number"""
+        patch = _SheetPatch(self)
+        design_number = patch.fill(result)
+        patch.save(output_path)
+        return design_number
+
+
+class _SharedParts:
+    """
+    워크북 공용 파트의 추가분: sharedStrings 새 문자열, styles 새 font/border/xf.
+    단일 파일 쓰기는 채우기마다 새로 만들고, 합본 스트리밍 쓰기는 모든 시트가 하나를 같이 씀.
+    """
+
+    def __init__(self, tpl: _XlsxTemplate):
+        self.tpl = tpl
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.new_fonts: List[str] = []
+        self.new_borders: List[str] = []
+        self.new_xfs: List[str] = []
+        self.fonts = list(tpl.fonts)
+        self.borders = list(tpl.borders)
+        self._xf_memo: Dict[tuple, int] = {}
+
+    def string_id(self, value: str) -> int:
+        idx = self.string_ids.get(value)
+        if idx is None:
+            idx = self.tpl.sst_count + len(self.strings)
+            self.string_ids[value] = idx
+            self.strings.append(value)
+        return idx
+
+    def _xf_xml(self, xf: Optional[int]) -> str:
+        if xf is None:
+            return _BASE_XF
+        n = len(self.tpl.xfs)
+        return self.tpl.xfs[xf] if xf < n else self.new_xfs[xf - n]
+
+    def _derive_xf(self, xf: Optional[int], op: tuple, attrs: Dict[str, str], alignment: Optional[str] = None) -> int:
+        key = (xf,) + op
+        cached = self._xf_memo.get(key)
+        if cached is not None:
+            return cached
+        base = self._xf_xml(xf)
+        m = re.match(r"<xf\b([^>]*?)(/?)>", base)
+        xf_attrs = _attrs(m.group(1))
+        body = "" if m.group(2) else base[m.end():-len("</xf>")]
+        xf_attrs.update(attrs)
+        if alignment is not None:
+            body = alignment + _ALIGNMENT_RE.sub("", body)
+        new_xml = f"<xf{_attr_str(xf_attrs)}>{body}</xf>" if body else f"<xf{_attr_str(xf_attrs)}/>"
+        self.new_xfs.append(new_xml)
+        idx = len(self.tpl.xfs) + len(self.new_xfs) - 1
+        self._xf_memo[key] = idx
+        return idx
+
+    def _xf_attr(self, xf: Optional[int], name: str) -> int:
+        return int(_attrs(re.match(r"<xf\b([^>]*?)/?>", self._xf_xml(xf)).group(1)).get(name, "0"))
+
+    def alignment_xf(self, xf: Optional[int], alignment: Alignment) -> int:
+        al_xml = tostring(alignment.to_tree()).decode("utf-8")
+        return self._derive_xf(xf, ("alignment", al_xml), {"applyAlignment": "1"}, al_xml)
+
+    def bold_xf(self, xf: Optional[int]) -> int:
+        font = copy(self.fonts[self._xf_attr(xf, "fontId")])
+        font.b = True
+        if font in self.fonts:
+            font_id = self.fonts.index(font)
+        else:
+            self.fonts.append(font)
+            self.new_fonts.append(tostring(font.to_tree()).decode("utf-8"))
+            font_id = len(self.fonts) - 1
+        return self._derive_xf(xf, ("font", font_id), {"fontId": str(font_id), "applyFont": "1"})
+
+    def empty_border_xf(self, xf: Optional[int]) -> Optional[int]:
+        """테두리를 없앤 xf (이미 테두리가 없으면 None)."""
+        empty = Border()
+        if self.borders[self._xf_attr(xf, "borderId")] == empty:
+            return None
+        if empty in self.borders:
+            border_id = self.borders.index(empty)
+        else:
+            self.borders.append(empty)
+            self.new_borders.append(tostring(empty.to_tree()).decode("utf-8"))
+            border_id = len(self.borders) - 1
+        return self._derive_xf(xf, ("border", border_id), {"borderId": str(border_id), "applyBorder": "1"})
+
+    def styles_xml(self) -> str:
+        xml = self.tpl.styles_xml
+        xml = _append_to_section(xml, "fonts", self.new_fonts)
+        xml = _append_to_section(xml, "borders", self.new_borders)
+        return _append_to_section(xml, "cellXfs", self.new_xfs)
+
+    def sst_xml(self) -> str:
+        """양식 sharedStrings + 새 문자열 (양식에 sharedStrings가 없으면 새로 만듦)."""
+        new_si = "".join(_si(s) for s in self.strings)
+        if self.tpl.sst_xml is None:
+            return (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                f'uniqueCount="{len(self.strings)}">{new_si}</sst>'
+            )
+        sst_xml = _append_before(self.tpl.sst_xml, "</sst>", new_si)
+        m = re.search(r"<sst\b([^>]*)>", sst_xml)
+        attrs = _attrs(m.group(1))
+        if "count" in attrs:
+            attrs["count"] = str(int(attrs["count"]) + len(self.strings))
+        attrs["uniqueCount"] = str(self.tpl.sst_count + len(self.strings))
+        return sst_xml[:m.start()] + f"<sst{_attr_str(attrs)}>" + sst_xml[m.end():]
+
+
+class _SheetPatch:
+    """채우기 한 번의 시트 상태 (openpyxl Worksheet에서 write_sheet가 쓰는 동작만 같은 의미로 구현)."""
+
+    def __init__(self, tpl: _XlsxTemplate, shared: Optional[_SharedParts] = None):
+        self.tpl = tpl
+        self.shared = shared if shared is not None else _SharedParts(tpl)
+        self.cells = dict(tpl.cells)
+        self.row_attrs = {r: OrderedDict(a) for r, a in tpl.row_attrs.items()}
+        self.dim_rows = set(tpl.dim_rows)
+        self.cols = OrderedDict((k, OrderedDict(v)) for k, v in tpl.cols.items())
+        # (row, col, width_px, height_px, image bytes)
+        self.images: List[Tuple[int, int, int, int, bytes]] = []
+
+    # ── 셀 ──────────────────────────────────────────────────
+
+    def style(self, row: int, col: int) -> Optional[int]:
+        cell = self.cells.get((row, col))
+        return cell[0] if cell else None
+
+    def style_key(self, xf: Optional[int]) -> tuple:
+        if xf is None or xf >= len(self.tpl.style_arrays):
+            return _ZERO_STYLE if xf is None else ("new", xf)
+        return self.tpl.style_arrays[xf]
+
+    def set_style(self, row: int, col: int, xf: Optional[int]):
+        cell = self.cells.get((row, col))
+        if cell is None:
+            if xf is not None:
+                self.cells[(row, col)] = (xf, None, "", "")
+        else:
+            self.cells[(row, col)] = (xf,) + cell[1:]
+
+    def set_value(self, row: int, col: int, value):
+        kind, value = _cell_value(value)
+        cell = self.cells.get((row, col))
+        xf, extra = (cell[0], cell[3]) if cell else (None, "")
+        if kind is None:
+            t, inner = None, ""
+        elif kind == "s":
+            t, inner = "s", f"<v>{self.shared.string_id(value)}</v>"
+        elif kind == "f":
+            t, inner = None, f"<f>{escape(value[1:])}</f><v></v>"
+        elif kind == "b":
+            t, inner = "b", f"<v>{int(value)}</v>"
+        else:
+            t, inner = "n", f"<v>{safe_string(value)}</v>"
+        if cell is None and kind is None:
+            return
+        self.cells[(row, col)] = (xf, t, inner, extra)
+
+    def insert_rows(self, idx: int, amount: int):
+        """openpyxl insert_rows와 같음: idx 이후 셀만 아래로 이동 (행 높이/병합/이미지는 그대로)."""
+        self.cells = {
+            ((r + amount, c) if r >= idx else (r, c)): cell for (r, c), cell in self.cells.items()
+        }
+
+    # ── 스타일 ─────────────────────────────────────────────
+
+    def set_alignment(self, row: int, col: int, alignment: Alignment):
+        self.set_style(row, col, self.shared.alignment_xf(self.style(row, col), alignment))
+
+    def set_bold(self, row: int, col: int):
+        self.set_style(row, col, self.shared.bold_xf(self.style(row, col)))
+
+    def clear_border(self, row: int, col: int):
+        xf = self.shared.empty_border_xf(self.style(row, col))
+        if xf is not None:
+            self.set_style(row, col, xf)
+
+    # ── 행/열 크기 ─────────────────────────────────────────
+
+    def _col(self, col: int) -> "OrderedDict[str, str]":
+        # openpyxl column_dimensions[letter]: 없으면 기본 너비로 새로 생김 (min == col 인 항목만 같은 키)
+        dim = self.cols.get(col)
+        if dim is None:
+            dim = OrderedDict((("min", str(col)), ("max", str(col)),
+                               ("width", safe_string(_DEFAULT_COLUMN_WIDTH)), ("customWidth", "1")))
+            self.cols[col] = dim
+        return dim
+
+    def col_width(self, col: int) -> float:
+        return float(self._col(col).get("width", _DEFAULT_COLUMN_WIDTH))
+
+    def set_col_width(self, col: int, width: float):
+        dim = self._col(col)
+        dim["width"] = safe_string(width)
+        dim["customWidth"] = "1"
+
+    def row_height(self, row: int) -> Optional[float]:
+        self.dim_rows.add(row)
+        ht = self.row_attrs.get(row, {}).get("ht")
+        return float(ht) if ht is not None else None
+
+    def set_row_height(self, row: int, height: Optional[float]):
+        self.dim_rows.add(row)
+        attrs = self.row_attrs.setdefault(row, OrderedDict())
+        if height is None:
+            attrs.pop("ht", None)
+            attrs.pop("customHeight", None)
+        else:
+            attrs["ht"] = safe_string(height)
+            attrs["customHeight"] = "1"
+
+    # ── 이미지 ─────────────────────────────────────────────
+
+    def _merged_box(self, row: int, col: int) -> Tuple[int, int, int, int]:
+        for r1, c1, r2, c2 in self.tpl.merged:
+            if r1 <= row <= r2 and c1 <= col <= c2:
+                return r1, c1, r2, c2
+        return row, col, row, col
+
+    def insert_design_image(self, image_png: Optional[bytes], box_range: Tuple[int, int, int, int]):
+        if not image_png:
+            return
+        pil_img = PILImage.open(BytesIO(image_png))
+        ar, ac = DESIGN_IMAGE_ANCHOR
+        min_r, min_c, max_r, max_c = box_range
+        box_w, box_h = box_pixels(
+            [self.col_width(c) for c in range(min_c, max_c + 1)],
+            [self.row_height(r) for r in range(min_r, max_r + 1)],
+        )
+        iw, ih = pil_img.size
+        if iw <= 0 or ih <= 0:
+            return
+        target_w, target_h = design_image_size(iw, ih, box_w, box_h)
+        self.images.append((ar, ac, target_w, target_h, image_png))
+
+    def insert_row_image(self, row: int, col: int, image_png):
+        image_png = resolve_image(image_png)
+        if not image_png:
+            return
+        iw, ih = PILImage.open(BytesIO(image_png)).size
+        min_r, min_c, max_r, max_c = self._merged_box(row, col)
+        if not iw or not ih:
+            return
+        target_w_px, target_h_px = bom_row_image_size(iw, ih)
+        needed_col_w, needed_row_h = image_cell_extent(
+            target_w_px, target_h_px, max_c - min_c + 1, max_r - min_r + 1
+        )
+        for c in range(min_c, max_c + 1):
+            self.set_col_width(c, max(self.col_width(c), needed_col_w))
+        for r in range(min_r, max_r + 1):
+            cur_h = self.row_height(r)
+            cur_h = cur_h if cur_h is not None else 15.0
+            self.set_row_height(r, max(cur_h, needed_row_h))
+        self.images.append((min_r, min_c, target_w_px, target_h_px, image_png))
+
+    # ── 채우기 (excel_writer.write_sheet와 같은 순서/규칙) ──────
+
+    def fill(self, result: ParseResult) -> str:
+        layout = self.tpl.layout
+        master = result.master
+
+        for key in ("design_number", "description", "bom_number", "legacy_style_numbers", "hang_fold_instructions"):
+            self.set_value(*layout.master_cells[key], master.get(key, ""))
+
+        try:
+            self.insert_design_image(result.design_image_png, layout.design_image_range)
+        except Exception:
+            pass
+
+        header_row, col_map = layout.header_row, layout.col_map
+        start_row = layout.start_row
+        c_category = col_map.get("category")
+        c_product = col_map["product"]
+        c_material = col_map["materialname"]
+        c_supp_art = col_map["supplierarticlenumber"]
+        c_usage = col_map["usage"]
+        c_quality = col_map["qualitydetails"]
+        c_supplier = col_map.get("supplierallocate") or col_map.get("supplier")
+        c_image = col_map.get("image")
+        if c_supplier is None:
+            c_supplier = c_quality
+        c_color_start = layout.c_color_start
+
+        color_headers = result.color_headers
+        output_rows = sheet_output_rows(result.rows)
+
+        num_color_cols = len(color_headers or [])
+        color_col_ids = column_ids(color_headers or [])
+        color_cols_by_id: Dict[int, List[int]] = {}
+        for j, col_id in enumerate(color_col_ids):
+            color_cols_by_id.setdefault(col_id, []).append(j)
+        style_start_col = c_category if c_category else c_product
+        style_end_base = max(c_supplier, c_quality, c_image or 0)
+
+        template_end_col = layout.template_end_col
+        original_color_capacity = layout.color_capacity
+        dynamic_end_col = c_color_start + max(num_color_cols - 1, 0)
+        style_end_col = max(style_end_base, template_end_col, dynamic_end_col)
+        original_capacity = layout.row_capacity
+
+        # Color headers
+        if num_color_cols > 0:
+            base_header_style = self.style(header_row, c_supplier)
+            a1_key = self.style_key(self.style(1, 1))
+            for j, htxt in enumerate(color_headers):
+                cc = c_color_start + j
+                if self.style_key(self.style(header_row, cc)) == a1_key:
+                    self.set_style(header_row, cc, base_header_style)
+                self.set_value(header_row, cc, htxt)
+                self.set_alignment(header_row, cc, HEADER_ALIGNMENT)
+
+        # Ensure enough rows (excel_template.ensure_bom_rows_capacity)
+        needed_rows = len(output_rows)
+        if needed_rows > 0:
+            max_existing_row = layout.max_existing_row(style_start_col, style_end_col)
+            existing_capacity = max(0, max_existing_row - start_row + 1)
+            if existing_capacity < needed_rows:
+                to_add = needed_rows - existing_capacity
+                insert_at = max_existing_row + 1
+                self.insert_rows(insert_at, to_add)
+                palette = {c: self.style(start_row, c) for c in range(style_start_col, style_end_col + 1)}
+                copy_height = start_row in self.dim_rows
+                for dst in range(insert_at, insert_at + to_add):
+                    if copy_height:
+                        self.set_row_height(dst, self.row_height(start_row))
+                    for c, xf in palette.items():
+                        self.set_style(dst, c, xf)
+
+        # Extra color columns beyond template slots
+        if num_color_cols > original_color_capacity:
+            extra_start = c_color_start + original_color_capacity
+            extra_end = c_color_start + num_color_cols - 1
+            src_col_for_style = c_color_start + original_color_capacity - 1 if original_color_capacity > 0 else c_supplier
+            style_row_end = max(start_row + max(original_capacity, len(output_rows)) - 1, header_row)
+            src_styles = [self.style(rr, src_col_for_style) for rr in range(header_row, style_row_end + 1)]
+            for cc in range(extra_start, extra_end + 1):
+                self.set_col_width(cc, 36.13)
+                for rr, xf in enumerate(src_styles, start=header_row):
+                    self.set_style(rr, cc, xf)
+
+        # BOM detail rows
+        for i, row_item in enumerate(output_rows):
+            rr = start_row + i
+            for cc in range(style_start_col, style_end_col + 1):
+                self.set_value(rr, cc, None)
+
+            if row_item[0] == "subtitle":
+                subtitle_col = c_category if c_category else c_product
+                self.set_value(rr, subtitle_col, f"[ {row_item[1]} ]")
+                self.set_alignment(rr, subtitle_col, SUBTITLE_ALIGNMENT)
+                self.set_bold(rr, subtitle_col)
+                continue
+
+            r = row_item[1]
+            if c_category:
+                self.set_value(rr, c_category, r.category)
+            self.set_value(rr, c_product, r.product)
+            self.set_value(rr, c_material, r.material_name)
+            self.set_value(rr, c_supp_art, r.supplier_article_number)
+            self.set_value(rr, c_usage, r.usage)
+            self.set_value(rr, c_quality, r.quality_details)
+            self.set_value(rr, c_supplier, r.supplier)
+
+            if c_image and getattr(r, "image_png", None):
+                try:
+                    self.insert_row_image(rr, c_image, r.image_png)
+                except Exception:
+                    pass
+
+            for col_id, v in (r.colors or {}).items():
+                if v:
+                    for j in color_cols_by_id.get(col_id, ()):
+                        self.set_value(rr, c_color_start + j, v)
+            if getattr(r, "color_images", None):
+                for j, col_id in enumerate(color_col_ids):
+                    if col_id in r.color_images:
+                        try:
+                            self.insert_row_image(rr, c_color_start + j, r.color_images[col_id])
+                        except Exception:
+                            pass
+
+        # Clean template capacity left unused
+        filled_rows = len(output_rows)
+        if original_capacity > filled_rows:
+            for rr in range(start_row + filled_rows, start_row + original_capacity):
+                for cc in range(style_start_col, style_end_col + 1):
+                    self.set_value(rr, cc, None)
+                    self.clear_border(rr, cc)
+
+        # Clear unused template color slots
+        if num_color_cols < original_color_capacity:
+            unused_start = c_color_start + num_color_cols
+            unused_end = c_color_start + original_color_capacity - 1
+            row_end = start_row + max(filled_rows, original_capacity) - 1
+            for rr in range(header_row, row_end + 1):
+                for cc in range(unused_start, unused_end + 1):
+                    self.set_value(rr, cc, None)
+                    self.clear_border(rr, cc)
+
+        return master.get("design_number", "")
+
+    # ── 직렬화 ─────────────────────────────────────────────
+
+    def _sheet_data(self) -> Tuple[str, str]:
+        by_row: Dict[int, List[Tuple[int, tuple]]] = {}
+        for (r, c), cell in self.cells.items():
+            if cell[0] is None and cell[1] is None and not cell[2] and not cell[3]:
+                continue
+            by_row.setdefault(r, []).append((c, cell))
+        rows_out = []
+        for r in sorted(set(by_row) | set(self.row_attrs)):
+            attrs = self.row_attrs.get(r)
+            cells = by_row.get(r)
+            if not cells and not attrs:
+                continue
+            parts = [f'<row r="{r}"{_attr_str(attrs) if attrs else ""}>']
+            for c, (xf, t, inner, extra) in sorted(cells or (), key=lambda x: x[0]):
+                head = f'<c r="{get_column_letter(c)}{r}"'
+                if xf is not None:
+                    head += f' s="{xf}"'
+                if t is not None:
+                    head += f' t="{t}"'
+                head += extra
+                parts.append(f"{head}>{inner}</c>" if inner else f"{head}/>")
+            parts.append("</row>")
+            rows_out.append("".join(parts))
+
+        if by_row:
+            coords = [(r, c) for r, cs in by_row.items() for c, _ in cs]
+            min_r = min(r for r, _ in coords)
+            max_r = max(r for r, _ in coords)
+            min_c = min(c for _, c in coords)
+            max_c = max(c for _, c in coords)
+            dim = f"{get_column_letter(min_c)}{min_r}:{get_column_letter(max_c)}{max_r}"
+        else:
+            dim = "A1"
+        return "<sheetData>" + "".join(rows_out) + "</sheetData>", dim
+
+    def _cols_xml(self) -> str:
+        if not self.cols:
+            return ""
+        return "<cols>" + "".join(f"<col{_attr_str(a)}/>" for _k, a in sorted(self.cols.items())) + "</cols>"
+
+    def sheet_xml(self, head: str, tail: str) -> str:
+        """head(sheetData 앞, cols 제외) + cols + sheetData + tail"""
+        sheet_data, dim = self._sheet_data()
+        head = re.sub(r'<dimension\s+ref="[^"]*"\s*/>', f'<dimension ref="{dim}"/>', head, count=1)
+        return head + self._cols_xml() + sheet_data + tail
+
+    def drawing(self, drawing_xml: str, rels_xml: str, media_path_for: Callable[[str], str]):
+        """
+        이미지 앵커를 drawing XML에 추가 (openpyxl 저장과 같은 oneCellAnchor 형식).
+        media_path_for(확장자): 새 media 파트 경로
+        Returns: (drawing_xml, rels_xml, [(media 경로, 바이트)], 이미지 확장자 set)
+        """
+        rels = _parse_rels(rels_xml)
+        prefix = "xdr:" if "<xdr:wsDr" in drawing_xml else ""
+        ids = [int(x) for x in re.findall(r'<(?:\w+:)?cNvPr\b[^>]*?\bid="(\d+)"', drawing_xml)]
+        next_id = max(ids, default=0) + 1
+        media: List[Tuple[str, bytes]] = []
+        anchors = []
+        exts = set()
+        for row, col, w, h, data in self.images:
+            fmt = (PILImage.open(BytesIO(data)).format or "png").lower()
+            if fmt not in ("png", "jpeg", "gif"):
+                buf = BytesIO()
+                PILImage.open(BytesIO(data)).save(buf, format="png")
+                data, fmt = buf.getvalue(), "png"
+            media_path = media_path_for(fmt)
+            media.append((media_path, data))
+            exts.add(fmt)
+            rid = _next_rel_id(rels)
+            rels.append({"Id": rid})
+            rels_xml = _append_before(
+                rels_xml, "</Relationships>",
+                f'<Relationship Id="{rid}" Type="{_REL_TYPE}image" Target="/{media_path}"/>',
+            )
+            x = prefix
+            anchors.append(
+                f"<{x}oneCellAnchor><{x}from><{x}col>{col - 1}</{x}col><{x}colOff>0</{x}colOff>"
+                f"<{x}row>{row - 1}</{x}row><{x}rowOff>0</{x}rowOff></{x}from>"
+                f'<{x}ext cx="{int(w * 9525)}" cy="{int(h * 9525)}"/>'
+                f'<{x}pic><{x}nvPicPr><{x}cNvPr id="{next_id}" name="Image {next_id}" descr="Picture"/>'
+                f"<{x}cNvPicPr/></{x}nvPicPr><{x}blipFill>"
+                f'<a:blip xmlns:r="{_REL_NS}" cstate="print" r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch>'
+                f'</{x}blipFill><{x}spPr><a:prstGeom prst="rect"/></{x}spPr></{x}pic><{x}clientData/></{x}oneCellAnchor>'
+            )
+            next_id += 1
+        drawing_xml = _append_before(drawing_xml, f"</{prefix}wsDr>", "".join(anchors))
+        return drawing_xml, rels_xml, media, exts
+
+    def save(self, output_path: str):
+        """양식 xlsx에서 바뀐 파트만 바꿔 output_path에 씀 (단일 파일 출력)."""
+        tpl = self.tpl
+        parts: Dict[str, bytes] = {}
+        removed = set()
+        ct_xml = tpl.parts["[Content_Types].xml"].decode("utf-8")
+        wb_rels_path = "xl/_rels/workbook.xml.rels"
+        sheet_rels_path = _rels_path(tpl.sheet_path)
+
+        # 이미지 → drawing 파트
+        tail = tpl.sheet_tail
+        if self.images:
+            sheet_rels_xml = tpl.parts[sheet_rels_path].decode("utf-8") if sheet_rels_path in tpl.parts else _EMPTY_RELS
+            sheet_rels = _parse_rels(sheet_rels_xml)
+            drawing_rel = next((r for r in sheet_rels if r.get("Type") == _REL_TYPE + "drawing"), None)
+            if drawing_rel is not None:
+                drawing_path = _resolve_target(posixpath.dirname(tpl.sheet_path), drawing_rel["Target"])
+                drawing_xml = tpl.parts[drawing_path].decode("utf-8")
+            else:
+                n = 1
+                while f"xl/drawings/drawing{n}.xml" in tpl.parts:
+                    n += 1
+                drawing_path = f"xl/drawings/drawing{n}.xml"
+                drawing_xml = _EMPTY_DRAWING
+                rid = _next_rel_id(sheet_rels)
+                sheet_rels_xml = _append_before(
+                    sheet_rels_xml, "</Relationships>",
+                    f'<Relationship Id="{rid}" Type="{_REL_TYPE}drawing" Target="/{drawing_path}"/>',
+                )
+                tail = _tail_with_drawing(tail, rid)
+                ct_xml = _append_before(
+                    ct_xml, "</Types>", f'<Override PartName="/{drawing_path}" ContentType="{_CT_DRAWING}"/>'
+                )
+            parts[sheet_rels_path] = sheet_rels_xml.encode("utf-8")
+
+            drawing_rels_path = _rels_path(drawing_path)
+            media_no = [0]
+
+            def media_path_for(fmt: str) -> str:
+                while True:
+                    media_no[0] += 1
+                    path = f"xl/media/image{media_no[0]}.{fmt}"
+                    if path not in tpl.parts:
+                        return path
+
+            drawing_xml, drawing_rels_xml, media, exts = self.drawing(
+                drawing_xml,
+                tpl.parts[drawing_rels_path].decode("utf-8") if drawing_rels_path in tpl.parts else _EMPTY_RELS,
+                media_path_for,
+            )
+            parts[drawing_path] = drawing_xml.encode("utf-8")
+            parts[drawing_rels_path] = drawing_rels_xml.encode("utf-8")
+            parts.update(media)
+            ct_xml = _with_image_defaults(ct_xml, exts)
+
+        parts[tpl.sheet_path] = self.sheet_xml(tpl.sheet_head, tail).encode("utf-8")
+        parts[tpl.styles_path] = self.shared.styles_xml().encode("utf-8")
+
+        if self.shared.strings:
+            if tpl.sst_path is not None:
+                parts[tpl.sst_path] = self.shared.sst_xml().encode("utf-8")
+            else:
+                sst_path = "xl/sharedStrings.xml"
+                parts[sst_path] = self.shared.sst_xml().encode("utf-8")
+                wb_rels_xml = tpl.parts[wb_rels_path].decode("utf-8")
+                rid = _next_rel_id(_parse_rels(wb_rels_xml))
+                parts[wb_rels_path] = _append_before(
+                    wb_rels_xml, "</Relationships>",
+                    f'<Relationship Id="{rid}" Type="{_REL_TYPE}sharedStrings" Target="/{sst_path}"/>',
+                ).encode("utf-8")
+                ct_xml = _append_before(ct_xml, "</Types>", f'<Override PartName="/{sst_path}" ContentType="{_CT_SST}"/>')
+
+        # 행을 끼워 넣으면 calcChain 셀 참조가 어긋나므로 제거 (Excel이 다시 만듦, openpyxl 저장과 같음)
+        if tpl.calc_chain_path:
+            removed.add(tpl.calc_chain_path)
+            wb_rels_xml = parts.get(wb_rels_path, tpl.parts[wb_rels_path]).decode("utf-8")
+            parts[wb_rels_path] = re.sub(
+                rf'<Relationship\b[^>]*Type="{re.escape(_REL_TYPE)}calcChain"[^>]*/>', "", wb_rels_xml
+            ).encode("utf-8")
+            ct_xml = re.sub(rf'<Override\b[^>]*PartName="/{re.escape(tpl.calc_chain_path)}"[^>]*/>', "", ct_xml)
+
+        parts["[Content_Types].xml"] = ct_xml.encode("utf-8")
+
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name in tpl.part_names:
+                if name in removed:
+                    continue
+                zf.writestr(name, parts.pop(name, tpl.parts[name]))
+            for name, data in parts.items():
+                zf.writestr(name, data)
+
+
+# ----------------------------
+# 양식 파일 단위 재사용
+# ----------------------------
+_templates: "OrderedDict[str, _XlsxTemplate]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def load_xlsx_template(template_path: str) -> _XlsxTemplate:
+    """양식 xlsx 파싱 결과 (같은 내용의 양식은 한 번만 파싱)."""
+    key = template_cache_key(template_path)
+    with _lock:
+        tpl = _templates.get(key)
+        if tpl is not None:
+            _templates.move_to_end(key)
+            return tpl
+    tpl = _XlsxTemplate(template_path)
+    with _lock:
+        _templates[key] = tpl
+        while len(_templates) > POOL_SIZE:
+            _templates.popitem(last=False)
+    return tpl
+
+
+def write_xlsx(template_path: str, result: ParseResult, output_path: str) -> str:
+    """파싱 결과를 양식에 채워 output_path로 저장. Returns: design_number"""
+    return load_xlsx_template(template_path).write(result, output_path)
+
+
+# ----------------------------
+# 합본 스트리밍 쓰기
+# ----------------------------
+# 복사한 시트에 가져가지 않는 양식 시트의 관계 파트 참조 (openpyxl copy_worksheet도 복사하지 않음)
+_REL_ELEMENT_RE = re.compile(
+    r"<(legacyDrawing|legacyDrawingHF|drawing|picture)\b[^>]*/>"
+    r"|<(tableParts|oleObjects|controls)\b[^>]*?(?:/>|>.*?</\2>)",
+    re.S,
+)
+_REL_ID_ATTR_RE = re.compile(r'\s+r:id="[^"]*"')
+_ATTR_ENTITIES = {'"': "&quot;"}
+
+
+class StreamingWorkbookWriter:
+    """
+    복수 PDF 합본 xlsx 스트리밍 쓰기 (시트 = 양식 활성 시트 복사본 + PDF 데이터)
+    - add_sheet: 시트를 채우고 바로 zip 파트(시트 XML, drawing, media)로 쓴 뒤 버림
+      → 최대 메모리는 배치 크기가 아니라 가장 큰 PDF 한 개 기준
+    - styles / sharedStrings(새 문자열만 누적) / workbook.xml은 close()에서 한 번 씀
+    - 양식의 원래 시트는 출력에 넣지 않음 (openpyxl 합본과 같음)
+    """
+
+    def __init__(self, template_path: str, output_path: str):
+        self.output_path = output_path
+        self.sheet_names: List[str] = []
+        try:
+            self.tpl: Optional[_XlsxTemplate] = load_xlsx_template(template_path)
+            self.template_error: Optional[ValueError] = None
+        except ValueError as e:
+            # 양식 오류 → 시트마다 같은 예외로 보고 (openpyxl 합본과 같음)
+            self.tpl, self.template_error = None, e
+        self.shared = _SharedParts(self.tpl) if self.tpl is not None else None
+        self._media_no = 0
+        self._drawings: List[str] = []
+        self._exts = set()
+        if self.tpl is not None:
+            head = re.sub(r'\s+xr:uid="[^"]*"', "", self.tpl.sheet_head, count=1)
+            self._head_first = head
+            self._head_rest = re.sub(r'\s+tabSelected="[^"]*"', "", head)
+            self._tail = _REL_ID_ATTR_RE.sub("", _REL_ELEMENT_RE.sub("", self.tpl.sheet_tail))
+        self._zf = zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED)
+
+    @property
+    def bom_images(self) -> bool:
+        """템플릿에 Image 컬럼이 있을 때만 BOM 'Image' 컬럼 이미지를 추출."""
+        return self.tpl.layout.has_image_column if self.tpl is not None else True
+
+    def _media_path(self, fmt: str) -> str:
+        self._media_no += 1
+        return f"xl/media/image{self._media_no}.{fmt}"
+
+    def add_sheet(self, result: ParseResult, sheet_name: Callable[[str], str]) -> str:
+        """
+        result로 시트 하나를 채워 바로 씀.
+        sheet_name(design_number): 시트 이름 결정 (채우기가 성공한 뒤에만 호출)
+        Returns: 시트 이름
+        """
+        if self.template_error is not None:
+            raise self.template_error
+        patch = _SheetPatch(self.tpl, self.shared)
+        design_number = patch.fill(result)
+        name = sheet_name(design_number)
+
+        sheet_path = f"xl/worksheets/sheet{len(self.sheet_names) + 1}.xml"
+        tail = self._tail
+        if patch.images:
+            drawing_path = f"xl/drawings/drawing{len(self._drawings) + 1}.xml"
+            drawing_xml, rels_xml, media, exts = patch.drawing(_EMPTY_DRAWING, _EMPTY_RELS, self._media_path)
+            for media_path, data in media:
+                self._zf.writestr(media_path, data)
+            self._zf.writestr(drawing_path, drawing_xml)
+            self._zf.writestr(_rels_path(drawing_path), rels_xml)
+            self._zf.writestr(_rels_path(sheet_path), _append_before(
+                _EMPTY_RELS, "</Relationships>",
+                f'<Relationship Id="rId1" Type="{_REL_TYPE}drawing" Target="/{drawing_path}"/>',
+            ))
+            self._drawings.append(drawing_path)
+            self._exts |= exts
+            tail = _tail_with_drawing(tail, "rId1")
+        head = self._head_first if not self.sheet_names else self._head_rest
+        self._zf.writestr(sheet_path, patch.sheet_xml(head, tail))
+        self.sheet_names.append(name)
+        return name
+
+    def close(self):
+        """공용 파트(workbook, styles, sharedStrings, content types ...)를 쓰고 파일을 닫음."""
+        if not self.sheet_names:
+            self.discard()
+            # openpyxl로 시트 없는 워크북을 저장할 때와 같은 예외
+            raise IndexError("At least one sheet must be visible")
+        tpl = self.tpl
+        zf = self._zf
+        n_sheets = len(self.sheet_names)
+
+        # workbook.xml: 시트 목록 교체, 양식 시트 기준 이름 정의/활성 탭 제거
+        wb_xml = tpl.parts["xl/workbook.xml"].decode("utf-8")
+        sheets = "".join(
+            f'<sheet name="{escape(name, _ATTR_ENTITIES)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self.sheet_names, 1)
+        )
+        wb_xml = re.sub(r"<sheets>.*?</sheets>", lambda _m: f"<sheets>{sheets}</sheets>", wb_xml, count=1, flags=re.S)
+        wb_xml = re.sub(r"<definedNames>.*?</definedNames>|<definedNames\s*/>", "", wb_xml, flags=re.S)
+        wb_xml = re.sub(r'\s+(?:activeTab|firstSheet)="[^"]*"', "", wb_xml)
+        zf.writestr("xl/workbook.xml", wb_xml)
+
+        # workbook rels: 시트 + styles / theme + sharedStrings
+        rels = [
+            f'<Relationship Id="rId{i}" Type="{_REL_TYPE}worksheet" Target="/xl/worksheets/sheet{i}.xml"/>'
+            for i in range(1, n_sheets + 1)
+        ]
+        kept = []
+        for r in tpl.wb_rels:
+            if r.get("Type") in (_REL_TYPE + "styles", _REL_TYPE + "theme"):
+                kept.append(_resolve_target("xl", r["Target"]))
+                rels.append(
+                    f'<Relationship Id="rId{len(rels) + 1}" Type="{r["Type"]}" Target="/{kept[-1]}"/>'
+                )
+        sst_path = tpl.sst_path or "xl/sharedStrings.xml"
+        rels.append(f'<Relationship Id="rId{len(rels) + 1}" Type="{_REL_TYPE}sharedStrings" Target="/{sst_path}"/>')
+        zf.writestr("xl/_rels/workbook.xml.rels", _append_before(_EMPTY_RELS, "</Relationships>", "".join(rels)))
+
+        zf.writestr(tpl.styles_path, self.shared.styles_xml())
+        zf.writestr(sst_path, self.shared.sst_xml())
+        for part in kept:
+            if part != tpl.styles_path:
+                zf.writestr(part, tpl.parts[part])
+
+        # 패키지 루트 파트 (docProps ...): app.xml의 시트 목록은 양식 기준이라 다시 만듦
+        root_parts = []
+        for r in _parse_rels(tpl.parts["_rels/.rels"].decode("utf-8")):
+            part = _resolve_target("", r["Target"])
+            if part in tpl.parts and part != "xl/workbook.xml":
+                root_parts.append((part, r.get("Type")))
+        zf.writestr("_rels/.rels", tpl.parts["_rels/.rels"])
+        for part, rel_type in root_parts:
+            if rel_type == _REL_TYPE + "extended-properties":
+                zf.writestr(part, _XML_DECL + (
+                    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties" '
+                    'xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes">'
+                    "<Application>Microsoft Excel</Application></Properties>"
+                ))
+            else:
+                zf.writestr(part, tpl.parts[part])
+
+        # [Content_Types].xml: 양식 Default + 실제로 쓴 파트의 Override
+        ct_xml = tpl.parts["[Content_Types].xml"].decode("utf-8")
+        overrides = {
+            a["PartName"]: a["ContentType"]
+            for a in (_attrs(m) for m in re.findall(r"<Override\b([^>]*?)/?>", ct_xml))
+        }
+        written = ["xl/workbook.xml", tpl.styles_path] + kept + [p for p, _t in root_parts]
+        types = re.findall(r"<Default\b[^>]*?/>", ct_xml)
+        for part in dict.fromkeys(written):
+            content_type = overrides.get("/" + part)
+            if content_type is None and part.endswith("app.xml"):
+                content_type = _CT_EXTENDED
+            if content_type is not None:
+                types.append(f'<Override PartName="/{part}" ContentType="{content_type}"/>')
+        types.append(f'<Override PartName="/{sst_path}" ContentType="{_CT_SST}"/>')
+        types += [
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{_CT_WORKSHEET}"/>'
+            for i in range(1, n_sheets + 1)
+        ]
+        types += [f'<Override PartName="/{p}" ContentType="{_CT_DRAWING}"/>' for p in self._drawings]
+        types_open = re.search(r"<Types\b[^>]*>", ct_xml).group(0)
+        ct_xml = _XML_DECL + types_open + "".join(types) + "</Types>"
+        zf.writestr("[Content_Types].xml", _with_image_defaults(ct_xml, self._exts))
+        zf.close()
+
+    def discard(self):
+        """쓰던 파일을 닫고 지움 (배치 중단 시)."""
+        self._zf.close()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass